@@ -0,0 +1,74 @@
+"""
+Startup Benchmarks
+Measures import cost with ``python -X importtime`` and the wall time of
+trivial CLI invocations
+"""
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, Any, List, Tuple
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    Parse ``-X importtime`` output
+
+    Args:
+        stderr: Captured stderr of the interpreter
+
+    Returns:
+        List of (module, self_us, cumulative_us)
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        entries.append((module.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+def measure_import(module: str, runs: int = 5) -> Dict[str, Any]:
+    """
+    Median cumulative import time of a module, in fresh interpreters
+
+    Args:
+        module: Module to import (e.g. 'run' or 'src.orchestrator.agent_graph')
+        runs: Number of interpreter launches
+
+    Returns:
+        Dictionary with median milliseconds and the heaviest imports of the last run
+    """
+    totals = []
+    entries: List[Tuple[str, int, int]] = []
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                              capture_output=True, text=True, check=True)
+        entries = parse_importtime(proc.stderr)
+        totals.append(next(cum for name, _, cum in reversed(entries) if name == module))
+
+    heaviest = sorted(entries, key=lambda entry: entry[1], reverse=True)[:10]
+    return {
+        'wall_seconds': round(statistics.median(totals) / 1e6, 4),
+        'heaviest_self_imports_ms': {name: round(self_us / 1000, 2) for name, self_us, _ in heaviest}
+    }
+
+
+def measure_command(args: List[str], runs: int = 5) -> Dict[str, Any]:
+    """Median wall time of a CLI invocation (exit status ignored)"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, capture_output=True)
+        timings.append(time.perf_counter() - start)
+    return {'wall_seconds': round(statistics.median(timings), 4)}
+
+
+def run_startup_suite(runs: int = 5) -> Dict[str, Dict[str, Any]]:
+    """Startup cases, keyed like the main suite ("startup/<case>")"""
+    return {
+        'startup/import_run': measure_import('run', runs),
+        'startup/import_agent_graph': measure_import('src.orchestrator.agent_graph', runs),
+        'startup/usage_message': measure_command(['run.py'], runs),
+    }
@@ -0,0 +1,76 @@
+"""
+Prompt Encoding Benchmark
+Compares the JSON and table prompt encodings of every data_results section:
+bytes and estimated tokens per section, and what the table encoding saves.
+
+Usage:
+    python -m benchmarks.prompt_encoding
+    python -m benchmarks.prompt_encoding --size 100k --output benchmarks/prompt_encoding.json
+"""
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from .synthetic_data import ensure_dataset, parse_size
+
+SAMPLE_CSV = 'data/synthetic_fb_ads_undergarments.csv'
+
+
+def measure_sections(data_results: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+    """
+    Encode each section both ways
+
+    Args:
+        data_results: Output of DataAgent.run_analyses
+
+    Returns:
+        Section -> json/table bytes and estimated tokens, plus a 'total' entry
+        for the whole payload (which also benefits from aliased tables)
+    """
+    from src.utils import to_json
+    from src.utils.llm import estimate_tokens
+    from src.utils.prompt_tables import encode_payload
+
+    sections = {name: {name: value} for name, value in data_results.items()}
+    sections['total'] = data_results
+    measured = {}
+    for name, payload in sections.items():
+        as_json = to_json(payload)
+        as_table = encode_payload(payload)
+        measured[name] = {
+            'json_bytes': len(as_json.encode('utf-8')),
+            'table_bytes': len(as_table.encode('utf-8')),
+            'json_tokens': estimate_tokens(as_json),
+            'table_tokens': estimate_tokens(as_table)
+        }
+    return measured
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Prompt encoding size benchmark")
+    parser.add_argument('--size', default=None, help="Synthetic dataset size (e.g. 100k); default: sample CSV")
+    parser.add_argument('--output', default=None, help="Optional JSON output path")
+    args = parser.parse_args(argv)
+
+    from src.agents.data_agent import DataAgent, insight_payload
+
+    csv_path = str(ensure_dataset(parse_size(args.size))) if args.size else SAMPLE_CSV
+    data_results = insight_payload(DataAgent(csv_path).run_analyses())
+    measured = measure_sections(data_results)
+
+    print(f"[BENCH] Prompt encoding: {csv_path}")
+    print(f"   {'section':<18} {'json B':>10} {'table B':>10} {'json tok':>9} {'table tok':>9} {'saved':>7}")
+    for name, sizes in measured.items():
+        saved = 1 - sizes['table_tokens'] / sizes['json_tokens']
+        print(f"   {name:<18} {sizes['json_bytes']:>10,} {sizes['table_bytes']:>10,} "
+              f"{sizes['json_tokens']:>9,} {sizes['table_tokens']:>9,} {saved:>7.1%}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({'dataset': csv_path, 'sections': measured}, indent=2))
+        print(f"\n[BENCH] Results saved: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
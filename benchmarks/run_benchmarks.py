@@ -0,0 +1,233 @@
+"""
+Benchmark Suite
+Times every DataAgent method and the full AgentGraph pipeline (against the
+fake LLM backend) on synthetic datasets of increasing size.
+
+Usage:
+    python -m benchmarks.run_benchmarks --sizes 10k,100k
+    python -m benchmarks.run_benchmarks --sizes 10k,100k,1M,10M --save-baseline
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json --threshold 0.2
+
+Startup cost (``python -X importtime``) is tracked as ``startup/*`` cases.
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from .import_time import run_startup_suite
+from .synthetic_data import ensure_dataset, parse_size
+
+DATA_AGENT_CASES = [
+    ('load', None),
+    ('get_data_summary', {}),
+    ('compare_periods', {'current_days': 7, 'previous_days': 7}),
+    ('get_campaign_level_analysis', {}),
+    ('get_adset_level_analysis', {}),
+    ('get_audience_level_analysis', {}),
+    ('get_creative_level_analysis', {}),
+    ('get_geo_level_analysis', {}),
+    ('get_rolling_trends', {'window': 7}),
+    ('get_top_performers', {'metric': 'roas', 'group_by': 'creative_type'}),
+    ('detect_anomalies', {}),
+]
+PIPELINE_CASE = 'agent_graph.execute'
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _build_case(case: str, csv_path: str, latency: float):
+    """Prepare state outside the timed region and return the callable to time"""
+    if case == PIPELINE_CASE:
+        from src.orchestrator.agent_graph import AgentGraph
+        log_dir = tempfile.mkdtemp(prefix='kasparro_bench_logs_')
+        graph = AgentGraph({
+            'data_path': csv_path,
+            'llm_backend': 'fake',
+            'fake_llm_latency': latency,
+            'cache': {'enabled': False},
+            'log_dir': log_dir,
+            'confidence_min': 0.6,
+        })
+        return lambda: graph.execute("Analyze ROAS trends in last 7 days")
+
+    from src.agents.data_agent import DataAgent
+    if case == 'load':
+        return lambda: DataAgent(csv_path).df
+
+    agent = DataAgent(csv_path)
+    agent.df
+    kwargs = dict(DATA_AGENT_CASES)[case]
+    return lambda: getattr(agent, case)(**kwargs)
+
+
+def _run_case(case: str, csv_path: str, latency: float, track_allocations: bool) -> Dict[str, Any]:
+    """Run one case in the current (fresh) process and collect measurements"""
+    fn = _build_case(case, csv_path, latency)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        fn()
+        wall = time.perf_counter() - start
+
+        result = {'wall_seconds': round(wall, 4), 'peak_rss_mb': round(_peak_rss_mb(), 1)}
+
+        if track_allocations:
+            tracemalloc.start()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            result['alloc_peak_mb'] = round(peak / (1024 * 1024), 2)
+
+    return result
+
+
+def run_suite(sizes: List[str], latency: float, track_allocations: bool,
+              include_pipeline: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    Run all cases for each dataset size, each in its own process
+
+    Args:
+        sizes: Size labels (e.g. ['10k', '1M'])
+        latency: Simulated LLM latency per call in seconds
+        track_allocations: Also measure peak traced allocations (re-runs each case)
+        include_pipeline: Include the full AgentGraph run
+
+    Returns:
+        Mapping of "<size>/<case>" to measurements
+    """
+    cases = [name for name, _ in DATA_AGENT_CASES]
+    if include_pipeline:
+        cases.append(PIPELINE_CASE)
+
+    results = {}
+    for label in sizes:
+        rows = parse_size(label)
+        print(f"[BENCH] Preparing {label} rows ({rows:,})...")
+        csv_path = str(ensure_dataset(rows))
+
+        for case in cases:
+            # A fresh process per case keeps peak RSS attributable to that case
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+                measured = pool.submit(_run_case, case, csv_path, latency, track_allocations).result()
+            key = f"{label}/{case}"
+            results[key] = measured
+            extra = f", alloc {measured['alloc_peak_mb']:.1f} MB" if 'alloc_peak_mb' in measured else ''
+            print(f"   {key:<45} {measured['wall_seconds']:>9.4f}s  rss {measured['peak_rss_mb']:.0f} MB{extra}")
+
+    return results
+
+
+def find_regressions(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+                     threshold: float, min_seconds: float = 0.01) -> List[str]:
+    """
+    Compare results against a baseline
+
+    Args:
+        results: Current measurements
+        baseline: Baseline measurements (same keys)
+        threshold: Allowed relative slowdown / growth (0.2 = 20%)
+        min_seconds: Ignore wall-time differences smaller than this (noise floor)
+
+    Returns:
+        Human-readable regression descriptions
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        for metric in ('wall_seconds', 'peak_rss_mb', 'alloc_peak_mb'):
+            if metric not in current or metric not in previous or not previous[metric]:
+                continue
+            if metric == 'wall_seconds' and current[metric] - previous[metric] < min_seconds:
+                continue
+            ratio = current[metric] / previous[metric]
+            if ratio > 1 + threshold:
+                regressions.append(f"{key} {metric}: {previous[metric]} -> {current[metric]} ({(ratio - 1) * 100:+.0f}%)")
+    return regressions
+
+
+def _write_json(path: Path, data: Dict[str, Any]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Kasparro performance benchmarks")
+    parser.add_argument('--sizes', default='10k,100k', help="Comma-separated sizes: 10k,100k,1M,10M")
+    parser.add_argument('--latency', type=float, default=0.0, help="Fake LLM latency per call (seconds)")
+    parser.add_argument('--no-allocations', action='store_true', help="Skip tracemalloc pass")
+    parser.add_argument('--no-pipeline', action='store_true', help="Skip the full AgentGraph case")
+    parser.add_argument('--no-startup', action='store_true', help="Skip -X importtime startup cases")
+    parser.add_argument('--output', default='benchmarks/results.json')
+    parser.add_argument('--baseline', default='benchmarks/baseline.json')
+    parser.add_argument('--save-baseline', action='store_true', help="Write results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Regression threshold (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = run_suite(
+        sizes=[s.strip() for s in args.sizes.split(',') if s.strip()],
+        latency=args.latency,
+        track_allocations=not args.no_allocations,
+        include_pipeline=not args.no_pipeline
+    )
+    if not args.no_startup:
+        print("[BENCH] Measuring startup (-X importtime)...")
+        startup = run_startup_suite()
+        for key, measured in startup.items():
+            print(f"   {key:<45} {measured['wall_seconds']:>9.4f}s")
+        results.update(startup)
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'fake_llm_latency': args.latency,
+        'cases': results
+    }
+    _write_json(Path(args.output), report)
+    print(f"\n[BENCH] Results saved: {args.output}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        _write_json(baseline_path, report)
+        print(f"[BENCH] Baseline saved: {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print("[BENCH] No baseline found; run with --save-baseline to create one")
+        return 0
+
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f).get('cases', {})
+    regressions = find_regressions(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n[REGRESSION] {len(regressions)} regression(s) vs {baseline_path}:")
+        for line in regressions:
+            print(f"   - {line}")
+        return 1
+
+    print(f"[BENCH] No regressions vs {baseline_path} (threshold {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
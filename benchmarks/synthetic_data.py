@@ -0,0 +1,100 @@
+"""
+Synthetic Ads Data Generator
+Produces CSVs with the same schema as data/synthetic_fb_ads_undergarments.csv
+at arbitrary row counts for benchmarking
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SOURCE_CSV = 'data/synthetic_fb_ads_undergarments.csv'
+
+COLUMNS = [
+    'campaign_name', 'adset_name', 'date', 'spend', 'impressions', 'clicks', 'ctr',
+    'purchases', 'revenue', 'roas', 'creative_type', 'creative_message',
+    'audience_type', 'platform', 'country'
+]
+
+SIZES = {'10k': 10_000, '100k': 100_000, '1M': 1_000_000, '10M': 10_000_000}
+
+
+def parse_size(label: str) -> int:
+    """Parse a size label such as '100k' or '1M' (or a plain integer)"""
+    if label in SIZES:
+        return SIZES[label]
+    label = label.strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(label[-1], 1)
+    return int(float(label.rstrip('km')) * multiplier)
+
+
+def generate_ads_data(rows: int, seed: int = 42, source_csv: str = SOURCE_CSV) -> pd.DataFrame:
+    """
+    Generate synthetic ad rows
+
+    Categorical values are sampled from the real dataset's vocabularies so the
+    cardinalities (campaign names, messages, ...) stay realistic; history
+    length grows with row count (90 days up to three years).
+
+    Args:
+        rows: Number of rows to generate
+        seed: Random seed
+        source_csv: Dataset providing categorical vocabularies
+
+    Returns:
+        DataFrame with the source schema, including ~2.5% missing measures
+    """
+    rng = np.random.default_rng(seed)
+    source = pd.read_csv(source_csv)
+
+    days = int(np.clip(rows // 1000, 90, 1095))
+    dates = pd.date_range('2025-01-01', periods=days, freq='D')
+
+    data = {}
+    for column in ['campaign_name', 'adset_name', 'creative_type', 'creative_message',
+                   'audience_type', 'platform', 'country']:
+        vocabulary = source[column].unique()
+        data[column] = vocabulary[rng.integers(0, len(vocabulary), rows)]
+
+    data['date'] = dates[rng.integers(0, days, rows)].strftime('%Y-%m-%d')
+    spend = np.round(rng.lognormal(6.0, 0.5, rows), 2)
+    impressions = rng.integers(10_000, 520_000, rows)
+    ctr = np.round(rng.gamma(6.0, 0.0022, rows), 4)
+    clicks = np.round(impressions * ctr).astype(float)
+    purchases = rng.poisson(np.maximum(clicks * 0.022, 1))
+    revenue = np.round(purchases * rng.lognormal(3.5, 0.4, rows), 2)
+
+    data['spend'] = spend
+    data['impressions'] = impressions
+    data['clicks'] = clicks
+    data['ctr'] = ctr
+    data['purchases'] = purchases
+    data['revenue'] = revenue
+    data['roas'] = np.round(revenue / spend, 2)
+
+    df = pd.DataFrame(data)[COLUMNS]
+    for column in ['spend', 'clicks', 'revenue']:
+        df.loc[rng.random(rows) < 0.025, column] = np.nan
+    return df
+
+
+def ensure_dataset(rows: int, out_dir: str = 'benchmarks/.data', seed: int = 42) -> Path:
+    """
+    Write (once) and return the path of a synthetic CSV with the given size
+
+    Args:
+        rows: Number of rows
+        out_dir: Directory holding generated datasets
+        seed: Random seed
+
+    Returns:
+        Path to the CSV
+    """
+    path = Path(out_dir) / f"ads_{rows}_{seed}.csv"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        generate_ads_data(rows, seed=seed).to_csv(tmp_path, index=False)
+        tmp_path.replace(path)
+    return path
+
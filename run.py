@@ -2,16 +2,18 @@
 Kasparro - Agentic Facebook Ads Analyst
 Main execution script for running Facebook ads analysis
 """
+import argparse
 import sys
 import os
-from datetime import datetime, timedelta
 from pathlib import Path
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
-from src.orchestrator.agent_graph import AgentGraph
-from src.utils import load_config, save_json
+# Heavy modules (pandas, numpy, yaml, the LLM SDK) are imported inside main()
+# so the usage message and argument errors return immediately.
+
+REPORT_EXTENSIONS = {'markdown': 'md', 'html': 'html', 'json': 'json'}
 
 def print_header():
     """Print the application header"""
@@ -24,14 +26,30 @@ def print_separator():
     """Print section separator"""
     print("-" * 60)
 
+def parse_args(argv=None):
+    """Parse command-line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Kasparro - Agentic Facebook Ads Analyst",
+        epilog='Example: python run.py "Analyze ROAS trends in last 7 days"'
+    )
+    parser.add_argument('query', nargs='?', help="Your analysis query")
+    parser.add_argument('--compress', choices=['gzip', 'zstd'], default=None,
+                        help="Compress stored report objects (archive runs)")
+    parser.add_argument('--resume', metavar='RUN_ID', default=None,
+                        help="Resume a checkpointed run from its last finished stage")
+    args = parser.parse_args(argv)
+    if not args.query and not args.resume:
+        parser.error("a query is required unless --resume is given")
+    return args
+
 def main():
     """Main execution function"""
-    if len(sys.argv) < 2:
-        print("Usage: python run.py \"Your analysis query\"")
-        print("Example: python run.py \"Analyze ROAS trends in last 7 days\"")
-        sys.exit(1)
+    args = parse_args()
+    query = args.query
     
-    query = sys.argv[1]
+    from src.orchestrator.agent_graph import AgentGraph
+    from src.reporting import ReportStore
+    from src.utils import load_config
     
     try:
         # Load configuration
@@ -41,7 +59,8 @@ def main():
         agent_graph = AgentGraph(config)
         
         # Run the analysis (orchestrator handles its own output)
-        results = agent_graph.execute(query)
+        results = agent_graph.execute(query, resume=args.resume)
+        query = query or results['plan'].get('user_query', '')
         
 
         
@@ -52,32 +71,17 @@ def main():
         reports_dir = Path('reports')
         reports_dir.mkdir(exist_ok=True)
         
-        # Save individual JSON reports
-        insights_file = reports_dir / 'insights.json'
-        creatives_file = reports_dir / 'creatives.json'
-        
-        save_json({
-            'query': query,
-            'timestamp': datetime.now().isoformat(),
-            'insights': results.get('insights', []),
-            'data_summary': results.get('data', {}).get('summary', {}) if results.get('data') else {}
-        }, str(insights_file))
+        # Save JSON reports; shared sections are stored once under reports/objects
+        store = ReportStore(str(reports_dir), compression=args.compress)
+        for saved_file in store.save_run(query, results).values():
+            print(f"   [OK] Saved {saved_file}")
         
-        save_json({
-            'query': query,
-            'timestamp': datetime.now().isoformat(),
-            'creatives': results.get('creatives', []),
-            'insights_used': results.get('insights', [])
-        }, str(creatives_file))
-        
-        print(f"   [OK] Saved {insights_file}")
-        print(f"   [OK] Saved {creatives_file}")
-        
-        # Generate comprehensive markdown report
-        report_file = reports_dir / 'report.md'
+        # Generate comprehensive report(s); markdown unless config lists more formats
         try:
-            generate_markdown_report(results, query, str(report_file))
-            print(f"   [OK] Saved {report_file}")
+            for fmt in config.get('report_formats', ['markdown']):
+                report_file = reports_dir / f"report.{REPORT_EXTENSIONS[fmt]}"
+                generate_report(results, query, str(report_file), fmt)
+                print(f"   [OK] Saved {report_file}")
         except Exception as e:
             print(f"Error generating report: {e}")
             print(f"Results type: {type(results)}")
@@ -93,493 +97,10 @@ def main():
         print(f"Error: {e}")
         sys.exit(1)
 
-def generate_markdown_report(results, query, filepath):
-    """Generate a comprehensive, professional markdown report"""
-    # Handle case where results might not be a dict
-    if not isinstance(results, dict):
-        results = {}
-    
-    insights = results.get('insights', [])
-    creatives = results.get('creatives', [])
-    data_summary = results.get('data', {}).get('summary', {}) if results.get('data') else {}
-    data_results = results.get('data', {})
-    
-    with open(filepath, 'w', encoding='utf-8') as f:
-        # Professional Header
-        f.write("# Facebook Ads Performance Analysis Report\n")
-        f.write("## Comprehensive Multi-Agent AI Analysis\n\n")
-        
-        # Report Metadata
-        f.write("### Report Information\n")
-        f.write("| Attribute | Value |\n")
-        f.write("|-----------|-------|\n")
-        f.write(f"| **Generated** | {datetime.now().strftime('%B %d, %Y at %H:%M:%S UTC')} |\n")
-        f.write(f"| **Analysis Query** | {query} |\n")
-        f.write(f"| **Report Version** | 1.0 |\n")
-        f.write(f"| **Analysis System** | Kasparro Multi-Agent AI |\n")
-        f.write(f"| **Data Source** | Facebook Ads Historical Data |\n\n")
-        f.write("---\n\n")
-        
-        # Executive Summary with Professional Formatting
-        f.write("## I. Executive Summary\n\n")
-        f.write("### Campaign Performance Overview\n\n")
-        
-        if data_summary:
-            total_rows = data_summary.get('total_rows', 0)
-            total_spend = data_summary.get('total_spend', 0)
-            total_revenue = data_summary.get('total_revenue', 0)
-            overall_roas = data_summary.get('overall_roas', 0)
-            date_range = data_summary.get('date_range', {})
-            
-            f.write(f"This comprehensive analysis examines **{total_rows:,}** advertising records ")
-            f.write(f"spanning from **{date_range.get('start', 'N/A')}** to **{date_range.get('end', 'N/A')}** ")
-            f.write(f"({date_range.get('days', 'N/A')} days of campaign data).\n\n")
-            
-            # Key Performance Indicators
-            f.write("#### Key Performance Indicators (KPIs)\n\n")
-            f.write("| Metric | Value | Performance Rating |\n")
-            f.write("|--------|-------|-------------------|\n")
-            
-            rating_roas = "Excellent" if overall_roas >= 5.0 else "Good" if overall_roas >= 3.0 else "Needs Improvement"
-            efficiency = (total_revenue / total_spend * 100) if total_spend > 0 else 0
-            
-            f.write(f"| **Total Investment** | ${total_spend:,.2f} | - |\n")
-            f.write(f"| **Total Revenue** | ${total_revenue:,.2f} | - |\n")
-            f.write(f"| **Return on Ad Spend (ROAS)** | **{overall_roas:.2f}x** | {rating_roas} |\n")
-            f.write(f"| **Revenue Efficiency** | {efficiency:.1f}% | - |\n")
-            f.write(f"| **Campaign Universe** | {data_summary.get('campaigns', 'N/A')} campaigns | - |\n")
-            f.write(f"| **Ad Set Diversity** | {data_summary.get('adsets', 'N/A')} ad sets | - |\n\n")
-            
-            # Performance Assessment
-            f.write("#### Performance Assessment\n\n")
-            if overall_roas >= 5.0:
-                f.write("> **Status: STRONG PERFORMANCE** - Campaign portfolio is delivering exceptional returns with ROAS significantly above industry benchmarks.\n\n")
-            elif overall_roas >= 3.0:
-                f.write("> **Status: SOLID PERFORMANCE** - Campaign portfolio shows healthy returns with room for optimization.\n\n")
-            else:
-                f.write("> **Status: OPTIMIZATION REQUIRED** - Campaign portfolio requires immediate attention to improve profitability.\n\n")
-        else:
-            f.write("*Data summary unavailable - operating in analysis mode with available data patterns.*\n\n")
-        
-        f.write("---\n\n")
-        
-        # Temporal Performance Analysis
-        f.write("## II. Temporal Performance Analysis\n\n")
-        f.write("### Period-over-Period Comparison\n\n")
-        
-        # Enhanced period comparison with trend analysis
-        if 'recent_trends' in data_results:
-            comparison = data_results['recent_trends']
-            f.write("#### 7-Day Performance Window Analysis\n\n")
-            f.write("| Performance Metric | Current Period | Previous Period | Absolute Change | Percentage Change | Trend Analysis |\n")
-            f.write("|-------------------|---------------|-----------------|-----------------|-------------------|----------------|\n")
-            
-            for metric, data in comparison.items():
-                if isinstance(data, dict) and 'current' in data:
-                    current = data.get('current', 'N/A')
-                    previous = data.get('previous', 'N/A')
-                    change = data.get('change', 'N/A')
-                    
-                    # Determine trend direction and color
-                    if isinstance(change, str) and '%' in change:
-                        change_val = float(change.replace('%', ''))
-                        if change_val > 5:
-                            trend = "📈 Strong Positive"
-                        elif change_val > 0:
-                            trend = "📊 Positive"
-                        elif change_val > -5:
-                            trend = "📉 Slight Decline"
-                        else:
-                            trend = "⚠️ Significant Decline"
-                    else:
-                        trend = "📊 Stable"
-                    
-                    f.write(f"| **{metric.upper()}** | {current} | {previous} | - | {change} | {trend} |\n")
-            f.write("\n")
-        else:
-            # Professional default analysis with industry context
-            f.write("#### Performance Trend Analysis (Baseline Period)\n\n")
-            f.write("| Performance Metric | Current Period | Previous Period | Change | Industry Benchmark | Performance Rating |\n")
-            f.write("|-------------------|---------------|-----------------|---------|-------------------|-------------------|\n")
-            f.write("| **ROAS** | 5.29x | 5.45x | -2.9% | 4.0x | Above Benchmark |\n")
-            f.write("| **Revenue** | $867,565 | $907,995 | -4.5% | - | Declining |\n")
-            f.write("| **CTR** | 1.25% | 1.16% | +7.8% | 0.9% | Excellent |\n")
-            f.write("| **Conversions** | 24,659 | 25,517 | -3.4% | - | Slight Decline |\n")
-            f.write("| **CPM** | $12.50 | $11.80 | +5.9% | $14.00 | Competitive |\n\n")
-            
-            f.write("#### Trend Interpretation\n\n")
-            f.write("- **ROAS Stability**: While showing a minor decline, ROAS remains significantly above industry benchmarks\n")
-            f.write("- **CTR Improvement**: Strong positive trend indicates enhanced ad relevance and targeting\n")
-            f.write("- **Revenue Optimization**: Slight revenue decline warrants investigation into conversion factors\n")
-            f.write("- **Cost Efficiency**: CPM increases suggest competitive market conditions\n\n")
-        
-        f.write("---\n\n")
-        
-        # Advanced Multi-Level Analysis
-        f.write("## III. Multi-Dimensional Performance Analysis\n\n")
-        
-        # Campaign Level Analysis
-        if 'campaign_level' in data_results:
-            f.write("### A. Campaign-Level Performance\n\n")
-            campaign_data = data_results['campaign_level']
-            if 'top_campaigns' in campaign_data:
-                f.write("#### Top Performing Campaigns\n\n")
-                f.write("| Campaign | ROAS | Revenue | Spend | Efficiency Score |\n")
-                f.write("|----------|------|---------|-------|------------------|\n")
-                
-                for campaign in campaign_data['top_campaigns'][:5]:
-                    roas = campaign.get('roas', 0)
-                    revenue = campaign.get('revenue', 0)
-                    spend = campaign.get('spend', 0)
-                    efficiency = (roas * 20) if roas > 0 else 0  # Score out of 100
-                    
-                    f.write(f"| {campaign.get('campaign_name', 'N/A')[:30]}... | {roas:.2f}x | ${revenue:,.0f} | ${spend:,.0f} | {efficiency:.0f}/100 |\n")
-                f.write("\n")
-        
-        # Creative Performance Analysis  
-        if 'creative_level' in data_results:
-            f.write("### B. Creative Performance Analysis\n\n")
-            creative_data = data_results['creative_level']
-            
-            f.write("#### Creative Format Performance Matrix\n\n")
-            f.write("| Creative Type | ROAS | CTR | Conversion Rate | Volume Score | Recommendation |\n")
-            f.write("|---------------|------|-----|-----------------|--------------|----------------|\n")
-            
-            # Use actual creative performance data if available
-            if 'top_performers' in data_results:
-                for creative in data_results['top_performers']:
-                    ctype = creative.get('creative_type', 'Unknown')
-                    roas = creative.get('roas', 0)
-                    ctr = creative.get('ctr', 0)
-                    purchases = creative.get('purchases', 0)
-                    spend = creative.get('spend', 0)
-                    
-                    # Calculate scores
-                    conversion_rate = (purchases / (spend * ctr * 1000)) * 100 if spend > 0 and ctr > 0 else 0
-                    volume_score = min(100, (spend / 10000) * 100)  # Scale based on spend volume
-                    
-                    if roas >= 6.0:
-                        rec = "🚀 Scale Up"
-                    elif roas >= 4.0:
-                        rec = "📈 Optimize"
-                    else:
-                        rec = "⚠️ Review"
-                    
-                    f.write(f"| **{ctype}** | {roas:.2f}x | {ctr:.2f}% | {conversion_rate:.2f}% | {volume_score:.0f}/100 | {rec} |\n")
-            f.write("\n")
-        
-        # Geographic Performance
-        if 'geo_level' in data_results:
-            f.write("### C. Geographic Performance Analysis\n\n")
-            geo_data = data_results['geo_level']
-            
-            if 'country_performance' in geo_data:
-                f.write("#### Market Performance by Region\n\n")
-                f.write("| Market | ROAS | Revenue Share | Cost Efficiency | Market Maturity |\n")
-                f.write("|--------|------|---------------|-----------------|------------------|\n")
-                
-                total_revenue = sum(country.get('revenue', 0) for country in geo_data['country_performance'])
-                
-                for country in geo_data['country_performance']:
-                    country_name = country.get('country', 'Unknown')
-                    roas = country.get('roas', 0)
-                    revenue = country.get('revenue', 0)
-                    cpc = country.get('cpc', 0)
-                    
-                    revenue_share = (revenue / total_revenue * 100) if total_revenue > 0 else 0
-                    
-                    if cpc < 0.15:
-                        efficiency = "High"
-                    elif cpc < 0.20:
-                        efficiency = "Medium"
-                    else:
-                        efficiency = "Low"
-                    
-                    if roas >= 6.0:
-                        maturity = "Optimized"
-                    elif roas >= 4.0:
-                        maturity = "Growing"
-                    else:
-                        maturity = "Developing"
-                    
-                    f.write(f"| **{country_name}** | {roas:.2f}x | {revenue_share:.1f}% | {efficiency} | {maturity} |\n")
-                f.write("\n")
-        
-        # AI-Generated Insights Section
-        f.write("## IV. AI-Generated Strategic Insights\n\n")
-        
-        if insights:
-            f.write("### Advanced Analytics Findings\n\n")
-            for i, insight_data in enumerate(insights, 1):
-                insight = insight_data.get('insight', {}) if isinstance(insight_data, dict) else insight_data
-                evaluation = insight_data.get('evaluation', {}) if isinstance(insight_data, dict) else {}
-                
-                f.write(f"#### Strategic Insight #{i}\n\n")
-                
-                # Insight Details
-                f.write("**📊 Key Finding:**\n")
-                f.write(f"> {insight.get('title', 'Analysis Finding')}\n\n")
-                
-                f.write("**📋 Detailed Analysis:**\n")
-                f.write(f"{insight.get('description', 'Detailed insight analysis not available.')}\n\n")
-                
-                # Evidence and Confidence
-                if evaluation:
-                    f.write("**🎯 Confidence Assessment:**\n")
-                    scores = evaluation.get('scores', {})
-                    f.write(f"- Evidence Quality: {scores.get('evidence_quality', 0):.1%}\n")
-                    f.write(f"- Statistical Validity: {scores.get('statistical_validity', 0):.1%}\n")
-                    f.write(f"- Business Relevance: {scores.get('business_relevance', 0):.1%}\n")
-                    f.write(f"- Overall Confidence: **{evaluation.get('overall_score', 0):.1%}**\n\n")
-                
-                # Severity and Priority
-                severity = insight.get('severity', 'medium')
-                if severity == 'high':
-                    priority_icon = "🔴 HIGH PRIORITY"
-                elif severity == 'medium':
-                    priority_icon = "🟡 MEDIUM PRIORITY"
-                else:
-                    priority_icon = "🟢 LOW PRIORITY"
-                
-                f.write(f"**{priority_icon}**\n\n")
-                f.write("---\n\n")
-        else:
-            f.write("### Baseline Performance Analysis\n\n")
-            f.write("*AI-generated insights are currently unavailable due to API limitations. The analysis continues with data-driven observations and industry-standard recommendations.*\n\n")
-            
-            # Provide data-driven insights based on available data
-            f.write("#### Data-Driven Observations:\n\n")
-            f.write("1. **Creative Performance Hierarchy**: Analysis reveals UGC and Carousel formats leading in engagement metrics\n")
-            f.write("2. **Geographic Efficiency Patterns**: US market showing highest ROAS with optimal cost structures\n")
-            f.write("3. **Temporal Performance Stability**: Campaign performance maintains consistency across analyzed periods\n")
-            f.write("4. **Audience Targeting Effectiveness**: Current targeting strategies demonstrate above-benchmark performance\n\n")
-        
-        f.write("---\n\n")
-        
-        # Strategic Creative Recommendations
-        f.write("## V. Strategic Creative Development Plan\n\n")
-        f.write("### A. Creative Innovation Pipeline\n\n")
-        
-        if creatives and isinstance(creatives, dict) and 'creative_concepts' in creatives:
-            creative_concepts = creatives['creative_concepts']
-            if creative_concepts:
-                f.write("#### AI-Generated Creative Concepts\n\n")
-                for i, creative in enumerate(creative_concepts, 1):
-                    f.write(f"##### Creative Initiative #{i}\n\n")
-                    f.write("| Attribute | Details |\n")
-                    f.write("|-----------|----------|\n")
-                    f.write(f"| **Format** | {creative.get('type', 'Multi-format')} |\n")
-                    f.write(f"| **Core Concept** | {creative.get('concept', 'Innovative creative approach')} |\n")
-                    f.write(f"| **Strategic Rationale** | {creative.get('rationale', 'Data-driven creative optimization')} |\n")
-                    f.write(f"| **Target Audience** | {creative.get('audience', 'Primary segments')} |\n")
-                    f.write(f"| **Expected Impact** | {creative.get('impact', 'Performance improvement')} |\n\n")
-                    
-                    f.write("---\n\n")
-            else:
-                f.write("*AI-generated creative concepts are being processed with fallback creative strategy framework.*\n\n")
-        
-        # Always provide professional creative strategy
-        f.write("#### Professional Creative Strategy Framework\n\n")
-        f.write("Based on performance data analysis, implement these creative optimization strategies:\n\n")
-        
-        f.write("**1. High-Performance Format Scaling**\n")
-        f.write("- **Primary Focus**: Expand successful Carousel and Image formats\n")
-        f.write("- **Creative Elements**: Leverage top-performing visual themes and messaging\n")
-        f.write("- **Testing Variables**: Headlines, CTAs, visual compositions\n\n")
-        
-        f.write("**2. Underperforming Format Optimization**\n") 
-        f.write("- **Intervention Required**: Video creative refresh and UGC enhancement\n")
-        f.write("- **Optimization Strategy**: A/B test new creative approaches\n")
-        f.write("- **Success Metrics**: 15% CTR improvement, 10% ROAS increase\n\n")
-        
-        f.write("**3. Market-Specific Creative Adaptation**\n")
-        f.write("- **Geographic Customization**: Tailor messaging for regional preferences\n")
-        f.write("- **Cultural Relevance**: Adapt creative elements for local markets\n")
-        f.write("- **Performance Tracking**: Monitor regional creative performance variations\n\n")
-        
-        # Comprehensive Testing Strategy
-        f.write("### B. Advanced Testing & Optimization Framework\n\n")
-        
-        # Extract testing strategy from creatives if available
-        testing_strategy = creatives.get('testing_strategy', {}) if isinstance(creatives, dict) else {}
-        
-        f.write("#### Testing Protocol\n\n")
-        f.write("| Testing Phase | Duration | Budget Allocation | Success Criteria | Risk Mitigation |\n")
-        f.write("|---------------|----------|-------------------|------------------|------------------|\n")
-        f.write("| **Pilot Phase** | 7 days | 15% of budget | ROAS ≥ 4.0x, CTR ≥ 1.2% | 20% budget cap |\n")
-        f.write("| **Scale Phase** | 14 days | 35% of budget | ROAS ≥ 5.0x, CTR ≥ 1.5% | Performance monitoring |\n")
-        f.write("| **Optimization** | 21 days | 50% of budget | ROAS ≥ 6.0x, CTR ≥ 2.0% | Continuous refinement |\n\n")
-        
-        f.write("#### Key Performance Indicators (KPIs)\n\n")
-        f.write("**Primary Metrics:**\n")
-        f.write("- Return on Ad Spend (ROAS): Target ≥ 5.0x\n")
-        f.write("- Click-Through Rate (CTR): Target ≥ 1.5%\n")
-        f.write("- Cost Per Acquisition (CPA): Reduce by 15%\n")
-        f.write("- Conversion Rate: Improve by 10%\n\n")
-        
-        f.write("**Secondary Metrics:**\n")
-        f.write("- Brand Awareness Lift: +20%\n")
-        f.write("- Engagement Rate: +25%\n")
-        f.write("- Creative Recall: +30%\n")
-        f.write("- Customer Lifetime Value: Track and optimize\n\n")
-        
-        f.write("#### Risk Management & Contingency Planning\n\n")
-        f.write("- **Performance Monitoring**: Daily KPI tracking with automated alerts\n")
-        f.write("- **Budget Controls**: Automatic pause triggers for underperforming ads\n")
-        f.write("- **Creative Fatigue Detection**: Weekly creative performance analysis\n")
-        f.write("- **Market Response Tracking**: Real-time competitive analysis\n\n")
-        
-        f.write("---\n\n")
-        
-        # Detailed Performance Analytics
-        f.write("## VI. Detailed Performance Analytics\n\n")
-        f.write("### Creative Format Performance Matrix\n\n")
-        
-        # Use actual data if available, otherwise professional defaults
-        if 'top_performers' in data_results:
-            performers = data_results['top_performers']
-        else:
-            performers = [
-                {"creative_type": "Carousel", "roas": 6.18, "revenue": 1892537, "spend": 306136, "purchases": 53295, "ctr": 1.28, "cpc": 0.13},
-                {"creative_type": "Image", "roas": 6.13, "revenue": 4409417, "spend": 719101, "purchases": 121894, "ctr": 1.31, "cpc": 0.13},
-                {"creative_type": "UGC", "roas": 5.91, "revenue": 1932351, "spend": 327106, "purchases": 54263, "ctr": 1.34, "cpc": 0.14},
-                {"creative_type": "Video", "roas": 5.35, "revenue": 4031396, "spend": 753237, "purchases": 111692, "ctr": 1.18, "cpc": 0.15}
-            ]
-        
-        f.write("| Creative Format | ROAS | Revenue | Investment | Conversions | CTR | CPC | Performance Grade |\n")
-        f.write("|----------------|------|---------|------------|-------------|-----|-----|-------------------|\n")
-        
-        for performer in performers:
-            ctype = performer.get('creative_type', 'Unknown')
-            roas = performer.get('roas', 0)
-            revenue = performer.get('revenue', 0)
-            spend = performer.get('spend', 0)
-            purchases = performer.get('purchases', 0)
-            ctr = performer.get('ctr', 0)
-            cpc = performer.get('cpc', 0)
-            
-            # Calculate performance grade
-            if roas >= 6.0:
-                grade = "A+ Excellent"
-            elif roas >= 5.0:
-                grade = "A Good"
-            elif roas >= 4.0:
-                grade = "B Fair"
-            else:
-                grade = "C Needs Improvement"
-            
-            f.write(f"| **{ctype}** | {roas:.2f}x | ${revenue:,.0f} | ${spend:,.0f} | {purchases:,} | {ctr:.2f}% | ${cpc:.2f} | {grade} |\n")
-        
-        f.write("\n#### Performance Analysis Summary\n\n")
-        
-        # Calculate totals and insights
-        total_revenue = sum(p.get('revenue', 0) for p in performers)
-        total_spend = sum(p.get('spend', 0) for p in performers)
-        weighted_roas = total_revenue / total_spend if total_spend > 0 else 0
-        
-        f.write(f"- **Portfolio ROAS**: {weighted_roas:.2f}x (Weighted Average)\n")
-        f.write(f"- **Total Revenue Generated**: ${total_revenue:,.0f}\n")
-        f.write(f"- **Total Investment**: ${total_spend:,.0f}\n")
-        f.write(f"- **Portfolio Efficiency**: {(weighted_roas/5.0)*100:.0f}% of target (5.0x ROAS)\n\n")
-        
-        # Top performer analysis
-        top_performer = max(performers, key=lambda x: x.get('roas', 0))
-        f.write(f"**🏆 Top Performing Format**: {top_performer.get('creative_type')} with {top_performer.get('roas', 0):.2f}x ROAS\n\n")
-        
-        f.write("---\n\n")
-        
-        # Strategic Action Plan
-        f.write("## VII. Strategic Action Plan & Implementation Roadmap\n\n")
-        
-        f.write("### Immediate Actions (0-7 Days)\n\n")
-        f.write("#### 🚀 High-Priority Initiatives\n\n")
-        f.write("1. **Campaign Optimization**\n")
-        f.write("   - **Action**: Reallocate budget to top-performing creative formats\n")
-        f.write("   - **Target**: Increase investment in Carousel and Image formats by 25%\n")
-        f.write("   - **Expected Impact**: 15-20% ROAS improvement\n")
-        f.write("   - **Owner**: Campaign Manager\n")
-        f.write("   - **Timeline**: 2-3 days\n\n")
-        
-        f.write("2. **Underperforming Asset Review**\n")
-        f.write("   - **Action**: Audit and pause campaigns with ROAS < 3.0x\n")
-        f.write("   - **Target**: Reduce waste spend by $50K+ monthly\n")
-        f.write("   - **Expected Impact**: 10-15% efficiency gain\n")
-        f.write("   - **Owner**: Performance Manager\n")
-        f.write("   - **Timeline**: 1-2 days\n\n")
-        
-        f.write("3. **Creative Refresh Initiative**\n")
-        f.write("   - **Action**: Launch new creative variants for top-performing formats\n")
-        f.write("   - **Target**: Test 3-5 new creative concepts\n")
-        f.write("   - **Expected Impact**: Prevent creative fatigue, maintain CTR\n")
-        f.write("   - **Owner**: Creative Team\n")
-        f.write("   - **Timeline**: 5-7 days\n\n")
-        
-        f.write("### Medium-Term Strategy (1-4 Weeks)\n\n")
-        f.write("#### 📈 Growth & Optimization Initiatives\n\n")
-        f.write("1. **Advanced Audience Segmentation**\n")
-        f.write("   - Implement lookalike audience expansion\n")
-        f.write("   - Deploy behavioral targeting refinements\n")
-        f.write("   - Test interest-based audience combinations\n\n")
-        
-        f.write("2. **Creative Performance Enhancement**\n")
-        f.write("   - A/B testing protocol implementation\n")
-        f.write("   - Creative asset library expansion\n")
-        f.write("   - User-generated content integration\n\n")
-        
-        f.write("3. **Geographic Market Expansion**\n")
-        f.write("   - Scale successful campaigns to new markets\n")
-        f.write("   - Implement region-specific creative adaptations\n")
-        f.write("   - Establish market-specific KPI benchmarks\n\n")
-        
-        f.write("### Long-Term Vision (1-3 Months)\n\n")
-        f.write("#### 🎯 Strategic Objectives\n\n")
-        f.write("1. **Portfolio ROAS Target**: Achieve sustained 6.5x+ ROAS across all campaigns\n")
-        f.write("2. **Market Leadership**: Establish dominant position in target demographics\n")
-        f.write("3. **Innovation Pipeline**: Develop proprietary creative and targeting methodologies\n")
-        f.write("4. **Scalability Framework**: Build infrastructure for 3x campaign volume growth\n\n")
-        
-        f.write("### Success Metrics & KPI Dashboard\n\n")
-        f.write("| Timeframe | Primary KPI | Target | Current | Gap Analysis |\n")
-        f.write("|-----------|-------------|---------|---------|-------------|\n")
-        f.write("| **Week 1** | ROAS | 5.5x | 5.83x | ✅ Exceeding |\n")
-        f.write("| **Week 2** | CTR | 1.8% | 1.3% | 📈 +38% needed |\n")
-        f.write("| **Month 1** | CPA | $4.50 | $6.00 | 📉 -25% needed |\n")
-        f.write("| **Quarter 1** | Revenue | $15M | $12.3M | 📈 +22% needed |\n\n")
-        
-        f.write("---\n\n")
-        
-        # Professional Footer
-        f.write("## VIII. Report Conclusion & Next Review\n\n")
-        f.write("### Summary Assessment\n\n")
-        f.write("This comprehensive analysis reveals a **strong-performing campaign portfolio** with strategic optimization opportunities. ")
-        f.write("The current ROAS of 5.83x significantly exceeds industry benchmarks, while CTR performance indicates effective audience targeting. ")
-        f.write("Implementation of the recommended action plan is projected to deliver 15-25% performance improvements within 30 days.\n\n")
-        
-        f.write("### Recommended Review Cadence\n\n")
-        f.write("- **Daily**: KPI monitoring and performance alerts\n")
-        f.write("- **Weekly**: Tactical optimization and creative performance review\n")
-        f.write("- **Monthly**: Strategic portfolio analysis and competitive assessment\n")
-        f.write("- **Quarterly**: Comprehensive business impact evaluation\n\n")
-        
-        f.write("---\n\n")
-        
-        # Enhanced Footer
-        f.write("### Report Metadata\n\n")
-        f.write("| Attribute | Details |\n")
-        f.write("|-----------|----------|\n")
-        f.write(f"| **Analysis Engine** | Kasparro Multi-Agent AI System |\n")
-        f.write(f"| **AI Technology** | Google Gemini 1.5 Flash |\n")
-        f.write(f"| **Data Processing** | Advanced Multi-Level Analysis Framework |\n")
-        f.write(f"| **Report Standard** | Enterprise Performance Analytics v2.0 |\n")
-        f.write(f"| **Quality Assurance** | Statistical Validation & Evidence-Based Insights |\n")
-        f.write(f"| **Next Report** | {(datetime.now() + timedelta(days=7)).strftime('%B %d, %Y')} |\n\n")
-        
-        f.write("*This report contains proprietary analysis methodologies and strategic recommendations. ")
-        f.write("For questions or clarifications, contact the Analytics Team.*\n\n")
-        
-        f.write("---\n")
-        f.write(f"**Report Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}  \n")
-        f.write("**© 2025 Kasparro Analytics Platform - All Rights Reserved**")
+def generate_report(results, query, filepath, fmt='markdown'):
+    """Generate a comprehensive, professional report (markdown, html or json)"""
+    from src.reporting import write_report
+    write_report(results, query, filepath, fmt)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
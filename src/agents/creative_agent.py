@@ -3,15 +3,10 @@ Creative Agent - Generates new ad creative recommendations
 
 This agent creates new creative concepts based on performance insights.
 """
-import json
 from typing import Dict, Any, List
-import google.generativeai as genai
-import os
-from dotenv import load_dotenv
 from ..utils.prompt_manager import PromptManager
-from ..utils import convert_to_serializable
-
-load_dotenv()
+from ..utils.llm import create_model, generate, generate_async, parse_json_response
+from ..utils import to_json, to_prompt_data
 
 
 class CreativeAgent:
@@ -19,15 +14,10 @@ class CreativeAgent:
     
     def __init__(self, config: Dict[str, Any]):
         """Initialize the creative agent"""
-        genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-        self.model = genai.GenerativeModel(
-            model_name=config.get('model', 'gemini-1.5-flash'),
-            generation_config={
-                'temperature': 0.9,  # Higher temperature for creativity
-                'max_output_tokens': config.get('max_tokens', 2000),
-            }
-        )
+        self.model = create_model(config, temperature=0.9)  # Higher temperature for creativity
         self.prompt_manager = PromptManager()
+        self.timeout = config.get('llm_timeout')
+        self.prompt_encoding = config.get('prompt_encoding', 'json')
     
     def generate_creatives(self, insights: List[Dict[str, Any]], 
                           creative_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -41,47 +31,46 @@ class CreativeAgent:
         Returns:
             Dictionary with creative concepts and testing strategy
         """
+        full_prompt = self._build_prompt(insights, creative_data)
+        try:
+            response = generate(self.model, full_prompt, 'creative_agent')
+            return parse_json_response(response)
+        except Exception as e:
+            return self._fallback(e)
+    
+    async def generate_creatives_async(self, insights: List[Dict[str, Any]],
+                                       creative_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of generate_creatives (cancellation propagates, timeouts fall back)"""
+        full_prompt = self._build_prompt(insights, creative_data)
+        try:
+            response = await generate_async(self.model, full_prompt, 'creative_agent', timeout=self.timeout)
+            return parse_json_response(response)
+        except Exception as e:
+            return self._fallback(e)
+    
+    def _build_prompt(self, insights: List[Dict[str, Any]], creative_data: Dict[str, Any]) -> str:
         # Convert numpy types and load prompt template
-        serializable_insights = convert_to_serializable(insights)
-        serializable_creative_data = convert_to_serializable(creative_data)
-        
         prompt = self.prompt_manager.get_filled_prompt(
             'creative_agent',
-            insights=json.dumps(serializable_insights, indent=2),
-            creative_data=json.dumps(serializable_creative_data, indent=2)
+            insights=to_json(insights, label='insights'),
+            creative_data=to_prompt_data(creative_data, label='creative_data', encoding=self.prompt_encoding)
         )
         
         system_instruction = "You are a creative strategist for Facebook ads. Always return valid JSON."
-        full_prompt = f"{system_instruction}\n\n{prompt}"
-        
-        try:
-            response = self.model.generate_content(full_prompt)
-            
-            # Extract JSON from response
-            response_text = response.text.strip()
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]
-            if response_text.startswith('```'):
-                response_text = response_text[3:]
-            if response_text.endswith('```'):
-                response_text = response_text[:-3]
-            response_text = response_text.strip()
-            
-            result = json.loads(response_text)
-            
-            return result
-            
-        except Exception as e:
-            print(f"Error generating creatives: {e}")
-            return {
-                'creative_concepts': [],
-                'testing_strategy': {
-                    'duration': '7-14 days',
-                    'success_metrics': ['ROAS > 5.0', 'CTR > 1.5%'],
-                    'iteration_plan': 'Test and refine based on results'
-                },
-                'error': str(e)
-            }
+        return f"{system_instruction}\n\n{prompt}"
+    
+    @staticmethod
+    def _fallback(e: Exception) -> Dict[str, Any]:
+        print(f"Error generating creatives: {e}")
+        return {
+            'creative_concepts': [],
+            'testing_strategy': {
+                'duration': '7-14 days',
+                'success_metrics': ['ROAS > 5.0', 'CTR > 1.5%'],
+                'iteration_plan': 'Test and refine based on results'
+            },
+            'error': str(e)
+        }
 
 
 def generate_creative_recommendations(config: Dict[str, Any], 
@@ -1,27 +1,204 @@
 """
 Data Agent - Handles all data querying and filtering operations
 """
+import json
+import os
+import threading
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
+from ..analytics import anomalies, bootstrap, budget, query_engine
+from ..analytics.metrics import SUMMED_MEASURES, derive_metrics, period_metrics
+from ..analytics.text_index import MessageIndex
+from ..utils.cache import AggregateCache, dataset_fingerprint, get_cache, memoized
+from ..utils.partitions import PartitionedDataset, is_partitioned
+from ..utils.profiling import span, traced
+from ..utils.records import RecordTable
+from ..utils.validation import load_validated, quality_summary
+
+# Measures and derived metrics that plans may request
+METRIC_COLUMNS = ['spend', 'impressions', 'clicks', 'purchases', 'revenue', 'ctr', 'roas', 'cpc', 'cpa']
+
+# Plan filter keys and the columns they apply to
+FILTER_COLUMNS = {
+    'campaign': 'campaign_name',
+    'adset': 'adset_name',
+    'creative_type': 'creative_type',
+    'platform': 'platform',
+    'country': 'country',
+    'audience_type': 'audience_type'
+}
+# Accepted filter values (alone or in a list); bool is excluded as it never names a segment
+FILTER_SCALARS = (str, int, float)
+
+# Analysis levels a plan can request, mapped to their data_results section
+ANALYSIS_LEVELS = {
+    'summary': 'summary',
+    'period_comparison': 'recent_trends',
+    'campaign': 'campaign_level',
+    'adset': 'adset_level',
+    'audience': 'audience_level',
+    'creative': 'creative_level',
+    'geo': 'geo_level',
+    'rolling_trends': 'rolling_trends',
+    'top_performers': 'top_performers',
+    'anomalies': 'anomalies',
+    'budget': 'budget_simulation',
+    'query': 'query_results'
+}
+
+# Used when a plan does not say what it needs: compute everything (ad-hoc queries need a spec)
+DEFAULT_ANALYSES = [{'level': level} for level in ANALYSIS_LEVELS if level != 'query']
 
 
 class DataAgent:
-    def __init__(self, csv_path: str):
-        """Initialize the data agent with CSV data"""
-        self.df = pd.read_csv(csv_path)
-        self.df['date'] = pd.to_datetime(self.df['date'])
+    def __init__(self, csv_path: str, cache: Optional[AggregateCache] = None,
+                 random_seed: int = bootstrap.DEFAULT_SEED):
+        """
+        Initialize the data agent with CSV data
+        
+        The CSV is parsed lazily on first access to ``df`` so that fully
+        cached runs never pay the load cost. A partitioned dataset directory
+        (see ``src.utils.partitions``) is read per partition: time-windowed
+        and campaign-filtered analyses only read the partitions they touch
+        until something needs the full history.
+        
+        Args:
+            csv_path: Path to the ads CSV or a partitioned dataset directory
+            cache: Optional aggregate cache used to memoize analysis methods
+            random_seed: Seed for bootstrap confidence intervals (config random_seed)
+        """
+        self.csv_path = csv_path
+        self.cache = cache
+        self.random_seed = random_seed
+        self.dataset = PartitionedDataset(csv_path) if is_partitioned(csv_path) else None
+        self.fingerprint = self.dataset.fingerprint if self.dataset else dataset_fingerprint(csv_path)
+        self._df: Optional[pd.DataFrame] = None
+        self._message_index: Optional[MessageIndex] = None
+        self._column_store: Optional[query_engine.ColumnStore] = None
+        self._quarantine: Optional[pd.DataFrame] = None
+        self._quality: Optional[Dict[str, Any]] = None
+        # Guards lazy loading when analyses run in worker threads (execute_async)
+        self._load_lock = threading.RLock()
+    
+    def cache_key_extras(self) -> Dict[str, Any]:
+        """Settings besides the call arguments that change memoized results"""
+        return {'random_seed': self.random_seed}
+    
+    @property
+    def df(self) -> pd.DataFrame:
+        """The loaded ads DataFrame"""
+        if self._df is None:
+            with self._load_lock:
+                if self._df is None and self.dataset is not None:
+                    self._df = self._read_partitions()
+                    self.dataset.release()
+                elif self._df is None:
+                    with span('DataAgent.load_csv', 'data_agent', path=str(self.csv_path)) as current:
+                        df, self._quarantine, self._quality = load_validated(self.csv_path)
+                        current.set(bytes_in=os.path.getsize(self.csv_path),
+                                    bytes_out=int(df.memory_usage(deep=False).sum()), rows=len(df),
+                                    quarantined=self._quality['rows_quarantined'])
+                    self._df = df
+        return self._df
+    
+    @property
+    def quality_report(self) -> Dict[str, Any]:
+        """Validation report of the loaded data (rule counts, imputations, warnings)"""
+        if self.dataset is not None:
+            return self.dataset.manifest.get('quality') or {}
+        self.df
+        return self._quality
+    
+    @property
+    def quarantine(self) -> pd.DataFrame:
+        """Rows rejected by validation, with a 'quarantine_reason' column"""
+        if self.dataset is not None:
+            return self.dataset.read_quarantine()
+        self.df
+        return self._quarantine
+    
+    @property
+    def message_index(self) -> MessageIndex:
+        """Interned creative messages with a term inverted index (built once)"""
+        if self._message_index is None:
+            with self._load_lock:
+                if self._message_index is None:
+                    with span('DataAgent.build_message_index', 'data_agent') as current:
+                        index = MessageIndex(self.df['creative_message'])
+                        current.set(messages=index.size, terms=len(index.terms))
+                    self._message_index = index
+        return self._message_index
+    
+    @property
+    def column_store(self) -> query_engine.ColumnStore:
+        """Column arrays with dictionary-encoded dimensions for ad-hoc queries (built once)"""
+        if self._column_store is None:
+            with self._load_lock:
+                if self._column_store is None:
+                    self._column_store = query_engine.ColumnStore(self.df)
+        return self._column_store
+    
+    @property
+    def _partitions_only(self) -> bool:
+        """Whether reads should go to dataset partitions (full frame not loaded yet)"""
+        return self.dataset is not None and self._df is None
+    
+    def _read_partitions(self, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None,
+                         campaign: Any = None) -> pd.DataFrame:
+        """Rows of the partitions a date range / campaign filter touches"""
+        with span('DataAgent.read_partitions', 'data_agent', path=str(self.csv_path)) as current:
+            read_before, bytes_before = self.dataset.partitions_read, self.dataset.bytes_read
+            df = self.dataset.read(start, end, campaign)
+            current.set(partitions=len(self.dataset.prune(start, end, campaign)),
+                        partitions_read=self.dataset.partitions_read - read_before,
+                        bytes_in=self.dataset.bytes_read - bytes_before, rows=len(df))
+        return df
+    
+    def max_date(self) -> pd.Timestamp:
+        """Last date in the data (from the manifest when partitioned)"""
+        return self.dataset.max_date if self._partitions_only else self.df['date'].max()
+    
+    def _row_positions(self, df: pd.DataFrame):
+        """Positions of a selection's rows in the full frame (None when it is the full frame)"""
+        return None if df is self.df else self.df.index.get_indexer(df.index)
         
     def get_date_range_data(self, days: int = 7, end_date: Optional[str] = None) -> pd.DataFrame:
         """Get data for the last N days"""
         if end_date:
             end = pd.to_datetime(end_date)
         else:
-            end = self.df['date'].max()
+            end = self.max_date()
         
         start = end - timedelta(days=days)
+        if self._partitions_only:
+            return self._read_partitions(start, end)
         return self.df[(self.df['date'] >= start) & (self.df['date'] <= end)]
     
+    def _apply_filters(self, df: pd.DataFrame, filters: Optional[Dict[str, Any]]) -> pd.DataFrame:
+        """Apply plan-style dimension filters (scalar or list values)"""
+        for key, value in (filters or {}).items():
+            column = FILTER_COLUMNS.get(key, key)
+            if column not in df.columns or value in (None, '', []):
+                continue
+            if isinstance(value, (list, tuple)):
+                df = df[df[column].isin(value)]
+            elif column == 'campaign_name':
+                df = df[df[column].str.contains(str(value), case=False, na=False, regex=False)]
+            else:
+                df = df[df[column] == value]
+        return df
+    
+    def _select(self, days: Optional[int] = None, filters: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Rows in the lookback window that match the filters"""
+        campaign = (filters or {}).get('campaign', (filters or {}).get('campaign_name'))
+        if self._partitions_only and (days or campaign not in (None, '', [])):
+            end = self.max_date()
+            df = self._read_partitions(end - timedelta(days=days) if days else None, end, campaign)
+        else:
+            df = self.get_date_range_data(days=days) if days else self.df
+        return self._apply_filters(df, filters)
+    
     def filter_by_dimensions(self, 
                             campaign: Optional[str] = None,
                             creative_type: Optional[str] = None,
@@ -29,23 +206,16 @@ class DataAgent:
                             country: Optional[str] = None,
                             audience_type: Optional[str] = None) -> pd.DataFrame:
         """Filter data by various dimensions"""
-        filtered = self.df.copy()
-        
-        if campaign:
-            filtered = filtered[filtered['campaign_name'].str.contains(campaign, case=False, na=False)]
-        if creative_type:
-            filtered = filtered[filtered['creative_type'] == creative_type]
-        if platform:
-            filtered = filtered[filtered['platform'] == platform]
-        if country:
-            filtered = filtered[filtered['country'] == country]
-        if audience_type:
-            filtered = filtered[filtered['audience_type'] == audience_type]
-            
-        return filtered
+        return self._apply_filters(self.df.copy(), {
+            'campaign': campaign,
+            'creative_type': creative_type,
+            'platform': platform,
+            'country': country,
+            'audience_type': audience_type
+        })
     
     def get_aggregated_metrics(self, df: pd.DataFrame, group_by: List[str]) -> pd.DataFrame:
-        """Aggregate metrics by specified dimensions"""
+        """Aggregate metrics by specified dimensions, with bootstrap intervals for roas and ctr"""
         agg_dict = {
             'spend': 'sum',
             'impressions': 'sum',
@@ -54,72 +224,114 @@ class DataAgent:
             'revenue': 'sum'
         }
         
-        result = df.groupby(group_by, dropna=False).agg(agg_dict).reset_index()
+        grouped = df.groupby(group_by, dropna=False)
+        result = self._add_derived_metrics(grouped.agg(agg_dict).reset_index())
         
-        # Calculate derived metrics
-        result['ctr'] = (result['clicks'] / result['impressions'] * 100).round(4)
-        result['roas'] = (result['revenue'] / result['spend']).round(2)
-        result['cpc'] = (result['spend'] / result['clicks']).round(2)
-        result['cpa'] = (result['spend'] / result['purchases']).round(2)
-        
-        # Handle infinities and NaN
-        result = result.replace([float('inf'), float('-inf')], 0)
-        result = result.fillna(0)
+        with span('DataAgent.bootstrap_intervals', 'data_agent', segments=len(result)):
+            intervals = bootstrap.segment_intervals(df, grouped.ngroup().to_numpy(), len(result), seed=self.random_seed)
+        for name, values in intervals.items():
+            result[name] = values
+        return result
+    
+    @staticmethod
+    def _add_derived_metrics(result: pd.DataFrame) -> pd.DataFrame:
+        """Add ctr/roas/cpc/cpa to summed measures"""
+        # Zero denominators come out as 0 from the kernel, so no inf/NaN pass over the frame
+        measures = [column for column in SUMMED_MEASURES if column in result.columns]
+        result[measures] = result[measures].fillna(0)
+        for name, values in derive_metrics(result).items():
+            result[name] = values
         
         return result
     
-    def get_campaign_level_analysis(self) -> Dict[str, Any]:
+    @traced('data_agent')
+    @memoized
+    def get_campaign_level_analysis(self, days: Optional[int] = None,
+                                    filters: Optional[Dict[str, Any]] = None,
+                                    rank_by: str = 'roas') -> Dict[str, Any]:
         """Campaign-level performance analysis"""
-        campaign_agg = self.get_aggregated_metrics(self.df, ['campaign_name'])
+        campaign_agg = self.get_aggregated_metrics(self._select(days, filters), ['campaign_name'])
+        table = RecordTable.from_frame(campaign_agg)
         return {
-            'campaign_performance': campaign_agg.to_dict('records'),
-            'top_campaigns': campaign_agg.nlargest(5, 'roas').to_dict('records'),
-            'bottom_campaigns': campaign_agg.nsmallest(5, 'roas').to_dict('records')
+            'campaign_performance': table,
+            'top_campaigns': table.take(campaign_agg.nlargest(5, rank_by).index),
+            'bottom_campaigns': table.take(campaign_agg.nsmallest(5, rank_by).index)
         }
     
-    def get_adset_level_analysis(self) -> Dict[str, Any]:
+    @traced('data_agent')
+    @memoized
+    def get_adset_level_analysis(self, days: Optional[int] = None,
+                                 filters: Optional[Dict[str, Any]] = None,
+                                 rank_by: str = 'roas') -> Dict[str, Any]:
         """Adset-level performance analysis"""
-        adset_agg = self.get_aggregated_metrics(self.df, ['campaign_name', 'adset_name'])
+        adset_agg = self.get_aggregated_metrics(self._select(days, filters), ['campaign_name', 'adset_name'])
+        table = RecordTable.from_frame(adset_agg)
         return {
-            'adset_performance': adset_agg.to_dict('records'),
-            'top_adsets': adset_agg.nlargest(10, 'roas').to_dict('records'),
-            'bottom_adsets': adset_agg.nsmallest(10, 'roas').to_dict('records')
+            'adset_performance': table,
+            'top_adsets': table.take(adset_agg.nlargest(10, rank_by).index),
+            'bottom_adsets': table.take(adset_agg.nsmallest(10, rank_by).index)
         }
     
-    def get_audience_level_analysis(self) -> Dict[str, Any]:
+    @traced('data_agent')
+    @memoized
+    def get_audience_level_analysis(self, days: Optional[int] = None,
+                                    filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Audience-level performance analysis"""
-        audience_agg = self.get_aggregated_metrics(self.df, ['audience_type'])
+        audience_agg = RecordTable.from_frame(self.get_aggregated_metrics(self._select(days, filters), ['audience_type']))
+        # Aliased sections share one table
         return {
-            'audience_performance': audience_agg.to_dict('records'),
-            'audience_comparison': audience_agg.to_dict('records')
+            'audience_performance': audience_agg,
+            'audience_comparison': audience_agg
         }
     
-    def get_creative_level_analysis(self) -> Dict[str, Any]:
+    @traced('data_agent')
+    @memoized
+    def get_creative_level_analysis(self, days: Optional[int] = None,
+                                    filters: Optional[Dict[str, Any]] = None,
+                                    rank_by: str = 'roas') -> Dict[str, Any]:
         """Creative-level detailed analysis"""
+        df = self._select(days, filters)
+        
         # Creative type analysis
-        creative_type_agg = self.get_aggregated_metrics(self.df, ['creative_type'])
+        creative_type_agg = self.get_aggregated_metrics(df, ['creative_type'])
         
-        # Creative message analysis (top performing messages)
-        message_agg = self.get_aggregated_metrics(self.df, ['creative_message'])
-        top_messages = message_agg.nlargest(10, 'roas')
+        # Creative message analysis over interned message ids (no string hashing per row)
+        if self._partitions_only:
+            # Index just the rows read from partitions rather than loading the full history
+            index, positions = MessageIndex(df['creative_message']), None
+        else:
+            index, positions = self.message_index, self._row_positions(df)
+        totals = index.message_totals(df, positions)
+        used = totals['rows'] > 0
+        message_agg = self._add_derived_metrics(pd.DataFrame(
+            {'creative_message': index.messages[used], **{measure: totals[measure][used] for measure in totals if measure != 'rows'}}
+        ).sort_values('creative_message', ignore_index=True))
+        messages = RecordTable.from_frame(message_agg)
         
         return {
-            'creative_type_performance': creative_type_agg.to_dict('records'),
-            'top_creative_messages': top_messages.to_dict('records'),
-            'creative_message_signals': message_agg.to_dict('records')
+            'creative_type_performance': RecordTable.from_frame(creative_type_agg),
+            'top_creative_messages': messages.take(message_agg.nlargest(10, rank_by).index),
+            'creative_message_signals': messages,
+            'message_themes': index.theme_performance(totals, rank_by=rank_by)
         }
     
-    def get_geo_level_analysis(self) -> Dict[str, Any]:
+    @traced('data_agent')
+    @memoized
+    def get_geo_level_analysis(self, days: Optional[int] = None,
+                               filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Geographic-level performance analysis"""
-        country_agg = self.get_aggregated_metrics(self.df, ['country'])
+        country_agg = RecordTable.from_frame(self.get_aggregated_metrics(self._select(days, filters), ['country']))
         return {
-            'country_performance': country_agg.to_dict('records'),
-            'geo_roas_patterns': country_agg.to_dict('records')
+            'country_performance': country_agg,
+            'geo_roas_patterns': country_agg
         }
     
-    def get_rolling_trends(self, window: int = 7) -> Dict[str, Any]:
+    @traced('data_agent')
+    @memoized
+    def get_rolling_trends(self, window: int = 7, days: Optional[int] = None,
+                           filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Get rolling trends analysis"""
-        df_sorted = self.df.sort_values('date')
+        df_sorted = self._select(days, filters).sort_values('date')
         
         # 7-day rolling ROAS
         daily_metrics = df_sorted.groupby('date').agg({
@@ -130,9 +342,10 @@ class DataAgent:
             'purchases': 'sum'
         }).reset_index()
         
-        # Handle division by zero
-        daily_metrics['roas'] = daily_metrics.apply(lambda x: x['revenue'] / x['spend'] if x['spend'] > 0 else 0, axis=1)
-        daily_metrics['ctr'] = daily_metrics.apply(lambda x: (x['clicks'] / x['impressions'] * 100) if x['impressions'] > 0 else 0, axis=1)
+        # Unrounded daily ratios (0 on days without spend/impressions) feed the rolling means
+        ratios = derive_metrics(daily_metrics, ('roas', 'ctr'), rounded=False)
+        daily_metrics['roas'] = ratios['roas']
+        daily_metrics['ctr'] = ratios['ctr']
         
         # Rolling averages (only if we have enough data)
         if len(daily_metrics) >= window:
@@ -159,17 +372,22 @@ class DataAgent:
             ctr_trend = 'insufficient_data'
         
         return {
-            'daily_trends': daily_metrics.to_dict('records'),
+            'daily_trends': RecordTable.from_frame(daily_metrics),
             'roas_trend_direction': roas_trend,
             'ctr_trend_direction': ctr_trend
         }
     
+    @traced('data_agent')
+    @memoized
     def get_top_performers(self, metric: str = 'roas', n: int = 10, 
-                          group_by: str = 'creative_type') -> pd.DataFrame:
+                          group_by: str = 'creative_type', days: Optional[int] = None,
+                          filters: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
         """Get top performing segments"""
-        aggregated = self.get_aggregated_metrics(self.df, [group_by])
+        aggregated = self.get_aggregated_metrics(self._select(days, filters), [group_by])
         return aggregated.nlargest(n, metric)
     
+    @traced('data_agent')
+    @memoized
     def get_bottom_performers(self, metric: str = 'roas', n: int = 10,
                              group_by: str = 'creative_type') -> pd.DataFrame:
         """Get worst performing segments"""
@@ -178,32 +396,27 @@ class DataAgent:
         aggregated = aggregated[aggregated[metric] > 0]
         return aggregated.nsmallest(n, metric)
     
-    def compare_periods(self, current_days: int = 7, previous_days: int = 7) -> Dict[str, Any]:
+    @traced('data_agent')
+    @memoized
+    def compare_periods(self, current_days: int = 7, previous_days: int = 7,
+                        filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Compare current period vs previous period"""
-        end_date = self.df['date'].max()
+        end_date = self.max_date()
+        # Only the two periods are read (both bounds are exclusive below)
+        df = self._select(current_days + previous_days, filters)
         
         # Current period
         current_start = end_date - timedelta(days=current_days)
-        current_df = self.df[self.df['date'] > current_start]
+        current_df = df[df['date'] > current_start]
         
         # Previous period
         previous_end = current_start
         previous_start = previous_end - timedelta(days=previous_days)
-        previous_df = self.df[(self.df['date'] > previous_start) & (self.df['date'] <= previous_end)]
+        previous_df = df[(df['date'] > previous_start) & (df['date'] <= previous_end)]
         
-        def get_metrics(df):
-            return {
-                'spend': df['spend'].sum(),
-                'revenue': df['revenue'].sum(),
-                'roas': df['revenue'].sum() / df['spend'].sum() if df['spend'].sum() > 0 else 0,
-                'impressions': df['impressions'].sum(),
-                'clicks': df['clicks'].sum(),
-                'purchases': df['purchases'].sum(),
-                'ctr': (df['clicks'].sum() / df['impressions'].sum() * 100) if df['impressions'].sum() > 0 else 0
-            }
-        
-        current_metrics = get_metrics(current_df)
-        previous_metrics = get_metrics(previous_df)
+        # Each measure is summed once per period
+        current_metrics = period_metrics(current_df[SUMMED_MEASURES].sum())
+        previous_metrics = period_metrics(previous_df[SUMMED_MEASURES].sum())
         
         # Calculate changes
         changes = {}
@@ -220,8 +433,124 @@ class DataAgent:
             'changes': changes
         }
     
+    @traced('data_agent')
+    @memoized
+    def detect_anomalies(self, days: Optional[int] = None, filters: Optional[Dict[str, Any]] = None,
+                         metrics: Optional[List[str]] = None, recent_days: int = 7,
+                         top_n: int = 20) -> Dict[str, Any]:
+        """
+        Flag campaigns, adsets and creatives whose spend, CTR or ROAS shifted recently
+        
+        Args:
+            days: Lookback window (None = full history, which gives the best baseline)
+            filters: Plan-style dimension filters
+            metrics: Subset of 'spend', 'ctr', 'roas' (None = all three)
+            recent_days: Size of the recent window compared against the baseline
+            top_n: Number of ranked flags to return
+            
+        Returns:
+            Ranked anomaly flags (z-score, slope and CUSUM change-point tests)
+        """
+        metrics = [m for m in metrics or [] if m in anomalies.DETECTION_METRICS] or list(anomalies.DETECTION_METRICS)
+        return anomalies.detect_anomalies(self._select(days, filters), metrics=metrics,
+                                          recent_days=recent_days, top_n=top_n)
+    
+    @traced('data_agent')
+    @memoized
+    def response_curves(self, group_by: str = 'creative_type', days: Optional[int] = None,
+                        filters: Optional[Dict[str, Any]] = None) -> budget.ResponseCurves:
+        """
+        Fitted spend -> revenue curves per segment (see src/analytics/budget.py)
+        
+        Args:
+            group_by: Dimension to allocate across (one of budget.BUDGET_DIMENSIONS)
+            days: Lookback window (None = full history)
+            filters: Plan-style dimension filters
+            
+        Returns:
+            ResponseCurves; predictions and allocations on it are array math only
+        """
+        return budget.fit_response_curves(self._select(days, filters), budget.segment_keys(group_by))
+    
+    @traced('data_agent')
+    def simulate_budget(self, group_by: str = 'creative_type', daily_budget: Optional[float] = None,
+                        days: Optional[int] = None, filters: Optional[Dict[str, Any]] = None,
+                        multipliers: Optional[List[float]] = None,
+                        max_change: float = budget.MAX_CHANGE) -> Dict[str, Any]:
+        """
+        What-if budget reallocation across segments
+        
+        Curves are fitted once per (group_by, days, filters) and cached, so
+        repeated simulations with other budgets take milliseconds.
+        
+        Args:
+            group_by: Dimension to allocate across
+            daily_budget: Daily budget to allocate (None = current daily spend)
+            days: Lookback window for the fit
+            filters: Plan-style dimension filters
+            multipliers: Budget scenarios as multiples of current daily spend
+            max_change: Allowed relative move of a segment's budget share
+            
+        Returns:
+            Current vs reallocated predicted revenue/ROAS, per-segment
+            recommended spend and a budget scenario sweep
+        """
+        curves = self.response_curves(group_by, days, filters)
+        report = budget.budget_report(curves, daily_budget, multipliers or budget.BUDGET_MULTIPLIERS, max_change)
+        report['group_by'] = group_by
+        report['segments'] = RecordTable.from_frame(report['segments'])
+        report['scenarios'] = RecordTable.from_frame(report['scenarios'])
+        return report
+    
+    @traced('data_agent')
+    @memoized
+    def query(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run an ad-hoc structured query on the column store
+        
+        Args:
+            spec: Query spec with optional ``dimensions``, ``measures``,
+                ``filters`` (dimension values, or comparison dicts on measures
+                and dates), ``window_days``, ``sort`` and ``limit``
+            
+        Returns:
+            Normalized query, result rows and scan statistics
+        """
+        window_days = query_engine.normalize_query(spec).get('window_days')
+        if self._partitions_only and window_days:
+            # Only the window's partitions are read and encoded
+            end = self.max_date()
+            store = query_engine.ColumnStore(self._read_partitions(end - timedelta(days=window_days), end))
+            return query_engine.execute(store, spec)
+        return query_engine.execute(self.column_store, spec)
+    
+    @staticmethod
+    def _overall_totals(totals: Dict[str, Any]) -> Dict[str, Any]:
+        """Summary spend/revenue/roas from the two summed measures"""
+        return {
+            'total_spend': round(float(totals['spend']), 2),
+            'total_revenue': round(float(totals['revenue']), 2),
+            'overall_roas': float(derive_metrics(totals, ('roas',))['roas'])
+        }
+    
+    @traced('data_agent')
+    @memoized
     def get_data_summary(self) -> Dict[str, Any]:
         """Get overall data summary"""
+        if self._partitions_only:
+            # Answered from the manifest statistics without reading any partition
+            dataset = self.dataset
+            return {
+                'total_rows': dataset.num_rows,
+                'date_range': {
+                    'start': dataset.min_date.strftime('%Y-%m-%d'),
+                    'end': dataset.max_date.strftime('%Y-%m-%d')
+                },
+                'campaigns': len(dataset.campaigns()),
+                **self._overall_totals({column: dataset.column_sum(column) for column in ('spend', 'revenue')}),
+                'missing_values': dataset.null_counts(),
+                'data_quality': quality_summary(self.quality_report)
+            }
         return {
             'total_rows': len(self.df),
             'date_range': {
@@ -229,22 +558,211 @@ class DataAgent:
                 'end': self.df['date'].max().strftime('%Y-%m-%d')
             },
             'campaigns': self.df['campaign_name'].nunique(),
-            'total_spend': round(self.df['spend'].sum(), 2),
-            'total_revenue': round(self.df['revenue'].sum(), 2),
-            'overall_roas': round(self.df['revenue'].sum() / self.df['spend'].sum(), 2),
-            'missing_values': self.df.isnull().sum().to_dict()
+            **self._overall_totals(self.df[['spend', 'revenue']].sum()),
+            'missing_values': self.df.isnull().sum().to_dict(),
+            'data_quality': quality_summary(self.quality_report)
         }
+    
+    @traced('data_agent')
+    def run_analyses(self, analyses: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """
+        Compute only the analyses a plan asks for
+        
+        Args:
+            analyses: Plan ``analyses`` entries, e.g.
+                ``{"level": "geo", "metrics": ["ctr"], "window_days": 7}``.
+                Missing or empty means every level (the pre-plan behaviour).
+        
+        Returns:
+            data_results dictionary keyed by section name; ``summary`` is
+            always included
+        """
+        results = {'summary': self.get_data_summary()}
+        
+        for spec in normalize_analyses(analyses):
+            if spec['level'] == 'summary':
+                continue
+            section = ANALYSIS_LEVELS[spec['level']]
+            key, suffix = section, 2
+            while key in results:
+                key, suffix = f"{section}_{suffix}", suffix + 1
+            
+            output = self._run_analysis(spec)
+            if spec.get('metrics') and spec['level'] != 'budget':
+                output = _project_metrics(output, set(spec['metrics']))
+            results[key] = output
+        
+        return results
+    
+    def _run_analysis(self, spec: Dict[str, Any]) -> Any:
+        """Dispatch a single normalized analysis spec"""
+        level = spec['level']
+        days = spec.get('window_days')
+        filters = spec.get('filters')
+        ranked = [m for m in spec.get('metrics', []) if m in ('roas', 'ctr')]
+        rank_by = ranked[0] if ranked else 'roas'
+        
+        if level == 'period_comparison':
+            return self.compare_periods(current_days=days or 7, previous_days=days or 7, filters=filters)
+        if level == 'rolling_trends':
+            return self.get_rolling_trends(window=spec.get('rolling_window', 7), days=days, filters=filters)
+        if level == 'top_performers':
+            return self.get_top_performers(metric=rank_by, group_by=spec.get('group_by', 'creative_type'),
+                                           days=days, filters=filters).pipe(RecordTable.from_frame)
+        if level == 'query':
+            return self.query({k: v for k, v in spec.items() if k != 'level'})
+        if level == 'budget':
+            return self.simulate_budget(group_by=spec.get('group_by', 'creative_type'), days=days, filters=filters)
+        if level == 'anomalies':
+            # window_days is the recent window; the rest of the history is the baseline
+            return self.detect_anomalies(filters=filters, metrics=spec.get('metrics'), recent_days=days or 7)
+        if level in ('audience', 'geo'):
+            return getattr(self, f'get_{level}_level_analysis')(days=days, filters=filters)
+        return getattr(self, f'get_{level}_level_analysis')(days=days, filters=filters, rank_by=rank_by)
+
+
+def _clean_filters(filters: Any) -> Dict[str, Any]:
+    """Known filter columns whose values are scalars or lists of scalars (anything else is dropped)"""
+    clean = {}
+    for key, value in (filters.items() if isinstance(filters, dict) else []):
+        if key not in FILTER_COLUMNS and key not in FILTER_COLUMNS.values():
+            continue
+        if isinstance(value, (list, tuple)):
+            value = [item for item in value if isinstance(item, FILTER_SCALARS) and not isinstance(item, bool)]
+        elif not isinstance(value, FILTER_SCALARS) or isinstance(value, bool):
+            continue
+        if value not in ('', []):
+            clean[key] = value
+    return clean
+
+
+def normalize_analyses(analyses: Optional[List[Any]]) -> List[Dict[str, Any]]:
+    """
+    Validate plan analysis specs, dropping anything the Data Agent can't compute
+    
+    Args:
+        analyses: Raw ``analyses`` list from the planner (strings or dicts)
+        
+    Returns:
+        List of clean specs; falls back to DEFAULT_ANALYSES when nothing usable remains
+    """
+    normalized = []
+    for spec in analyses or []:
+        if isinstance(spec, str):
+            spec = {'level': spec}
+        if not isinstance(spec, dict):
+            continue
+        level = str(spec.get('level', '')).lower()
+        if level not in ANALYSIS_LEVELS:
+            continue
+        
+        if level == 'query':
+            # Query specs carry their own measures and filters (including HAVING-style bounds)
+            normalized.append(dict(query_engine.normalize_query(spec), level=level))
+            continue
+        
+        entry: Dict[str, Any] = {'level': level}
+        metrics = [m for m in spec.get('metrics') or [] if m in METRIC_COLUMNS]
+        if metrics:
+            entry['metrics'] = metrics
+        try:
+            window_days = int(spec.get('window_days') or 0)
+        except (TypeError, ValueError):
+            window_days = 0
+        if window_days > 0:
+            entry['window_days'] = window_days
+        filters = _clean_filters(spec.get('filters'))
+        if filters:
+            entry['filters'] = filters
+        if level == 'top_performers' and spec.get('group_by') in FILTER_COLUMNS.values():
+            entry['group_by'] = spec['group_by']
+        if level == 'budget':
+            group_by = spec.get('group_by')
+            group_by = FILTER_COLUMNS.get(group_by, group_by) if isinstance(group_by, str) else None
+            if group_by in budget.BUDGET_DIMENSIONS:
+                entry['group_by'] = group_by
+        if level == 'rolling_trends' and isinstance(spec.get('rolling_window'), int) and spec['rolling_window'] > 0:
+            entry['rolling_window'] = spec['rolling_window']
+        normalized.append(entry)
+    
+    return normalized or [dict(spec) for spec in DEFAULT_ANALYSES]
+
+
+def insight_payload(data_results: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Data sent to the Insight Agent
+    
+    When anomaly detection flagged segments, the flags replace the raw
+    per-day trend table (the largest section) so the LLM reads ranked
+    numeric findings instead of eyeballing daily rows.
+    
+    Args:
+        data_results: Output of run_analyses
+        
+    Returns:
+        data_results, minus daily trend rows when anomaly flags exist
+    """
+    if not any(key.startswith('anomalies') and section.get('flags')
+               for key, section in data_results.items() if isinstance(section, dict)):
+        return data_results
+    payload = {}
+    for key, section in data_results.items():
+        if key.startswith('rolling_trends') and isinstance(section, dict):
+            section = {k: v for k, v in section.items() if k != 'daily_trends'}
+        payload[key] = section
+    return payload
+
+
+def _metric_name(key: str) -> Optional[str]:
+    """Base metric for a result key (e.g. 'roas_change_pct' -> 'roas'), or None"""
+    if key in METRIC_COLUMNS:
+        return key
+    for suffix in ('_change_pct', '_7d_rolling', '_ci_low', '_ci_high'):
+        if key.endswith(suffix) and key[:-len(suffix)] in METRIC_COLUMNS:
+            return key[:-len(suffix)]
+    return None
 
 
-def execute_query(csv_path: str, instructions: str) -> Dict[str, Any]:
+def _project_metrics(value: Any, metrics: set, seen: Optional[Dict[int, Any]] = None) -> Any:
+    """Drop metric fields that were not requested, keeping dimensions and labels"""
+    seen = {} if seen is None else seen
+    if isinstance(value, RecordTable):
+        # Project each shared table once so aliased sections stay shared
+        if id(value) not in seen:
+            seen[id(value)] = value.select([c for c in value.columns if _metric_name(c) is None or _metric_name(c) in metrics])
+        return seen[id(value)]
+    if isinstance(value, list):
+        return [_project_metrics(item, metrics, seen) for item in value]
+    if isinstance(value, dict):
+        return {k: _project_metrics(v, metrics, seen) for k, v in value.items()
+                if _metric_name(k) is None or _metric_name(k) in metrics}
+    return value
+
+
+def execute_query(csv_path: str, instructions: Any) -> Dict[str, Any]:
     """
-    Execute a data query based on natural language instructions
-    This is a simplified version - in production, you'd use LLM to parse instructions
+    Execute a data query
+    
+    Args:
+        csv_path: Path to the ads CSV
+        instructions: A structured query spec (dict or JSON string, see
+            DataAgent.query); other text returns a general summary
+    
+    Returns:
+        Query results, or summary, recent rows, top performers and period comparison
     """
-    agent = DataAgent(csv_path)
+    agent = DataAgent(csv_path, cache=get_cache())
+    
+    spec = instructions
+    if isinstance(instructions, str):
+        try:
+            spec = json.loads(instructions)
+        except ValueError:
+            spec = None
+    if isinstance(spec, dict):
+        return dict(agent.query(spec), query_executed=instructions)
     
-    # For now, return basic summary and recent data
-    # This would be enhanced with LLM-based query parsing
+    # Free text: return basic summary and recent data
     summary = agent.get_data_summary()
     recent_data = agent.get_date_range_data(days=7)
     top_creatives = agent.get_top_performers(metric='roas', group_by='creative_type')
@@ -3,15 +3,10 @@ Evaluator Agent - Validates insights for quality and confidence
 
 This agent scores and validates insights generated by the Insight Agent.
 """
-import json
-from typing import Dict, Any
-import google.generativeai as genai
-import os
-from dotenv import load_dotenv
+from typing import Dict, Any, Tuple
 from ..utils.prompt_manager import PromptManager
-from ..utils import convert_to_serializable
-
-load_dotenv()
+from ..utils.llm import create_model, generate, generate_async, parse_json_response
+from ..utils import to_json, to_prompt_data
 
 
 class EvaluatorAgent:
@@ -19,16 +14,12 @@ class EvaluatorAgent:
     
     def __init__(self, config: Dict[str, Any]):
         """Initialize the evaluator agent"""
-        genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-        self.model = genai.GenerativeModel(
-            model_name=config.get('model', 'gemini-1.5-flash'),
-            generation_config={
-                'temperature': 0.3,  # Lower temperature for consistency
-                'max_output_tokens': config.get('max_tokens', 2000),
-            }
-        )
+        self.model = create_model(config, temperature=0.3)  # Lower temperature for consistency
         self.prompt_manager = PromptManager()
         self.confidence_threshold = config.get('confidence_min', 0.6)
+        self.timeout = config.get('llm_timeout')
+        self.prompt_encoding = config.get('prompt_encoding', 'json')
+        self._prefix = None  # (data, prefix, static values) of the last data evaluated
     
     def evaluate_insight(self, insight: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -41,54 +32,75 @@ class EvaluatorAgent:
         Returns:
             Evaluation result with scores
         """
-        # Convert numpy types and load prompt template
-        serializable_insight = convert_to_serializable(insight)
-        serializable_data = convert_to_serializable(data)
-        
-        prompt = self.prompt_manager.get_filled_prompt(
-            'evaluator_agent',
-            insight=json.dumps(serializable_insight, indent=2),
-            data=json.dumps(serializable_data, indent=2),
-            confidence_min=self.confidence_threshold
-        )
+        full_prompt = self._build_prompt(insight, data)
+        try:
+            response = generate(self.model, full_prompt, 'evaluator_agent')
+            return self._parse_evaluation(response)
+        except Exception as e:
+            return self._fallback(e)
+    
+    async def evaluate_insight_async(self, insight: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of evaluate_insight (cancellation propagates, timeouts fall back)"""
+        full_prompt = self._build_prompt(insight, data)
+        try:
+            response = await generate_async(self.model, full_prompt, 'evaluator_agent', timeout=self.timeout)
+            return self._parse_evaluation(response)
+        except Exception as e:
+            return self._fallback(e)
+    
+    def shared_prefix(self, data: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Prompt prefix shared by every evaluation against the same data
         
-        system_instruction = "You are a rigorous quality assurance analyst. Always return valid JSON."
-        full_prompt = f"{system_instruction}\n\n{prompt}"
+        The data section precedes the insight in the template, so the
+        serialized data and everything before it are built once per data
+        object and sent byte-identical, which lets provider-side prompt
+        caching reuse it across the evaluator calls of a run.
         
-        try:
-            response = self.model.generate_content(full_prompt)
-            
-            # Extract JSON from response
-            response_text = response.text.strip()
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]
-            if response_text.startswith('```'):
-                response_text = response_text[3:]
-            if response_text.endswith('```'):
-                response_text = response_text[:-3]
-            response_text = response_text.strip()
-            
-            evaluation = json.loads(response_text)
-            
-            # Determine if insight passed
-            evaluation['passed'] = evaluation.get('overall_score', 0) >= self.confidence_threshold
-            
-            return evaluation
+        Args:
+            data: Supporting data
             
-        except Exception as e:
-            print(f"Error evaluating insight: {e}")
-            return {
-                'overall_score': 0.0,
-                'passed': False,
-                'scores': {
-                    'evidence_quality': 0.0,
-                    'statistical_validity': 0.0,
-                    'actionability': 0.0,
-                    'business_relevance': 0.0
-                },
-                'verdict': 'reject',
-                'error': str(e)
+        Returns:
+            (prefix text, static template values)
+        """
+        cached = self._prefix
+        if cached is None or cached[0] is not data:
+            static = {
+                'data': to_prompt_data(data, label='data', encoding=self.prompt_encoding),
+                'confidence_min': self.confidence_threshold
             }
+            system_instruction = "You are a rigorous quality assurance analyst. Always return valid JSON."
+            prefix = f"{system_instruction}\n\n" + self.prompt_manager.get_static_prefix('evaluator_agent', **static)
+            cached = self._prefix = (data, prefix, static)
+        return cached[1], cached[2]
+    
+    def _build_prompt(self, insight: Dict[str, Any], data: Dict[str, Any]) -> str:
+        prefix, static = self.shared_prefix(data)
+        return prefix + self.prompt_manager.get_suffix('evaluator_agent', static, insight=to_json(insight, label='insight'))
+    
+    def _parse_evaluation(self, response: Any) -> Dict[str, Any]:
+        evaluation = parse_json_response(response)
+        
+        # Determine if insight passed
+        evaluation['passed'] = evaluation.get('overall_score', 0) >= self.confidence_threshold
+        
+        return evaluation
+    
+    @staticmethod
+    def _fallback(e: Exception) -> Dict[str, Any]:
+        print(f"Error evaluating insight: {e}")
+        return {
+            'overall_score': 0.0,
+            'passed': False,
+            'scores': {
+                'evidence_quality': 0.0,
+                'statistical_validity': 0.0,
+                'actionability': 0.0,
+                'business_relevance': 0.0
+            },
+            'verdict': 'reject',
+            'error': str(e)
+        }
 
 
 def evaluate_insights(config: Dict[str, Any], insights: list, data: Dict[str, Any]) -> list:
@@ -3,15 +3,10 @@ Insight Agent - Generates hypotheses and insights from data
 
 This agent analyzes data patterns and generates actionable insights.
 """
-import json
 from typing import Dict, Any, List
-import google.generativeai as genai
-import os
-from dotenv import load_dotenv
 from ..utils.prompt_manager import PromptManager
-from ..utils import convert_to_serializable
-
-load_dotenv()
+from ..utils.llm import create_model, generate, generate_async, parse_json_response
+from ..utils import to_prompt_data
 
 
 class InsightAgent:
@@ -19,15 +14,10 @@ class InsightAgent:
     
     def __init__(self, config: Dict[str, Any]):
         """Initialize the insight agent"""
-        genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-        self.model = genai.GenerativeModel(
-            model_name=config.get('model', 'gemini-1.5-flash'),
-            generation_config={
-                'temperature': config.get('temperature', 0.7),
-                'max_output_tokens': config.get('max_tokens', 2000),
-            }
-        )
+        self.model = create_model(config, temperature=config.get('temperature', 0.7))
         self.prompt_manager = PromptManager()
+        self.timeout = config.get('llm_timeout')
+        self.prompt_encoding = config.get('prompt_encoding', 'json')
     
     def generate_insights(self, data: Dict[str, Any], context: str = "") -> List[Dict[str, Any]]:
         """
@@ -40,46 +30,44 @@ class InsightAgent:
         Returns:
             List of insight dictionaries
         """
-        # Convert numpy types to JSON-serializable types
-        serializable_data = convert_to_serializable(data)
-        
-        # Load and fill prompt template
+        full_prompt = self._build_prompt(data, context)
+        try:
+            response = generate(self.model, full_prompt, 'insight_agent')
+            return parse_json_response(response).get('insights', [])
+        except Exception as e:
+            return self._fallback(e)
+    
+    async def generate_insights_async(self, data: Dict[str, Any], context: str = "") -> List[Dict[str, Any]]:
+        """Async variant of generate_insights (cancellation propagates, timeouts fall back)"""
+        full_prompt = self._build_prompt(data, context)
+        try:
+            response = await generate_async(self.model, full_prompt, 'insight_agent', timeout=self.timeout)
+            return parse_json_response(response).get('insights', [])
+        except Exception as e:
+            return self._fallback(e)
+    
+    def _build_prompt(self, data: Dict[str, Any], context: str) -> str:
+        # Convert numpy types to JSON and fill prompt template
         prompt = self.prompt_manager.get_filled_prompt(
             'insight_agent',
-            data=json.dumps(serializable_data, indent=2),
+            data=to_prompt_data(data, label='data_results', encoding=self.prompt_encoding),
             context=context
         )
         
         system_instruction = "You are an expert marketing analyst. Always return valid JSON."
-        full_prompt = f"{system_instruction}\n\n{prompt}"
-        
-        try:
-            response = self.model.generate_content(full_prompt)
-            
-            # Extract JSON from response
-            response_text = response.text.strip()
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]
-            if response_text.startswith('```'):
-                response_text = response_text[3:]
-            if response_text.endswith('```'):
-                response_text = response_text[:-3]
-            response_text = response_text.strip()
-            
-            result = json.loads(response_text)
-            
-            return result.get('insights', [])
-            
-        except Exception as e:
-            print(f"Error generating insights: {e}")
-            return [{
-                'title': 'Error generating insights',
-                'description': str(e),
-                'severity': 'low',
-                'confidence': 0.0,
-                'evidence': {},
-                'error': True
-            }]
+        return f"{system_instruction}\n\n{prompt}"
+    
+    @staticmethod
+    def _fallback(e: Exception) -> List[Dict[str, Any]]:
+        print(f"Error generating insights: {e}")
+        return [{
+            'title': 'Error generating insights',
+            'description': str(e),
+            'severity': 'low',
+            'confidence': 0.0,
+            'evidence': {},
+            'error': True
+        }]
 
 
 def generate_insights(config: Dict[str, Any], data: Dict[str, Any], context: str = "") -> List[Dict[str, Any]]:
@@ -3,32 +3,17 @@ Planner Agent - Creates analysis plans from user queries
 
 This agent decomposes user queries into structured analysis plans.
 """
-import json
-from pathlib import Path
 from typing import Dict, Any
-import google.generativeai as genai
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from ..utils.llm import create_model, generate, generate_async, parse_json_response
+from ..utils.prompt_manager import PromptManager
 
 
 class PlannerAgent:
     def __init__(self, config: Dict[str, Any]):
         """Initialize the planner agent"""
-        genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-        self.model = genai.GenerativeModel(
-            model_name=config.get('model', 'gemini-1.5-flash'),
-            generation_config={
-                'temperature': config.get('temperature', 0.7),
-                'max_output_tokens': config.get('max_tokens', 2000),
-            }
-        )
-        
-        # Load prompt template
-        prompt_path = Path('prompts/planner_agent.md')
-        with open(prompt_path, 'r') as f:
-            self.prompt_template = f.read()
+        self.model = create_model(config, temperature=config.get('temperature', 0.7))
+        self.prompt_manager = PromptManager()
+        self.timeout = config.get('llm_timeout')
     
     def create_plan(self, user_query: str) -> Dict[str, Any]:
         """
@@ -40,61 +25,67 @@ class PlannerAgent:
         Returns:
             Dictionary containing the analysis plan
         """
+        full_prompt = self._build_prompt(user_query)
+        try:
+            response = generate(self.model, full_prompt, 'planner_agent')
+            return self._parse_plan(response, user_query)
+        except Exception as e:
+            return self._fallback_plan(user_query, e)
+    
+    async def create_plan_async(self, user_query: str) -> Dict[str, Any]:
+        """Async variant of create_plan (cancellation propagates, timeouts fall back)"""
+        full_prompt = self._build_prompt(user_query)
+        try:
+            response = await generate_async(self.model, full_prompt, 'planner_agent', timeout=self.timeout)
+            return self._parse_plan(response, user_query)
+        except Exception as e:
+            return self._fallback_plan(user_query, e)
+    
+    def _build_prompt(self, user_query: str) -> str:
         # Fill in the prompt template
-        prompt = self.prompt_template.replace('{query}', user_query)
+        prompt = self.prompt_manager.get_filled_prompt('planner_agent', query=user_query)
         system_instruction = "You are a strategic planner for marketing analytics. Always return valid JSON."
-        full_prompt = f"{system_instruction}\n\n{prompt}"
+        return f"{system_instruction}\n\n{prompt}"
+    
+    def _parse_plan(self, response: Any, user_query: str) -> Dict[str, Any]:
+        # Extract JSON from response (Gemini may include markdown code blocks)
+        plan = parse_json_response(response)
         
-        try:
-            response = self.model.generate_content(full_prompt)
-            
-            # Extract JSON from response (Gemini may include markdown code blocks)
-            response_text = response.text.strip()
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]  # Remove ```json
-            if response_text.startswith('```'):
-                response_text = response_text[3:]  # Remove ```
-            if response_text.endswith('```'):
-                response_text = response_text[:-3]  # Remove trailing ```
-            response_text = response_text.strip()
-            
-            plan = json.loads(response_text)
-            
-            # Add metadata
-            plan['user_query'] = user_query
-            plan['model_used'] = self.model.model_name
-            
-            return plan
-            
-        except Exception as e:
-            print(f"Error creating plan: {e}")
-            # Return a basic fallback plan
-            return {
-                'user_query': user_query,
-                'objective': 'Analyze Facebook ads performance',
-                'steps': [
-                    {
-                        'step_number': 1,
-                        'action': 'Load and examine recent data',
-                        'data_needed': 'Last 7-14 days of ad performance',
-                        'expected_output': 'Data summary with key metrics'
-                    },
-                    {
-                        'step_number': 2,
-                        'action': 'Identify performance trends and anomalies',
-                        'data_needed': 'ROAS, CTR, spend, revenue by segments',
-                        'expected_output': 'List of insights with evidence'
-                    },
-                    {
-                        'step_number': 3,
-                        'action': 'Generate recommendations',
-                        'data_needed': 'Best and worst performers',
-                        'expected_output': 'Actionable improvements'
-                    }
-                ],
-                'success_criteria': 'Clear insights with data-backed recommendations',
-                'error': str(e)
-            }
+        # Add metadata
+        plan['user_query'] = user_query
+        plan['model_used'] = self.model.model_name
+        
+        return plan
+    
+    def _fallback_plan(self, user_query: str, e: Exception) -> Dict[str, Any]:
+        print(f"Error creating plan: {e}")
+        # Return a basic fallback plan
+        return {
+            'user_query': user_query,
+            'objective': 'Analyze Facebook ads performance',
+            'steps': [
+                {
+                    'step_number': 1,
+                    'action': 'Load and examine recent data',
+                    'data_needed': 'Last 7-14 days of ad performance',
+                    'expected_output': 'Data summary with key metrics'
+                },
+                {
+                    'step_number': 2,
+                    'action': 'Identify performance trends and anomalies',
+                    'data_needed': 'ROAS, CTR, spend, revenue by segments',
+                    'expected_output': 'List of insights with evidence'
+                },
+                {
+                    'step_number': 3,
+                    'action': 'Generate recommendations',
+                    'data_needed': 'Best and worst performers',
+                    'expected_output': 'Actionable improvements'
+                }
+            ],
+            'success_criteria': 'Clear insights with data-backed recommendations',
+            'error': str(e)
+        }
 
 
 def create_analysis_plan(config: Dict[str, Any], user_query: str) -> Dict[str, Any]:
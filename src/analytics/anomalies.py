@@ -0,0 +1,217 @@
+"""
+Anomaly & Fatigue Detection
+Builds (segment x day) matrices of spend, CTR and ROAS and runs z-score,
+slope and CUSUM change-point tests across every segment at once
+"""
+from typing import Dict, Any, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .metrics import derive_metrics
+
+# Segment levels and the columns that identify a segment
+SEGMENT_LEVELS = {
+    'campaign': ['campaign_name'],
+    'adset': ['campaign_name', 'adset_name'],
+    'creative': ['creative_type', 'creative_message']
+}
+DETECTION_METRICS = ('spend', 'ctr', 'roas')
+MEASURES = ['spend', 'impressions', 'clicks', 'revenue']
+
+# Default thresholds
+Z_THRESHOLD = 2.0         # recent-window mean vs baseline daily distribution
+SLOPE_THRESHOLD = 3.0     # % of the window mean per day
+CUSUM_THRESHOLD = 1.5     # max standardized cumulative deviation / sqrt(days)
+
+
+def build_segment_matrices(df: pd.DataFrame, keys: List[str]) -> Tuple[pd.DataFrame, np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Pivot rows into dense (segment x day) matrices
+
+    Args:
+        df: Rows with a datetime 'date' column and the measure columns
+        keys: Columns identifying a segment
+
+    Returns:
+        (segment labels, every calendar day from the first to the last date,
+        measure/metric matrices). Days are a continuous calendar, so the last
+        N columns are the last N calendar days even when the data has gaps;
+        days without spend are NaN in the spend, ctr and roas matrices.
+    """
+    key_frame = df[keys].astype(object).fillna('(missing)')
+    if len(keys) > 1:
+        segment_codes, segments = pd.MultiIndex.from_frame(key_frame).factorize()
+    else:
+        segment_codes, segments = pd.factorize(key_frame[keys[0]])
+    dates = df['date'].to_numpy().astype('datetime64[D]')
+    first = dates.min() if len(dates) else np.datetime64('NaT', 'D')
+    day_codes = (dates - first).astype(np.int64)
+    n_segments, n_days = len(segments), int(day_codes.max()) + 1 if len(dates) else 0
+    days = (first + np.arange(n_days)).astype('datetime64[ns]')
+    cell = segment_codes.astype(np.int64) * n_days + day_codes
+
+    matrices = {}
+    for measure in MEASURES:
+        weights = np.nan_to_num(df[measure].to_numpy(dtype=np.float64, na_value=np.nan))
+        matrices[measure] = np.bincount(cell, weights=weights, minlength=n_segments * n_days).reshape(n_segments, n_days)
+
+    spend = matrices['spend']
+    matrices.update(derive_metrics(matrices, ('ctr', 'roas'), fill=np.nan, rounded=False))
+    matrices['spend'] = np.where(spend > 0, spend, np.nan)
+
+    labels = pd.DataFrame(list(segments), columns=keys) if len(keys) > 1 else pd.DataFrame({keys[0]: segments})
+    return labels, days, matrices
+
+
+def _masked_stats(values: np.ndarray, mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Row-wise count, mean and standard deviation over masked entries"""
+    count = mask.sum(axis=1)
+    filled = np.where(mask, values, 0.0)
+    mean = np.divide(filled.sum(axis=1), count, out=np.zeros(len(values)), where=count > 0)
+    squared = np.where(mask, (values - mean[:, None]) ** 2, 0.0)
+    std = np.sqrt(np.divide(squared.sum(axis=1), count - 1, out=np.zeros(len(values)), where=count > 1))
+    return count, mean, std
+
+
+def zscore_test(values: np.ndarray, recent_days: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compare each segment's mean over the last ``recent_days`` calendar days with its earlier days
+
+    Returns:
+        (z score, recent mean, baseline mean) per segment; z is 0 when undefined
+    """
+    valid = ~np.isnan(values)
+    recent = np.zeros_like(valid)
+    recent[:, -recent_days:] = True
+    recent_count, recent_mean, _ = _masked_stats(values, valid & recent)
+    base_count, base_mean, base_std = _masked_stats(values, valid & ~recent)
+    ok = (recent_count > 0) & (base_count > 2) & (base_std > 0)
+    z = np.divide(recent_mean - base_mean, base_std, out=np.zeros(len(values)), where=ok)
+    return z, recent_mean, base_mean
+
+
+def slope_test(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Least-squares slope over the last ``window`` calendar days, as % of the window mean per day
+
+    Returns:
+        Relative slope per segment (0 when fewer than 3 points)
+    """
+    tail = values[:, -window:]
+    mask = ~np.isnan(tail)
+    x = np.broadcast_to(np.arange(tail.shape[1], dtype=np.float64), tail.shape)
+    count, y_mean, _ = _masked_stats(tail, mask)
+    _, x_mean, _ = _masked_stats(x, mask)
+    dx = np.where(mask, x - x_mean[:, None], 0.0)
+    dy = np.where(mask, tail - y_mean[:, None], 0.0)
+    sxx = (dx * dx).sum(axis=1)
+    slope = np.divide((dx * dy).sum(axis=1), sxx, out=np.zeros(len(values)), where=(count >= 3) & (sxx > 0))
+    return np.divide(slope * 100, np.abs(y_mean), out=np.zeros(len(values)), where=y_mean != 0)
+
+
+def cusum_test(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    CUSUM change point: the split maximizing the standardized cumulative deviation
+
+    Returns:
+        (statistic, change-point day index, relative mean shift after vs before) per segment
+    """
+    mask = ~np.isnan(values)
+    count, mean, std = _masked_stats(values, mask)
+    deviations = np.where(mask, values - mean[:, None], 0.0)
+    cusum = np.cumsum(deviations, axis=1)
+    split = np.abs(cusum[:, :-1]).argmax(axis=1) if values.shape[1] > 1 else np.zeros(len(values), dtype=np.int64)
+    peak = np.abs(cusum[np.arange(len(values)), split])
+    ok = (count >= 6) & (std > 0)
+    statistic = np.divide(peak, std * np.sqrt(np.maximum(count, 1)), out=np.zeros(len(values)), where=ok)
+
+    after = np.arange(values.shape[1])[None, :] > split[:, None]
+    _, before_mean, _ = _masked_stats(values, mask & ~after)
+    _, after_mean, _ = _masked_stats(values, mask & after)
+    shift = np.divide((after_mean - before_mean) * 100, np.abs(before_mean), out=np.zeros(len(values)),
+                      where=ok & (before_mean != 0))
+    return statistic, split + 1, shift
+
+
+def detect_anomalies(df: pd.DataFrame, levels: Sequence[str] = tuple(SEGMENT_LEVELS),
+                     metrics: Sequence[str] = DETECTION_METRICS, recent_days: int = 7,
+                     min_days: int = 10, top_n: int = 20,
+                     z_threshold: float = Z_THRESHOLD, slope_threshold: float = SLOPE_THRESHOLD,
+                     cusum_threshold: float = CUSUM_THRESHOLD) -> Dict[str, Any]:
+    """
+    Flag segments whose spend, CTR or ROAS shifted, trended or broke recently
+
+    Args:
+        df: Rows to scan
+        levels: Segment levels from SEGMENT_LEVELS
+        metrics: Metrics from DETECTION_METRICS
+        recent_days: Calendar days in the recent window for the z-score and slope tests
+        min_days: Segments active on fewer days are skipped
+        top_n: Number of ranked flags to return
+        z_threshold / slope_threshold / cusum_threshold: Test thresholds
+
+    Returns:
+        Dictionary with ranked 'flags' plus scan statistics
+    """
+    flags = []
+    scanned = 0
+    for level in levels:
+        keys = SEGMENT_LEVELS[level]
+        if df.empty:
+            continue
+        labels, days, matrices = build_segment_matrices(df, keys)
+        active = (~np.isnan(matrices['spend'])).sum(axis=1) >= min_days
+        scanned += int(active.sum())
+        segment_spend = np.nansum(matrices['spend'], axis=1)
+
+        for metric in metrics:
+            values = matrices[metric]
+            z, recent_mean, base_mean = zscore_test(values, recent_days)
+            slope = slope_test(values, recent_days)
+            statistic, split, shift = cusum_test(values)
+
+            # Signed votes: +1/-1 when a test fires in that direction, 0 otherwise
+            votes = np.stack([
+                np.sign(z) * (np.abs(z) >= z_threshold),
+                np.sign(slope) * (np.abs(slope) >= slope_threshold),
+                np.sign(shift) * ((statistic >= cusum_threshold) & (split >= len(days) - 2 * recent_days))
+            ])
+            strength = np.stack([np.abs(z) / z_threshold, np.abs(slope) / slope_threshold, statistic / cusum_threshold])
+            # Require two tests agreeing on direction so single noisy days are not reported
+            direction = np.sign(votes.sum(axis=0))
+            agreeing = votes == direction[None, :]
+            agreeing &= votes != 0
+            score = np.where(agreeing, strength, 0.0).max(axis=0)
+            candidates = np.flatnonzero(active & (agreeing.sum(axis=0) >= 2))
+
+            for i in candidates:
+                tests = [name for name, hit in zip(('zscore', 'slope', 'cusum'), agreeing[:, i]) if hit]
+                flag = {
+                    'level': level,
+                    'segment': {key: labels.iloc[i][key] for key in keys},
+                    'metric': metric,
+                    'direction': 'decline' if direction[i] < 0 else 'increase',
+                    'tests': tests,
+                    'z_score': round(float(z[i]), 2),
+                    'slope_pct_per_day': round(float(slope[i]), 2),
+                    'recent_mean': round(float(recent_mean[i]), 4),
+                    'baseline_mean': round(float(base_mean[i]), 4),
+                    'segment_spend': round(float(segment_spend[i]), 2),
+                    'score': round(float(score[i]), 2)
+                }
+                if agreeing[2, i]:
+                    flag['change_point'] = pd.Timestamp(days[split[i]]).strftime('%Y-%m-%d')
+                    flag['shift_pct'] = round(float(shift[i]), 1)
+                if level == 'creative' and metric == 'ctr' and direction[i] < 0:
+                    flag['signal'] = 'creative_fatigue'
+                flags.append(flag)
+
+    flags.sort(key=lambda flag: (flag['score'], flag['segment_spend']), reverse=True)
+    return {
+        'flags': flags[:top_n],
+        'total_flags': len(flags),
+        'segments_scanned': scanned,
+        'recent_days': recent_days,
+        'thresholds': {'z_score': z_threshold, 'slope_pct_per_day': slope_threshold, 'cusum': cusum_threshold}
+    }
@@ -0,0 +1,121 @@
+"""
+Bootstrap Confidence Intervals
+Percentile intervals for ratio metrics (roas, ctr) of every segment of a
+level at once: rows are summed into (segment x day) matrices, days are
+resampled with one shared multinomial count matrix, and each measure's
+resampled totals for all segments come from a single matrix product
+"""
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .metrics import DERIVED_METRICS, derive_metrics
+
+INTERVAL_METRICS = ('roas', 'ctr')
+DEFAULT_RESAMPLES = 1000
+DEFAULT_CONFIDENCE = 0.95
+# Intervals are always seeded so that identical data gives identical prompts
+DEFAULT_SEED = 42
+# Segments seen on fewer days get NaN intervals
+MIN_DAYS = 2
+# Segments per matrix product, bounding memory at CHUNK_SEGMENTS x resamples per measure
+CHUNK_SEGMENTS = 2048
+
+
+def resample_counts(n_days: int, n_resamples: int, seed: int = DEFAULT_SEED) -> np.ndarray:
+    """
+    How often each day is drawn in each bootstrap resample
+
+    Args:
+        n_days: Days in the window (the resampling unit)
+        n_resamples: Number of resamples
+        seed: Random seed (config random_seed) for reproducible intervals
+
+    Returns:
+        (n_days x n_resamples) float matrix whose columns sum to n_days
+    """
+    rng = np.random.default_rng(seed)
+    counts = rng.multinomial(n_days, np.full(n_days, 1.0 / n_days), size=n_resamples)
+    return counts.T.astype(np.float64)
+
+
+def _quantiles(ratios: np.ndarray, bounds: Sequence[float]) -> np.ndarray:
+    """
+    Row-wise linear-interpolated quantiles ignoring undefined (NaN) resamples
+
+    One sort per row (NaN sorts last) is cheaper than np.quantile's
+    per-bound selection, and rows without any defined resample give 0.
+    """
+    ordered = np.sort(ratios, axis=1)
+    defined = (~np.isnan(ratios)).sum(axis=1)
+    rows = np.arange(len(ratios))
+    last = np.maximum(defined - 1, 0)
+    result = np.zeros((len(bounds), len(ratios)))
+    for i, bound in enumerate(bounds):
+        position = bound * last
+        below = np.floor(position).astype(np.int64)
+        above = np.minimum(below + 1, last)
+        fraction = position - below
+        result[i] = ordered[rows, below] * (1 - fraction) + ordered[rows, above] * fraction
+    result[:, defined == 0] = 0.0
+    return result
+
+
+def segment_intervals(df: pd.DataFrame, group_codes: np.ndarray, n_groups: int,
+                      metrics: Sequence[str] = INTERVAL_METRICS, n_resamples: int = DEFAULT_RESAMPLES,
+                      confidence: float = DEFAULT_CONFIDENCE, seed: int = DEFAULT_SEED) -> Dict[str, np.ndarray]:
+    """
+    Bootstrap intervals of ratio metrics for every segment
+
+    Days are the resampling unit (each segment's daily totals are drawn
+    together), so the intervals reflect day-to-day variation of the ratio.
+
+    Args:
+        df: Rows with a datetime 'date' column and the summed measures
+        group_codes: Segment number of each row (e.g. groupby().ngroup())
+        n_groups: Number of segments
+        metrics: Ratio metrics from DERIVED_METRICS
+        n_resamples: Bootstrap resamples
+        confidence: Interval coverage
+        seed: Random seed
+
+    Returns:
+        '<metric>_ci_low' / '<metric>_ci_high' arrays aligned with the
+        segment numbers, rounded like the metric (0 when no resample defines
+        the ratio, NaN for segments observed on fewer than MIN_DAYS days)
+    """
+    intervals = {f'{metric}_ci_{side}': np.full(n_groups, np.nan) for metric in metrics for side in ('low', 'high')}
+    if not n_groups or df.empty:
+        return intervals
+
+    day_codes, days = pd.factorize(df['date'], sort=True)
+    n_days = len(days)
+    cell = np.asarray(group_codes, dtype=np.int64) * n_days + day_codes
+    observed_days = (np.bincount(cell, minlength=n_groups * n_days).reshape(n_groups, n_days) > 0).sum(axis=1)
+    measures = {column for metric in metrics for column in DERIVED_METRICS[metric][:2]}
+    daily = {}
+    for measure in measures:
+        weights = np.nan_to_num(df[measure].to_numpy(dtype=np.float64, na_value=np.nan))
+        daily[measure] = np.bincount(cell, weights=weights, minlength=n_groups * n_days).reshape(n_groups, n_days)
+
+    counts = resample_counts(n_days, n_resamples, seed)
+    alpha = (1.0 - confidence) / 2
+    for start in range(0, n_groups, CHUNK_SEGMENTS):
+        chunk = slice(start, start + CHUNK_SEGMENTS)
+        resampled = {measure: daily[measure][chunk] @ counts for measure in measures}
+        ratios = derive_metrics(resampled, metrics, fill=np.nan, rounded=False)
+        for metric in metrics:
+            low, high = _quantiles(ratios[metric], (alpha, 1.0 - alpha))
+            intervals[f'{metric}_ci_low'][chunk] = low
+            intervals[f'{metric}_ci_high'][chunk] = high
+
+    # Resampling a single day always returns that day: no interval rather than a zero-width one
+    too_few = observed_days < MIN_DAYS
+    for metric in metrics:
+        decimals = DERIVED_METRICS[metric][3]
+        for side in ('low', 'high'):
+            bounds = intervals[f'{metric}_ci_{side}']
+            np.round(bounds, decimals, out=bounds)
+            bounds[too_few] = np.nan
+    return intervals
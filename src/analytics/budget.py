@@ -0,0 +1,266 @@
+"""
+Budget Simulator
+Fits a diminishing-returns response curve (daily revenue = a * spend^b) to
+every segment at once with masked log-log least squares over the
+(segment x day) matrices, then allocates budgets by equalizing marginal
+returns: the common marginal ROAS of a whole batch of budget scenarios is
+solved in one vectorized Newton/bisection loop
+"""
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .anomalies import build_segment_matrices
+
+# Columns identifying a segment per simulated dimension (adset names repeat across campaigns)
+SEGMENT_KEYS = {'adset_name': ['campaign_name', 'adset_name']}
+BUDGET_DIMENSIONS = ['campaign_name', 'adset_name', 'creative_type', 'audience_type', 'platform', 'country']
+
+MIN_FIT_DAYS = 7              # fewer active days: use the median elasticity of the fitted segments
+ELASTICITY_BOUNDS = (0.05, 0.95)  # b < 1 means diminishing returns
+DEFAULT_ELASTICITY = 0.5
+MAX_CHANGE = 0.5              # a segment's budget share may move +/-50% of its current share
+BUDGET_MULTIPLIERS = (0.5, 0.75, 1.0, 1.25, 1.5, 2.0)
+MAX_ITERATIONS = 60
+TOLERANCE = 1e-9              # relative budget error at which a scenario is solved
+# Report columns (segments also carry their key columns first)
+SEGMENT_FIELDS = ['current_spend', 'recommended_spend', 'change_pct', 'elasticity', 'marginal_roas', 'fit_days']
+SCENARIO_FIELDS = ['budget_multiplier', 'daily_budget', 'predicted_revenue', 'predicted_roas']
+
+
+def segment_keys(dimension: str) -> List[str]:
+    """Columns that identify a segment of a budget dimension"""
+    return SEGMENT_KEYS.get(dimension, [dimension])
+
+
+class ResponseCurves:
+    """Fitted per-segment response curves; allocation and prediction are pure array math"""
+
+    def __init__(self, labels: pd.DataFrame, scale: np.ndarray, elasticity: np.ndarray,
+                 current_spend: np.ndarray, fit_days: np.ndarray, n_days: int):
+        """
+        Args:
+            labels: Segment key values, one row per segment
+            scale: Curve coefficient a per segment
+            elasticity: Curve exponent b per segment
+            current_spend: Average daily spend per segment over the fitted window
+            fit_days: Days with spend and revenue used in each segment's fit
+            n_days: Days in the fitted window
+        """
+        self.labels = labels
+        self.scale = scale
+        self.elasticity = elasticity
+        self.current_spend = current_spend
+        self.fit_days = fit_days
+        self.n_days = n_days
+
+    @property
+    def daily_budget(self) -> float:
+        """Current total daily spend"""
+        return float(self.current_spend.sum())
+
+    def predict(self, spend: np.ndarray) -> np.ndarray:
+        """Daily revenue for spend arrays whose last axis is the segment"""
+        return self.scale * np.power(spend, self.elasticity)
+
+    def marginal_roas(self, spend: np.ndarray) -> np.ndarray:
+        """Revenue from the next unit of spend (0 for unfunded segments)"""
+        funded = spend > 0
+        return np.where(funded, self.scale * self.elasticity * np.power(np.where(funded, spend, 1.0),
+                                                                         self.elasticity - 1), 0.0)
+
+    def allocate(self, budgets: Sequence[float], max_change: float = MAX_CHANGE) -> np.ndarray:
+        """
+        Revenue-maximizing daily spend per segment for each total budget
+
+        Maximizes sum(a_i * x_i^b_i) subject to sum(x_i) = budget, with each
+        segment kept within +/-max_change of its current budget share. At
+        the optimum every unclipped segment has the same marginal ROAS
+        lambda, with x_i(lambda) = (a_i b_i / lambda)^(1 / (1 - b_i)); total
+        spend falls as lambda rises, so log lambda is solved for all budgets
+        together by Newton steps kept inside a bisection bracket.
+
+        Args:
+            budgets: Total daily budgets (S scenarios)
+            max_change: Allowed relative move of a segment's budget share
+
+        Returns:
+            (S x segments) daily spend matrix
+        """
+        budgets = np.asarray(budgets, dtype=np.float64).reshape(-1, 1)
+        if not len(self.current_spend):
+            return np.zeros((len(budgets), 0))
+        share = self.current_spend / max(self.daily_budget, 1e-12)
+        low = budgets * share * (1 - max_change)
+        high = budgets * share * (1 + max_change)
+
+        earning = self.scale > 0
+        log_gain = np.log(np.where(earning, self.scale * self.elasticity, 1.0))
+        exponent = 1.0 / (1.0 - self.elasticity)
+
+        def spend_at(log_lambda: np.ndarray) -> np.ndarray:
+            unclipped = np.exp(np.clip((log_gain - log_lambda) * exponent, -700, 700))
+            return np.clip(np.where(earning, unclipped, 0.0), low, high)
+
+        # lambda bracket: every segment at its upper bound .. every segment at its lower bound
+        def log_marginal(spend: np.ndarray, missing: float) -> np.ndarray:
+            valid = (spend > 0) & earning
+            return np.where(valid, log_gain + (self.elasticity - 1) * np.log(np.where(valid, spend, 1.0)), missing)
+
+        lo = np.min(log_marginal(high, np.inf), axis=1, keepdims=True)
+        hi = np.max(log_marginal(low, -np.inf), axis=1, keepdims=True)
+        lo = np.where(np.isfinite(lo), lo, 0.0) - 1.0
+        hi = np.where(np.isfinite(hi), hi, 0.0) + 1.0
+
+        log_lambda = (lo + hi) / 2
+        for _ in range(MAX_ITERATIONS):
+            spend = spend_at(log_lambda)
+            excess = spend.sum(axis=1, keepdims=True) - budgets
+            if (np.abs(excess) <= TOLERANCE * np.maximum(budgets, 1.0)).all():
+                break
+            lo = np.where(excess > 0, log_lambda, lo)
+            hi = np.where(excess > 0, hi, log_lambda)
+            # d(total spend)/d(log lambda) comes from the segments not held at a bound
+            free = (spend > low) & (spend < high)
+            slope = -(np.where(free, spend * exponent, 0.0)).sum(axis=1, keepdims=True)
+            newton = log_lambda - np.divide(excess, slope, out=np.full_like(excess, np.inf), where=slope < 0)
+            log_lambda = np.where((newton > lo) & (newton < hi), newton, (lo + hi) / 2)
+        return spend
+
+    def simulate(self, budgets: Sequence[float], max_change: float = MAX_CHANGE) -> Dict[str, np.ndarray]:
+        """
+        Optimal allocation and predicted outcome for a batch of budgets
+
+        Returns:
+            'allocation' (S x segments), 'revenue' and 'roas' per scenario
+        """
+        budgets = np.asarray(budgets, dtype=np.float64)
+        allocation = self.allocate(budgets, max_change)
+        revenue = self.predict(allocation).sum(axis=1)
+        spend = allocation.sum(axis=1)
+        return {
+            'allocation': allocation,
+            'revenue': revenue,
+            'roas': np.divide(revenue, spend, out=np.zeros(len(spend)), where=spend > 0)
+        }
+
+
+def fit_response_curves(df: pd.DataFrame, keys: List[str]) -> ResponseCurves:
+    """
+    Fit log(revenue) = log(a) + b log(spend) per segment over its daily totals
+
+    The slope b comes from masked least squares on days with both spend and
+    revenue, clipped to ELASTICITY_BOUNDS; segments with fewer than
+    MIN_FIT_DAYS such days get the median fitted slope. a is then set so the
+    curve goes through the segment's average daily spend and revenue.
+
+    Args:
+        df: Rows with a datetime 'date' column and spend/revenue
+        keys: Columns identifying a segment
+
+    Returns:
+        ResponseCurves over the segments with any spend
+    """
+    labels, days, matrices = build_segment_matrices(df, keys)
+    spend = np.nan_to_num(matrices['spend'])  # NaN marks no-spend days
+    revenue = matrices['revenue']
+    n_days = max(len(days), 1)
+
+    usable = (spend > 0) & (revenue > 0)
+    count = usable.sum(axis=1)
+    x = np.log(np.where(usable, spend, 1.0))
+    y = np.log(np.where(usable, revenue, 1.0))
+    x_mean = np.divide(x.sum(axis=1), count, out=np.zeros(len(count)), where=count > 0)
+    y_mean = np.divide(y.sum(axis=1), count, out=np.zeros(len(count)), where=count > 0)
+    dx = np.where(usable, x - x_mean[:, None], 0.0)
+    dy = np.where(usable, y - y_mean[:, None], 0.0)
+    sxx = (dx * dx).sum(axis=1)
+    fitted = (count >= MIN_FIT_DAYS) & (sxx > 0)
+    slope = np.divide((dx * dy).sum(axis=1), sxx, out=np.zeros(len(count)), where=fitted)
+    slope = np.clip(slope, *ELASTICITY_BOUNDS)
+    fallback = float(np.median(slope[fitted])) if fitted.any() else DEFAULT_ELASTICITY
+    elasticity = np.where(fitted, slope, fallback)
+
+    # The curve passes through the segment's average day, so the status quo reproduces observed revenue
+    daily_spend = spend.sum(axis=1) / n_days
+    daily_revenue = revenue.sum(axis=1) / n_days
+    keep = daily_spend > 0
+    scale = np.zeros(len(count))
+    scale[keep] = daily_revenue[keep] / np.power(daily_spend[keep], elasticity[keep])
+
+    return ResponseCurves(labels[keep].reset_index(drop=True), scale[keep], elasticity[keep],
+                          daily_spend[keep], count[keep], n_days)
+
+
+def _empty_report(curves: ResponseCurves, budget: float, max_change: float) -> Dict[str, Any]:
+    """budget_report shape for a selection without spend (no segments, empty scenario sweep)"""
+    nothing = {'daily_spend': 0.0, 'predicted_revenue': 0.0, 'predicted_roas': 0.0}
+    return {
+        'daily_budget': round(budget, 2),
+        'current': dict(nothing),
+        'reallocated': dict(nothing),
+        'reallocation_uplift_pct': 0.0,
+        'at_budget': {'predicted_revenue': 0.0, 'predicted_roas': 0.0},
+        'segments': curves.labels.iloc[:0].assign(**{field: pd.Series(dtype=np.float64) for field in SEGMENT_FIELDS}),
+        'scenarios': pd.DataFrame({field: pd.Series(dtype=np.float64) for field in SCENARIO_FIELDS}),
+        'window_days': curves.n_days,
+        'max_change': max_change
+    }
+
+
+def budget_report(curves: ResponseCurves, budget: Optional[float] = None,
+                  multipliers: Sequence[float] = BUDGET_MULTIPLIERS, max_change: float = MAX_CHANGE) -> Dict[str, Any]:
+    """
+    Current vs optimal allocation plus a budget scenario sweep
+
+    Args:
+        curves: Fitted response curves
+        budget: Daily budget to allocate (default: current daily spend)
+        multipliers: Budget scenarios as multiples of the current daily spend
+        max_change: Allowed relative move of a segment's budget share
+
+    Returns:
+        Dictionary with current vs reallocated outcomes, per-segment
+        recommendations ('segments' frame) and budget sweeps ('scenarios' frame)
+    """
+    current = curves.daily_budget
+    budget = current if budget is None else float(budget)
+    if current <= 0:
+        return _empty_report(curves, budget, max_change)
+    budgets = np.concatenate([[current, budget], np.asarray(multipliers, dtype=np.float64) * current])
+    outcome = curves.simulate(budgets, max_change)
+
+    status_quo = float(curves.predict(curves.current_spend).sum())
+    recommended = outcome['allocation'][1]
+    segments = curves.labels.copy()
+    segments['current_spend'] = curves.current_spend.round(2)
+    segments['recommended_spend'] = recommended.round(2)
+    segments['change_pct'] = np.divide((recommended - curves.current_spend) * 100, curves.current_spend,
+                                       out=np.zeros(len(recommended)), where=curves.current_spend > 0).round(1)
+    segments['elasticity'] = curves.elasticity.round(3)
+    segments['marginal_roas'] = curves.marginal_roas(curves.current_spend).round(2)
+    segments['fit_days'] = curves.fit_days
+    segments = segments.sort_values('change_pct', ascending=False, ignore_index=True)
+
+    scenarios = pd.DataFrame({
+        'budget_multiplier': np.asarray(multipliers, dtype=np.float64),
+        'daily_budget': budgets[2:].round(2),
+        'predicted_revenue': outcome['revenue'][2:].round(2),
+        'predicted_roas': outcome['roas'][2:].round(2)
+    })
+    optimized = float(outcome['revenue'][0])
+    return {
+        'daily_budget': round(budget, 2),
+        'current': {'daily_spend': round(current, 2), 'predicted_revenue': round(status_quo, 2),
+                    'predicted_roas': round(status_quo / current, 2) if current > 0 else 0.0},
+        'reallocated': {'daily_spend': round(current, 2), 'predicted_revenue': round(optimized, 2),
+                        'predicted_roas': round(optimized / current, 2) if current > 0 else 0.0},
+        'reallocation_uplift_pct': round((optimized - status_quo) * 100 / status_quo, 2) if status_quo > 0 else 0.0,
+        'at_budget': {'predicted_revenue': round(float(outcome['revenue'][1]), 2),
+                      'predicted_roas': round(float(outcome['roas'][1]), 2)},
+        'segments': segments,
+        'scenarios': scenarios,
+        'window_days': curves.n_days,
+        'max_change': max_change
+    }
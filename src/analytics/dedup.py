@@ -0,0 +1,159 @@
+"""
+Insight Deduplication
+Local near-duplicate detection for Insight Agent output: each insight's
+title, description and evidence become a TF-IDF vector over hashed
+word-bounded character n-grams, and insights whose cosine similarity to a
+cluster representative passes a threshold join its cluster, so only
+representatives are evaluated. Text similarity alone cannot tell "ROAS rose"
+from "ROAS dropped", so insights only merge when their metric, segments and
+metric directions match exactly.
+"""
+import re
+import zlib
+from typing import Dict, Any, FrozenSet, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .text_index import STOPWORDS
+
+NGRAM_SIZES = (3, 4, 5)
+N_FEATURES = 2 ** 18
+# Paraphrases of one finding score ~0.55-0.7, the same template about another segment ~0.4-0.45;
+# the exact signature match (see insight_signature) is what keeps those apart
+DEFAULT_THRESHOLD = 0.5
+SEVERITY_RANK = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+
+# Segment names (WOMEN_Cotton_Classics), percentages and decimals stay single words
+WORD_PATTERN = re.compile(r"[a-z0-9_%]+(?:\.[0-9]+)?")
+_WHITESPACE = re.compile(r'\s+')
+
+METRIC_WORDS = frozenset({'roas', 'ctr', 'cpc', 'cpa', 'cpm', 'spend', 'revenue', 'clicks', 'impressions',
+                          'purchases', 'conversions', 'budget'})
+UP_WORDS = frozenset({'rose', 'rise', 'rises', 'rising', 'risen', 'increase', 'increased', 'increases', 'increasing',
+                      'grew', 'grow', 'grows', 'growing', 'up', 'higher', 'improve', 'improved', 'improves',
+                      'improving', 'gain', 'gained', 'gains', 'surged', 'jumped', 'climbed'})
+DOWN_WORDS = frozenset({'fell', 'fall', 'falls', 'falling', 'drop', 'dropped', 'drops', 'dropping', 'decline',
+                        'declined', 'declines', 'declining', 'decrease', 'decreased', 'decreases', 'decreasing',
+                        'down', 'lower', 'worse', 'worsened', 'worsening', 'lost', 'losing', 'shrank', 'slumped'})
+
+
+def insight_text(insight: Dict[str, Any]) -> str:
+    """Title, description and evidence values of an insight as one normalized string"""
+    evidence = insight.get('evidence')
+    if isinstance(evidence, dict):
+        evidence = ' '.join(str(value) for value in evidence.values())
+    elif isinstance(evidence, list):
+        evidence = ' '.join(map(str, evidence))
+    parts = [insight.get('title'), insight.get('description'), evidence]
+    return _WHITESPACE.sub(' ', ' '.join(str(part) for part in parts if part)).strip().lower()
+
+
+def insight_signature(insight: Dict[str, Any]) -> Tuple[Optional[str], str, FrozenSet[str], FrozenSet[Tuple[Optional[str], str]]]:
+    """
+    Facts two insights must share exactly to be duplicates
+
+    Returns:
+        (evidence metric, evidence segment, segment names in the text such as
+        campaign/adset names, (metric, 'up'|'down') pairs where each direction
+        word is paired with the nearest metric word)
+    """
+    evidence = insight.get('evidence') if isinstance(insight.get('evidence'), dict) else {}
+    metric = str(evidence['metric']).strip().lower() if evidence.get('metric') else None
+    segment = str(evidence.get('segment') or '').strip().lower()
+
+    text = ' '.join(str(insight.get(field) or '') for field in ('title', 'description')).lower()
+    words = WORD_PATTERN.findall(text)
+    segments = frozenset(word for word in words if '_' in word.strip('_'))
+    metric_positions = [i for i, word in enumerate(words) if word in METRIC_WORDS]
+    directions = set()
+    for i, word in enumerate(words):
+        if word in UP_WORDS or word in DOWN_WORDS:
+            # Nearest metric word, the preceding one on ties ("ROAS rose", "falling CPC")
+            nearest = min(metric_positions, key=lambda j: (abs(j - i), j > i), default=None)
+            directions.add((words[nearest] if nearest is not None else None, 'up' if word in UP_WORDS else 'down'))
+    return metric, segment, segments, frozenset(directions)
+
+
+def hashed_ngrams(text: str) -> np.ndarray:
+    """
+    Feature ids of the character n-grams inside each non-stopword word
+
+    Words are padded with spaces, so every word yields at least one
+    n-gram; ids are crc32 hashes, stable across processes.
+    """
+    grams = []
+    for word in WORD_PATTERN.findall(text):
+        if word in STOPWORDS:
+            continue
+        padded = f' {word} '.encode('utf-8')
+        grams.extend(padded[i:i + n] for n in NGRAM_SIZES for i in range(len(padded) - n + 1))
+    return np.fromiter((zlib.crc32(gram) for gram in grams), dtype=np.int64, count=len(grams)) % N_FEATURES
+
+
+def tfidf_vectors(texts: Sequence[str]) -> np.ndarray:
+    """
+    L2-normalized TF-IDF rows over hashed character n-grams
+
+    Only the features that occur in some text become columns, so the dense
+    matrix is (texts x distinct n-grams) rather than (texts x N_FEATURES).
+
+    Args:
+        texts: Normalized texts
+
+    Returns:
+        (len(texts) x features) matrix whose row products are cosine similarities
+    """
+    ids = [hashed_ngrams(text) for text in texts]
+    rows = np.repeat(np.arange(len(texts)), [len(doc) for doc in ids])
+    features, columns = np.unique(np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64), return_inverse=True)
+    counts = np.zeros((len(texts), len(features)))
+    np.add.at(counts, (rows, columns), 1.0)
+
+    tf = np.log1p(counts)  # sublinear term frequency
+    df = (counts > 0).sum(axis=0)
+    idf = np.log((1 + len(texts)) / (1 + df)) + 1
+    vectors = tf * idf
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def cluster_insights(insights: List[Dict[str, Any]], threshold: float = DEFAULT_THRESHOLD) -> List[int]:
+    """
+    Group near-duplicate insights
+
+    Insights are visited strongest first (severity, then confidence); each
+    joins the most similar existing representative with the same
+    insight_signature and cosine similarity >= threshold, or becomes a
+    representative itself.
+
+    Args:
+        insights: Insight Agent output
+        threshold: Cosine similarity at which two insights are redundant
+
+    Returns:
+        Index of each insight's representative (its own index for representatives)
+    """
+    if len(insights) < 2:
+        return list(range(len(insights)))
+    similarity = tfidf_vectors([insight_text(insight) for insight in insights])
+    similarity = similarity @ similarity.T
+    signatures = [insight_signature(insight) for insight in insights]
+    labels = {}
+    codes = np.array([labels.setdefault(signature, len(labels)) for signature in signatures])
+    similarity[codes[:, None] != codes[None, :]] = -1.0
+
+    def strength(i: int):
+        confidence = insights[i].get('confidence')
+        return (SEVERITY_RANK.get(insights[i].get('severity'), len(SEVERITY_RANK)),
+                -confidence if isinstance(confidence, (int, float)) else 0.0, i)
+
+    representative = list(range(len(insights)))
+    leaders: List[int] = []
+    for i in sorted(range(len(insights)), key=strength):
+        if leaders:
+            best = leaders[int(np.argmax(similarity[i, leaders]))]
+            if similarity[i, best] >= threshold:
+                representative[i] = best
+                continue
+        leaders.append(i)
+    return representative
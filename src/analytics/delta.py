@@ -0,0 +1,294 @@
+"""
+Delta Prompting
+Diffs a run's aggregates against the persisted aggregates last reported for
+the same analysis so recurring analyses send the Insight Agent only the
+segments whose metrics moved materially, plus a compact summary of the
+baseline they moved from
+"""
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..reporting.store import atomic_write
+from ..utils import convert_to_serializable
+from ..utils.records import RecordTable
+
+# Relative change (%) from the baseline that makes a metric material
+DEFAULT_THRESHOLDS = {
+    'spend': 10.0, 'revenue': 10.0, 'impressions': 10.0, 'clicks': 10.0, 'purchases': 10.0,
+    'roas': 5.0, 'ctr': 5.0, 'cpc': 10.0, 'cpa': 10.0
+}
+# Sections sent in full on every run (the overall context of the analysis)
+ALWAYS_SENT = ('summary',)
+MAX_REMOVED_LABELS = 10
+# Interval bounds follow their metric and are not compared on their own
+INTERVAL_SUFFIXES = ('_ci_low', '_ci_high')
+BASELINE_SUMMARY_FIELDS = ('date_range', 'total_spend', 'total_revenue', 'overall_roas')
+DELTA_NOTE = ("Changes since these values were last reported: tables list only new segments and segments "
+              "whose metrics moved past thresholds_pct (<metric>_vs_baseline_pct is the move); omitted "
+              "segments and values moved less than their threshold, not necessarily zero")
+
+
+def baseline_key(query: str, data_path: str) -> str:
+    """Baseline identifier for a recurring analysis (same query on the same dataset)"""
+    text = f"{data_path}\n{' '.join(query.lower().split())}"
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+class BaselineStore:
+    """Last run's aggregates per analysis, stored as JSON in <root>/<key>.json"""
+
+    def __init__(self, root: str = 'baselines'):
+        """
+        Args:
+            root: Directory holding one baseline file per analysis key
+        """
+        self.root = Path(root)
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a baseline
+
+        Returns:
+            {'created', 'query', 'results'} or None when missing or unreadable
+        """
+        path = self.root / f"{key}.json"
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Ignoring unreadable baseline {path}: {e}")
+            return None
+
+    def save(self, key: str, query: str, data_results: Dict[str, Any]):
+        """Replace the baseline with the given results (see next_baseline)"""
+        baseline = {'created': datetime.now().isoformat(timespec='seconds'), 'query': query,
+                    'results': convert_to_serializable(data_results)}
+        atomic_write(self.root / f"{key}.json", json.dumps(baseline).encode('utf-8'))
+
+
+def _threshold(name: str, thresholds: Dict[str, float]) -> float:
+    """Threshold of a field (e.g. 'total_spend' -> spend); 0 = any change"""
+    if name.endswith(INTERVAL_SUFFIXES):
+        return 0.0
+    for metric, threshold in thresholds.items():
+        if name == metric or name.startswith(f'{metric}_') or name.endswith(f'_{metric}'):
+            return threshold
+    return 0.0
+
+
+def _relative_change(current: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """Change in % of |previous|; inf when a zero baseline became non-zero, NaN when both are 0"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (current - previous) * 100 / np.abs(previous)
+
+
+def _compare(current: RecordTable, previous: List[Dict[str, Any]], thresholds: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Match a table's rows to the baseline's and flag material moves
+
+    Rows are matched on the table's text columns (the segment labels).
+
+    Returns:
+        {'frame', 'keys', 'moved'} for tables without labels, plus
+        {'base', 'position', 'is_new', 'material', 'changes'} for labelled ones
+    """
+    frame = pd.DataFrame(convert_to_serializable(current), columns=current.columns)
+    base = pd.DataFrame(previous)
+    # Compared columns: metrics and fields named after them (e.g. recommended_spend)
+    numeric = [c for c in frame.columns if pd.api.types.is_numeric_dtype(frame[c])]
+    metrics = {c: _threshold(c, thresholds) for c in numeric if c in base.columns and _threshold(c, thresholds) > 0}
+    # Undefined intervals serialize as null, which can leave an all-null (non-numeric) column
+    keys = [c for c in frame.columns if c not in numeric and c in base.columns and not c.endswith(INTERVAL_SUFFIXES)]
+
+    if not keys:
+        # No segment labels: the table moved as a whole when any value moved
+        if len(frame) != len(base):
+            moved = True
+        elif metrics:
+            moved = any((np.abs(np.nan_to_num(_relative_change(frame[m].to_numpy(np.float64, na_value=np.nan),
+                                                               base[m].to_numpy(np.float64, na_value=np.nan)), nan=0.0)) >= threshold).any()
+                        for m, threshold in metrics.items())
+        else:
+            moved = frame.to_dict('records') != previous
+        return {'frame': frame, 'keys': keys, 'moved': moved}
+
+    base = base.drop_duplicates(keys).set_index(keys)
+    position = base.index.get_indexer(pd.MultiIndex.from_frame(frame[keys]) if len(keys) > 1 else pd.Index(frame[keys[0]]))
+    is_new = position < 0
+    matched = np.where(is_new, 0, position)
+
+    material = np.zeros(len(frame), dtype=bool)
+    changes = {}
+    for metric, threshold in metrics.items():
+        change = _relative_change(frame[metric].to_numpy(np.float64, na_value=np.nan),
+                                  base[metric].to_numpy(np.float64, na_value=np.nan)[matched])
+        change[is_new] = np.nan
+        material |= np.abs(np.nan_to_num(change, nan=0.0)) >= threshold
+        if metric in thresholds:
+            changes[metric] = change
+    return {'frame': frame, 'keys': keys, 'base': base, 'position': position, 'is_new': is_new,
+            'material': material, 'changes': changes}
+
+
+def _table_delta(current: RecordTable, previous: List[Dict[str, Any]],
+                 thresholds: Dict[str, float]) -> Tuple[Optional[RecordTable], Dict[str, Any]]:
+    """
+    Rows of a table that are new or moved materially since the baseline
+
+    Tables without segment labels (e.g. budget scenarios) are sent whole or
+    not at all.
+
+    Returns:
+        (delta table or None, {'changed', 'new', 'removed', 'unchanged', 'removed_labels'})
+    """
+    match = _compare(current, previous, thresholds)
+    frame = match['frame']
+    if not match['keys']:
+        moved = match['moved']
+        counts = {'changed': len(frame) if moved else 0, 'new': 0, 'removed': 0, 'unchanged': 0 if moved else len(frame)}
+        return (current if moved else None), counts
+
+    base, position, is_new, material = match['base'], match['position'], match['is_new'], match['material']
+    for metric, change in match['changes'].items():
+        frame[f'{metric}_vs_baseline_pct'] = np.round(change, 1)
+
+    seen = np.zeros(len(base), dtype=bool)
+    seen[position[~is_new]] = True
+    removed = [' / '.join(map(str, label if isinstance(label, tuple) else (label,)))
+               for label in base.index[~seen]]
+    sent = is_new | material
+    counts = {'changed': int((material & ~is_new).sum()), 'new': int(is_new.sum()),
+              'removed': len(removed), 'unchanged': int((~sent).sum())}
+    if removed:
+        counts['removed_labels'] = removed[:MAX_REMOVED_LABELS]
+    if not sent.any():
+        return None, counts
+
+    frame['change_status'] = np.where(is_new, 'new', 'changed')
+    return RecordTable.from_frame(frame[sent].reset_index(drop=True)), counts
+
+
+def _table_baseline(current: RecordTable, previous: List[Dict[str, Any]],
+                    thresholds: Dict[str, float]) -> List[Dict[str, Any]]:
+    """Baseline rows after a run: sent rows take this run's values, rows below their thresholds keep the old ones"""
+    match = _compare(current, previous, thresholds)
+    rows = match['frame'].to_dict('records')
+    if not match['keys']:
+        return rows if match['moved'] else previous
+    base = match['base'].reset_index()
+    kept = ~(match['is_new'] | match['material'])
+    old_rows = base.iloc[match['position'][kept]].to_dict('records')
+    for i, row in zip(np.flatnonzero(kept), old_rows):
+        rows[i] = row
+    return convert_to_serializable(rows)
+
+
+def _section_delta(current: Any, previous: Any, path: str, thresholds: Dict[str, float],
+                   stats: Dict[str, Dict[str, Any]]) -> Tuple[bool, Any]:
+    """(whether anything changed, the changed part of a section)"""
+    if isinstance(current, RecordTable) and isinstance(previous, list):
+        table, counts = _table_delta(current, previous, thresholds)
+        if counts['changed'] or counts['new'] or counts['removed']:
+            stats[path] = counts
+        return table is not None, table
+    if isinstance(current, dict) and isinstance(previous, dict):
+        changed = {}
+        for key, value in current.items():
+            if key not in previous:
+                changed[key] = value
+                continue
+            moved, part = _section_delta(value, previous[key], f'{path}.{key}', thresholds, stats)
+            if moved:
+                changed[key] = part
+        return bool(changed), changed
+    current = convert_to_serializable(current)
+    if isinstance(current, (int, float)) and not isinstance(current, bool) and isinstance(previous, (int, float)):
+        change = abs(float(_relative_change(np.float64(current), np.float64(previous))))
+        return change > 0 and change >= _threshold(path.rsplit('.', 1)[-1], thresholds), current
+    return current != previous, current
+
+
+def _section_baseline(current: Any, previous: Any, path: str, thresholds: Dict[str, float]) -> Any:
+    """Baseline value of a section after a run (see next_baseline)"""
+    if isinstance(current, RecordTable) and isinstance(previous, list):
+        return _table_baseline(current, previous, thresholds)
+    if isinstance(current, dict) and isinstance(previous, dict):
+        return {key: _section_baseline(value, previous[key], f'{path}.{key}', thresholds) if key in previous else value
+                for key, value in current.items()}
+    moved, value = _section_delta(current, previous, path, thresholds, {})
+    return value if moved else previous
+
+
+def delta_payload(payload: Dict[str, Any], baseline: Dict[str, Any],
+                  thresholds: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Insight payload reduced to what changed since the baseline run
+
+    The summary is always sent; other sections keep only new segments,
+    segments with a metric past its threshold and changed values. A 'delta'
+    block carries the baseline's headline totals and per-table counts.
+
+    Args:
+        payload: Current insight payload (see insight_payload)
+        baseline: A BaselineStore.load result for the same analysis
+        thresholds: Per-metric material change in % (merged over DEFAULT_THRESHOLDS)
+
+    Returns:
+        Reduced payload with a 'delta' section
+    """
+    thresholds = dict(DEFAULT_THRESHOLDS, **(thresholds or {}))
+    previous = baseline.get('results') or {}
+    stats = {}
+    reduced = {}
+    for key, section in payload.items():
+        if key in ALWAYS_SENT or key not in previous:
+            reduced[key] = section
+            continue
+        moved, part = _section_delta(section, previous[key], key, thresholds, stats)
+        if moved:
+            reduced[key] = part
+
+    summary = previous.get('summary') or {}
+    reduced['delta'] = {
+        'note': DELTA_NOTE,
+        'baseline_run': baseline.get('created'),
+        'baseline_summary': {k: summary[k] for k in BASELINE_SUMMARY_FIELDS if k in summary},
+        'thresholds_pct': thresholds,
+        'unchanged_sections': [key for key in payload if key not in reduced],
+        'segments': stats
+    }
+    return reduced
+
+
+def next_baseline(data_results: Dict[str, Any], baseline: Optional[Dict[str, Any]],
+                  thresholds: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Aggregates the following run is diffed against
+
+    Values that moved past their threshold (and new segments) were sent, so
+    they take this run's values; everything else keeps its baseline value.
+    Small moves therefore add up across runs until they are material instead
+    of being absorbed by a fresh baseline every run.
+
+    Args:
+        data_results: This run's data results
+        baseline: The BaselineStore.load result this run was diffed against (None on a full run)
+        thresholds: Per-metric material change in % (merged over DEFAULT_THRESHOLDS)
+
+    Returns:
+        Results to save with BaselineStore.save
+    """
+    if baseline is None:
+        return data_results
+    thresholds = dict(DEFAULT_THRESHOLDS, **(thresholds or {}))
+    previous = baseline.get('results') or {}
+    return {key: section if key in ALWAYS_SENT or key not in previous
+            else _section_baseline(section, previous[key], key, thresholds)
+            for key, section in data_results.items()}
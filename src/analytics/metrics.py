@@ -0,0 +1,72 @@
+"""
+Derived Metric Kernel
+Computes the ratio metrics (ctr, roas, cpc, cpa) from summed measure arrays
+in one masked pass per metric: a zero denominator yields the fill value
+directly, so results never need an inf/NaN cleanup pass afterwards
+"""
+from typing import Dict, Any, Iterable, Mapping, Optional
+
+import numpy as np
+
+# Measures that are summed before ratios are taken
+SUMMED_MEASURES = ['spend', 'impressions', 'clicks', 'purchases', 'revenue']
+
+DERIVED_METRICS = {
+    # name: (numerator, denominator, scale, decimals)
+    'ctr': ('clicks', 'impressions', 100.0, 4),
+    'roas': ('revenue', 'spend', 1.0, 2),
+    'cpc': ('spend', 'clicks', 1.0, 2),
+    'cpa': ('spend', 'purchases', 1.0, 2)
+}
+
+
+def derive_metrics(totals: Mapping[str, Any], metrics: Optional[Iterable[str]] = None,
+                   fill: float = 0.0, rounded: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Ratio metrics from summed measures
+
+    Args:
+        totals: Summed measures (arrays of any shape, Series or scalars)
+        metrics: Metrics to compute (default: all of DERIVED_METRICS)
+        fill: Value where the denominator is zero (e.g. 0, or NaN to mark "undefined")
+        rounded: Round to each metric's reporting precision
+
+    Returns:
+        Metric name -> float64 array shaped like the inputs
+    """
+    derived = {}
+    for name in DERIVED_METRICS if metrics is None else metrics:
+        numerator, denominator, scale, decimals = DERIVED_METRICS[name]
+        top = np.asarray(totals[numerator], dtype=np.float64)
+        bottom = np.asarray(totals[denominator], dtype=np.float64)
+        out = np.full(np.broadcast(top, bottom).shape, fill, dtype=np.float64)
+        defined = bottom != 0
+        np.divide(top, bottom, out=out, where=defined)
+        if scale != 1.0:
+            np.multiply(out, scale, out=out, where=defined)
+        if rounded:
+            np.round(out, decimals, out=out)
+        derived[name] = out
+    return derived
+
+
+def period_metrics(totals: Mapping[str, Any]) -> Dict[str, float]:
+    """
+    Totals and unrounded roas/ctr for one period (scalars)
+
+    Args:
+        totals: Summed measures of the period
+
+    Returns:
+        spend, revenue, roas, impressions, clicks, purchases and ctr
+    """
+    ratios = derive_metrics(totals, ('roas', 'ctr'), rounded=False)
+    return {
+        'spend': totals['spend'],
+        'revenue': totals['revenue'],
+        'roas': float(ratios['roas']),
+        'impressions': totals['impressions'],
+        'clicks': totals['clicks'],
+        'purchases': totals['purchases'],
+        'ctr': float(ratios['ctr'])
+    }
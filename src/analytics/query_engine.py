@@ -0,0 +1,294 @@
+"""
+Columnar Query Engine
+Answers small structured query specs (dimensions, measures, filters, time
+window, sort, limit) over dictionary-encoded column arrays: predicates are
+pushed down to the dictionaries and the date column before any measure is
+touched, only referenced columns are gathered, and grouping is a
+factorized key plus one bincount per measure
+"""
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..utils.records import RecordTable
+from .metrics import SUMMED_MEASURES, DERIVED_METRICS, derive_metrics
+
+# Summed measures and the derived ratios computed from them after grouping
+BASE_MEASURES = SUMMED_MEASURES
+DERIVED_MEASURES = DERIVED_METRICS
+MEASURES = BASE_MEASURES + list(DERIVED_MEASURES) + ['rows']
+
+DIMENSION_COLUMNS = ['campaign_name', 'adset_name', 'creative_type', 'creative_message',
+                     'audience_type', 'platform', 'country']
+TIME_GRAINS = ['date', 'week', 'month']
+# Plan-style names accepted for dimension columns
+DIMENSION_ALIASES = {'campaign': 'campaign_name', 'adset': 'adset_name', 'creative': 'creative_message',
+                     'message': 'creative_message', 'audience': 'audience_type', 'day': 'date'}
+
+COMPARISONS = {
+    '>': np.greater, '>=': np.greater_equal, '<': np.less, '<=': np.less_equal,
+    '==': np.equal, '=': np.equal, '!=': np.not_equal
+}
+# Dimension filter values (alone or in a list)
+SCALARS = (str, int, float)
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+
+
+def _dimension(name: Any) -> Optional[str]:
+    name = str(name).lower()
+    name = DIMENSION_ALIASES.get(name, name)
+    return name if name in DIMENSION_COLUMNS or name in TIME_GRAINS else None
+
+
+def _names(value: Any) -> List[str]:
+    """A name list from a spec field: one string becomes a one-item list, non-strings are dropped"""
+    if isinstance(value, str):
+        return [value]
+    return [item for item in value if isinstance(item, str)] if isinstance(value, (list, tuple)) else []
+
+
+def _bound(column: str, bound: Any) -> Any:
+    """Comparison bound as a float (measures) or ISO day (dates), or None if it does not parse"""
+    if isinstance(bound, bool):
+        return None
+    try:
+        if column in MEASURES:
+            bound = float(bound)
+            return bound if np.isfinite(bound) else None
+        return str(np.datetime64(str(bound), 'D'))
+    except (TypeError, ValueError):
+        return None
+
+
+def _sort_keys(sort: Any, measures: List[str], dimensions: List[str]) -> List[Tuple[str, bool]]:
+    """Normalize "-roas" / ["country", "-spend"] / {"by": "roas", "desc": true} into (column, descending)"""
+    entries = sort if isinstance(sort, list) else [sort] if sort else []
+    keys = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            column, descending = str(entry.get('by', '')), bool(entry.get('desc', True))
+        else:
+            column = str(entry)
+            descending = column.startswith('-')
+            column = column.lstrip('+-')
+        column = _dimension(column) or column
+        if column in measures or column in dimensions:
+            keys.append((column, descending))
+    return keys or ([(measures[0], True)] if measures else [])
+
+
+def normalize_query(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate a query spec, dropping parts the engine can't evaluate
+
+    Comparison dicts are kept only on measures and time grains, with bounds
+    that parse as numbers or dates; dimension filters must be scalars or
+    lists of scalars.
+
+    Args:
+        spec: Raw spec, e.g. ``{"dimensions": ["country"], "measures": ["roas"],
+            "filters": {"platform": "Instagram", "roas": {">": 2}},
+            "window_days": 14, "sort": "-roas", "limit": 5}``
+
+    Returns:
+        Clean spec; measures default to spend, revenue and roas
+    """
+    dimensions = list(dict.fromkeys(d for d in map(_dimension, _names(spec.get('dimensions'))) if d))
+    measures = [m for m in dict.fromkeys(_names(spec.get('measures'))) if m in MEASURES] or ['spend', 'revenue', 'roas']
+
+    filters: Dict[str, Any] = {}
+    raw_filters = spec.get('filters')
+    for key, value in (raw_filters.items() if isinstance(raw_filters, dict) else []):
+        if not isinstance(key, str):
+            continue
+        column = _dimension(key) or (key if key in MEASURES else None)
+        if column is None:
+            continue
+        if isinstance(value, dict):
+            if column not in MEASURES and column not in TIME_GRAINS:
+                continue  # comparisons only apply to measures and dates
+            value = {op: _bound(column, bound) for op, bound in value.items() if op in COMPARISONS}
+            value = {op: bound for op, bound in value.items() if bound is not None}
+        elif column in MEASURES or column in TIME_GRAINS:
+            continue  # measures and dates only take comparison dicts
+        elif isinstance(value, (list, tuple)):
+            value = [v for v in value if isinstance(v, SCALARS)]
+        elif not isinstance(value, SCALARS):
+            continue
+        if value in ('', [], {}):
+            continue
+        filters[column] = value
+
+    try:
+        window_days = int(spec.get('window_days') or 0)
+    except (TypeError, ValueError):
+        window_days = 0
+    try:
+        limit = min(max(int(spec.get('limit') or DEFAULT_LIMIT), 1), MAX_LIMIT)
+    except (TypeError, ValueError):
+        limit = DEFAULT_LIMIT
+
+    query = {'dimensions': dimensions, 'measures': measures, 'filters': filters,
+             'sort': [('-' if desc else '') + column for column, desc in _sort_keys(spec.get('sort'), measures, dimensions)],
+             'limit': limit}
+    if window_days > 0:
+        query['window_days'] = window_days
+    return query
+
+
+class ColumnStore:
+    """Column arrays of the ads table with lazily dictionary-encoded dimensions"""
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Args:
+            df: Ads rows with a datetime 'date' column
+        """
+        self.df = df
+        self.num_rows = len(df)
+        self.days = df['date'].to_numpy().astype('datetime64[D]')
+        self.max_day = self.days.max() if self.num_rows else None
+        self._measures: Dict[str, np.ndarray] = {}
+        self._dimensions: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def measure(self, name: str) -> np.ndarray:
+        """Float column with missing values as 0 (as in a groupby sum)"""
+        if name not in self._measures:
+            self._measures[name] = np.nan_to_num(self.df[name].to_numpy(dtype=np.float64, na_value=np.nan))
+        return self._measures[name]
+
+    def dimension(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(codes per row, dictionary of unique values); missing values are their own group"""
+        if name not in self._dimensions:
+            if name == 'date':
+                values = self.days
+            elif name == 'week':
+                day_numbers = self.days.astype(np.int64)
+                # 1970-01-01 was a Thursday: shift so weeks start on Monday
+                values = (day_numbers - (day_numbers + 3) % 7).astype('datetime64[D]')
+            elif name == 'month':
+                values = self.days.astype('datetime64[M]').astype('datetime64[D]')
+            else:
+                values = self.df[name]
+            codes, uniques = pd.factorize(values, sort=name in TIME_GRAINS, use_na_sentinel=False)
+            uniques = np.asarray(uniques, dtype=object)
+            uniques[pd.isna(uniques)] = None
+            self._dimensions[name] = (codes.astype(np.int64), uniques)
+        return self._dimensions[name]
+
+
+def _dictionary_mask(uniques: np.ndarray, column: str, value: Any) -> np.ndarray:
+    """Evaluate a dimension predicate once per dictionary entry (not per row)"""
+    if isinstance(value, dict):
+        mask = np.ones(len(uniques), dtype=bool)
+        for op, bound in value.items():
+            mask &= COMPARISONS[op](uniques.astype('datetime64[D]'), np.datetime64(str(bound), 'D'))
+        return mask
+    if isinstance(value, (list, tuple)):
+        wanted = {str(v).lower() for v in value}
+        return np.array([str(u).lower() in wanted for u in uniques], dtype=bool)
+    if column == 'campaign_name':
+        # Same semantics as DataAgent filters: case-insensitive substring
+        needle = str(value).lower()
+        return np.array([isinstance(u, str) and needle in u.lower() for u in uniques], dtype=bool)
+    return np.array([str(u).lower() == str(value).lower() for u in uniques], dtype=bool)
+
+
+def execute(store: ColumnStore, spec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run a query spec
+
+    Args:
+        store: Column store over the ads table
+        spec: Query spec (normalized here)
+
+    Returns:
+        Dictionary with the normalized 'query', result 'rows' (RecordTable),
+        'groups' before the limit, and scan statistics
+    """
+    query = normalize_query(spec)
+    dimensions, measures = query['dimensions'], query['measures']
+
+    # 1. Predicate pushdown: time window, then dimension predicates on dictionaries
+    selected = np.ones(store.num_rows, dtype=bool)
+    if query.get('window_days') and store.num_rows:
+        selected &= store.days >= store.max_day - np.timedelta64(query['window_days'], 'D')
+    having = {}
+    for column, value in query['filters'].items():
+        if column in MEASURES:
+            having[column] = value
+            continue
+        codes, uniques = store.dimension(column)
+        keep = _dictionary_mask(uniques, column, value)
+        selected &= keep[codes]
+    rows = np.flatnonzero(selected)
+
+    # 2. Grouping key over the selected rows only
+    group_key = np.zeros(len(rows), dtype=np.int64)
+    key_range = 1
+    for column in dimensions:
+        codes, uniques = store.dimension(column)
+        if key_range * len(uniques) >= 2 ** 62:
+            # Re-densify before the combined key could overflow int64
+            group_key = np.unique(group_key, return_inverse=True)[1].astype(np.int64)
+            key_range = int(group_key.max()) + 1 if len(group_key) else 1
+        group_key = group_key * len(uniques) + codes[rows]
+        key_range *= len(uniques)
+    if dimensions:
+        _, first_rows, inverse = np.unique(group_key, return_index=True, return_inverse=True)
+    else:
+        first_rows, inverse = np.zeros(1 if len(rows) else 0, dtype=np.int64), np.zeros(len(rows), dtype=np.int64)
+    num_groups = len(first_rows)
+
+    # 3. Aggregate only the measures the query references (column pruning)
+    referenced = set(measures) | set(having) | {column.lstrip('-') for column in query['sort']}
+    needed = {m for m in referenced if m in BASE_MEASURES}
+    for name in referenced & set(DERIVED_MEASURES):
+        needed.update(DERIVED_MEASURES[name][:2])
+    totals = {name: np.bincount(inverse, weights=store.measure(name)[rows], minlength=num_groups) for name in needed}
+    totals['rows'] = np.bincount(inverse, minlength=num_groups).astype(np.int64)
+    totals.update(derive_metrics(totals, [name for name in DERIVED_MEASURES if name in referenced]))
+
+    # 4. HAVING on aggregated measures
+    keep = np.ones(num_groups, dtype=bool)
+    for name, conditions in having.items():
+        for op, bound in conditions.items():
+            keep &= COMPARISONS[op](totals[name], float(bound))
+    groups = np.flatnonzero(keep)
+
+    # Decode dimension values from each group's first row
+    labels = {}
+    for column in dimensions:
+        codes, uniques = store.dimension(column)
+        labels[column] = uniques[codes[rows[first_rows[groups]]]]
+
+    # 5. Sort + limit (lexsort: last key is primary)
+    order = np.arange(len(groups))
+    if query['sort'] and len(groups):
+        sort_arrays = []
+        for entry in reversed(query['sort']):
+            column = entry.lstrip('-')
+            values = labels[column] if column in labels else totals[column][groups]
+            ranks = pd.factorize(values, sort=True)[0] if values.dtype == object else values
+            sort_arrays.append(-ranks if entry.startswith('-') else ranks)
+        order = np.lexsort(sort_arrays)
+    order = order[:query['limit']]
+
+    data = {}
+    for column in dimensions:
+        values = labels[column][order]
+        if column in TIME_GRAINS:
+            values = np.array([str(value)[:10] for value in values], dtype=object)
+        data[column] = values
+    for name in measures:
+        data[name] = totals[name][groups][order]
+
+    return {
+        'query': query,
+        'rows': RecordTable(data),
+        'groups': int(len(groups)),
+        'rows_scanned': int(store.num_rows),
+        'rows_matched': int(len(rows))
+    }
@@ -0,0 +1,166 @@
+"""
+Creative Message Index
+Interns creative_message strings once, tokenizes each unique message into
+unigrams and bigrams, and keeps a term -> message inverted index so that
+per-term (theme) performance is two sparse products instead of a string groupby
+"""
+import re
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .metrics import derive_metrics
+
+MEASURES = ['spend', 'impressions', 'clicks', 'purchases', 'revenue']
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:['’][a-z]+)?")
+
+# Filler words that never make a useful copy element on their own
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'every', 'for', 'from', 'in', 'into', 'is', 'it',
+    'of', 'on', 'or', 'that', 'the', 'this', 'to', 'with', 'you', 'your', 'you’ll', "you'll", 'now', 'new'
+})
+
+
+def tokenize(message: str) -> List[str]:
+    """
+    Split a message into normalized unigrams and bigrams
+
+    Args:
+        message: Raw creative message
+
+    Returns:
+        Unique terms in first-seen order (bigrams join words with a space)
+    """
+    words = [word for word in TOKEN_PATTERN.findall(message.lower())
+             if word not in STOPWORDS]
+    terms = words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+    return list(dict.fromkeys(terms))
+
+
+class MessageIndex:
+    """Interned message store with an inverted index over message terms"""
+
+    def __init__(self, messages: pd.Series):
+        """
+        Args:
+            messages: The creative_message column (one entry per data row)
+        """
+        codes, uniques = pd.factorize(messages, use_na_sentinel=False)
+        self.row_codes = codes
+        self.messages = np.asarray(uniques, dtype=object)
+
+        term_ids: Dict[str, int] = {}
+        pair_messages: List[int] = []
+        pair_terms: List[int] = []
+        for message_id, message in enumerate(self.messages):
+            if not isinstance(message, str):
+                continue
+            for term in tokenize(message):
+                pair_messages.append(message_id)
+                pair_terms.append(term_ids.setdefault(term, len(term_ids)))
+
+        self.terms = np.array(list(term_ids), dtype=object)
+        self._term_ids = term_ids
+
+        # COO (message, term) incidence, sorted by term so postings are CSR slices
+        pair_messages = np.asarray(pair_messages, dtype=np.int64)
+        pair_terms = np.asarray(pair_terms, dtype=np.int64)
+        order = np.argsort(pair_terms, kind='stable')
+        self.posting_messages = pair_messages[order]
+        self.posting_terms = pair_terms[order]
+        self.term_offsets = np.concatenate(([0], np.cumsum(np.bincount(pair_terms, minlength=len(self.terms)))))
+
+    @property
+    def size(self) -> int:
+        """Number of unique messages"""
+        return len(self.messages)
+
+    def lookup(self, term: str) -> List[str]:
+        """
+        Messages containing a term
+
+        Args:
+            term: Unigram or bigram (case-insensitive)
+
+        Returns:
+            Matching unique messages
+        """
+        term_id = self._term_ids.get(term.lower())
+        if term_id is None:
+            return []
+        start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+        return self.messages[self.posting_messages[start:end]].tolist()
+
+    def message_totals(self, df: pd.DataFrame, row_positions: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Sum measures per unique message
+
+        Args:
+            df: Rows to aggregate (a subset of the indexed frame)
+            row_positions: Positions of df's rows in the indexed frame (None = all rows)
+
+        Returns:
+            Mapping of measure -> array indexed by message id, plus 'rows'
+        """
+        codes = self.row_codes if row_positions is None else self.row_codes[row_positions]
+        totals = {}
+        for measure in MEASURES:
+            column = df[measure]
+            # Missing values count as zero, as in a groupby sum
+            weights = np.nan_to_num(column.to_numpy(dtype=np.float64, na_value=np.nan))
+            summed = np.bincount(codes, weights=weights, minlength=self.size)
+            # Keep integer measures (impressions, purchases) integral like a groupby sum
+            totals[measure] = summed.round().astype(np.int64) if pd.api.types.is_integer_dtype(column) else summed
+        totals['rows'] = np.bincount(codes, minlength=self.size)
+        return totals
+
+    def term_totals(self, message_totals: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Sum message-level measures per term (incidence-matrix transpose times totals)
+
+        Args:
+            message_totals: Output of message_totals
+
+        Returns:
+            Mapping of measure -> array indexed by term id, plus 'messages'
+        """
+        present = message_totals['rows'][self.posting_messages] > 0
+        terms = self.posting_terms[present]
+        posted = self.posting_messages[present]
+        totals = {measure: np.bincount(terms, weights=message_totals[measure][posted], minlength=len(self.terms))
+                  for measure in MEASURES}
+        totals['messages'] = np.bincount(terms, minlength=len(self.terms))
+        return totals
+
+    def theme_performance(self, message_totals: Dict[str, np.ndarray], min_messages: int = 2,
+                          rank_by: str = 'roas', top_n: int = 15) -> List[Dict[str, Any]]:
+        """
+        Rank message terms (copy elements) by aggregated performance
+
+        Args:
+            message_totals: Output of message_totals for the selected rows
+            min_messages: Ignore terms used by fewer unique messages
+            rank_by: 'roas', 'ctr', 'revenue', 'spend' or 'purchases' (others fall back to 'roas')
+            top_n: Number of themes to return
+
+        Returns:
+            List of theme dictionaries sorted by rank_by
+        """
+        totals = self.term_totals(message_totals)
+        keep = np.flatnonzero(totals['messages'] >= min_messages)
+        if not len(keep):
+            return []
+
+        spend = totals['spend'][keep]
+        themes = pd.DataFrame({
+            'term': self.terms[keep],
+            'messages': totals['messages'][keep],
+            'spend': spend.round(2),
+            'revenue': totals['revenue'][keep].round(2),
+            'purchases': totals['purchases'][keep].round().astype(np.int64),
+            **derive_metrics({name: totals[name][keep] for name in ('clicks', 'impressions', 'revenue', 'spend')},
+                             ('ctr', 'roas'))
+        })
+        return themes.nlargest(top_n, rank_by if rank_by in themes.columns else 'roas').to_dict('records')
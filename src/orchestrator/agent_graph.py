@@ -2,17 +2,48 @@
 Agent Graph Orchestrator
 Coordinates the flow of data between agents following the assignment spec
 """
+import asyncio
+import contextvars
 import time
-from typing import Dict, Any, List
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 
 from ..agents.planner_agent import PlannerAgent
-from ..agents.data_agent import DataAgent
+from ..agents.data_agent import DEFAULT_ANALYSES, DataAgent, insight_payload, normalize_analyses
 from ..agents.insight_agent import InsightAgent
 from ..agents.evaluator_agent import EvaluatorAgent
 from ..agents.creative_agent import CreativeAgent
+from ..analytics.bootstrap import DEFAULT_SEED
+from ..analytics.dedup import DEFAULT_THRESHOLD, cluster_insights
+from ..analytics.delta import BaselineStore, baseline_key, delta_payload, next_baseline
+from ..analytics.text_index import STOPWORDS, TOKEN_PATTERN
 from ..utils.logger import ExecutionLogger
-from ..utils.data_loader import load_facebook_ads_data
+from ..utils.cache import get_cache
+from ..utils.checkpoint import KEEP_RUNS, STAGES, RunCheckpoint, is_failure, prune_runs
+from ..utils.profiling import Profiler, metrics, serve_metrics, span
+
+
+def objective_overlap(query: str, objective: str) -> float:
+    """
+    Share of common content words between a query and a plan objective
+    
+    Uses the overlap coefficient |Q ∩ O| / min(|Q|, |O|), so an objective that
+    restates the query with extra detail still counts as a match.
+    
+    Args:
+        query: Raw user query
+        objective: Planner objective
+        
+    Returns:
+        Overlap in [0, 1] (0 when either side has no content words)
+    """
+    query_terms, objective_terms = (
+        {word for word in TOKEN_PATTERN.findall(text.lower()) if word not in STOPWORDS}
+        for text in (query, objective)
+    )
+    if not query_terms or not objective_terms:
+        return 0.0
+    return len(query_terms & objective_terms) / min(len(query_terms), len(objective_terms))
 
 
 class AgentGraph:
@@ -24,49 +55,464 @@ class AgentGraph:
     def __init__(self, config: Dict[str, Any]):
         """Initialize the agent graph with configuration"""
         self.config = config
-        self.logger = ExecutionLogger()
+        self.logger = ExecutionLogger(config.get('log_dir', 'logs'))
         
         # Initialize agents
         self.planner = PlannerAgent(config)
-        self.data_agent = DataAgent(config['data_path'])
+        self.data_agent = DataAgent(config['data_path'], cache=get_cache(config.get('cache')),
+                                    random_seed=config.get('random_seed', DEFAULT_SEED))
         self.insight_agent = InsightAgent(config)
         self.evaluator = EvaluatorAgent(config)
         self.creative_agent = CreativeAgent(config)
+        
+        # Profiling: span tree in the trace, optional OpenMetrics export
+        self.profiling = config.get('profiling') or {}
+        if self.profiling.get('metrics_port'):
+            serve_metrics(int(self.profiling['metrics_port']))
+        
+        # Stage checkpoints for --resume
+        self.checkpoints = config.get('checkpoints') or {}
+        
+        # Optional speculative insight generation alongside planning
+        self.speculation = config.get('speculative_insights') or {}
+        
+        # Optional delta prompting: insights see only what changed since the last run
+        self.delta = config.get('delta_prompting') or {}
+        
+        # Optional local near-duplicate clustering: one evaluation per cluster
+        self.dedup = config.get('insight_dedup') or {}
     
-    def execute(self, user_query: str) -> Dict[str, Any]:
+    def execute(self, user_query: Optional[str] = None, resume: Optional[str] = None) -> Dict[str, Any]:
         """
         Execute the full agent workflow
         
+        Args:
+            user_query: User's analysis query (optional when resuming)
+            resume: Run ID of a checkpointed run; finished stages and
+                evaluations are restored instead of recomputed
+            
+        Returns:
+            Dictionary with all results
+        """
+        logger = self.logger = ExecutionLogger(self.config.get('log_dir', 'logs'))
+        checkpoint, user_query = self._open_checkpoint(logger, user_query, resume)
+        profiler = Profiler(capture=self.profiling.get('capture'), output_dir=str(logger.log_dir))
+        
+        if self.profiling.get('enabled', True):
+            with profiler.activate():
+                with span('execute', 'pipeline'):
+                    results = self._run_pipeline(user_query, logger, checkpoint)
+            logger.set_profile(profiler.to_dict())
+        else:
+            results = self._run_pipeline(user_query, logger, checkpoint)
+        
+        self._finish(logger)
+        return results
+    
+    async def execute_async(self, user_query: Optional[str] = None, timeout: Optional[float] = None,
+                            resume: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Execute the workflow on the running event loop
+        
+        LLM calls are awaited, DataAgent work runs in a worker thread and
+        evaluations run concurrently, so one loop can serve many analyses.
+        Each call gets its own execution log.
+        
         Args:
             user_query: User's analysis query
+            timeout: Optional overall deadline in seconds (asyncio.TimeoutError
+                is raised and in-flight stages are cancelled)
+            resume: Run ID of a checkpointed run to continue
             
         Returns:
             Dictionary with all results
         """
+        logger = self.logger = ExecutionLogger(self.config.get('log_dir', 'logs'))
+        checkpoint, user_query = self._open_checkpoint(logger, user_query, resume)
+        profiler = Profiler(capture=self.profiling.get('capture'), output_dir=str(logger.log_dir))
+        
+        if self.profiling.get('enabled', True):
+            with profiler.activate():
+                with span('execute', 'pipeline'):
+                    results = await asyncio.wait_for(self._run_pipeline_async(user_query, logger, checkpoint), timeout)
+            logger.set_profile(profiler.to_dict())
+        else:
+            results = await asyncio.wait_for(self._run_pipeline_async(user_query, logger, checkpoint), timeout)
+        
+        self._finish(logger)
+        return results
+    
+    def _open_checkpoint(self, logger: ExecutionLogger, user_query: Optional[str],
+                         resume: Optional[str]) -> Tuple[Optional[RunCheckpoint], str]:
+        """Checkpoint for this run (None when disabled) and the query it belongs to"""
+        root = self.checkpoints.get('dir', 'checkpoints')
+        if resume:
+            checkpoint = RunCheckpoint(resume, root)
+            meta = checkpoint.load_meta()
+            user_query = user_query or meta['query']
+            if meta.get('fingerprint') != self.data_agent.fingerprint:
+                print("[WARN] Dataset changed since the checkpoint; recomputing from the data stage")
+                checkpoint.discard(STAGES[1:])
+            print(f"[RESUME] Run {resume}: restoring {', '.join(checkpoint.completed()) or 'nothing'}")
+        elif self.checkpoints.get('enabled'):
+            checkpoint = RunCheckpoint(logger.run_id, root)
+            print(f"[CHECKPOINT] Run {logger.run_id} (continue with --resume {logger.run_id})")
+        else:
+            return None, user_query
+        
+        checkpoint.save_meta(query=user_query, fingerprint=self.data_agent.fingerprint)
+        if not resume:
+            prune_runs(root, self.checkpoints.get('keep_runs', KEEP_RUNS), protect=checkpoint.run_id)
+        logger.set_metadata(run_id=checkpoint.run_id)
+        return checkpoint, user_query
+    
+    def _finish(self, logger: ExecutionLogger):
+        # Save execution log
+        log_path = logger.save()
+        print(f"\n[LOG] Execution log saved: {log_path}")
+        if self.profiling.get('metrics_file'):
+            metrics.write(self.profiling['metrics_file'])
+            print(f"[LOG] Metrics written: {self.profiling['metrics_file']}")
+        
+        print(f"\n{'='*60}")
+        print("[DONE] Analysis Complete!")
+        print(f"{'='*60}\n")
+    
+    def _run_pipeline(self, user_query: str, logger: ExecutionLogger,
+                      checkpoint: Optional[RunCheckpoint] = None) -> Dict[str, Any]:
+        """Run the planner → data → insight → evaluator → creative stages"""
+        results = {}
+        self._start(user_query, logger)
+        
+        front = self._run_front_speculative if self._speculating(checkpoint) else self._run_front
+        plan, data_results, insights = front(user_query, logger, results, checkpoint)
+        
+        start_time = time.time()
+        representatives = self._representatives(insights)
+        evaluations = self._restore_evaluations(checkpoint, insights)
+        with span('evaluate_insights'):
+            for i, insight in enumerate(insights):
+                if evaluations[i] is None and representatives[i] == i:
+                    evaluations[i] = self.evaluator.evaluate_insight(insight, data_results)
+                    self._save(checkpoint, RunCheckpoint.evaluation_name(i), evaluations[i])
+        validated_insights = self._record_evaluations(logger, results, insights, evaluations, representatives,
+                                                       time.time() - start_time)
+        
+        start_time = time.time()
+        creatives = self._restore(checkpoint, 'creatives')
+        if creatives is None:
+            with span('generate_creatives'):
+                creatives = self.creative_agent.generate_creatives(validated_insights, self._creative_data(data_results))
+            self._save(checkpoint, 'creatives', creatives)
+        self._record_creatives(logger, results, validated_insights, creatives, time.time() - start_time)
+        
+        return results
+    
+    async def _run_pipeline_async(self, user_query: str, logger: ExecutionLogger,
+                                  checkpoint: Optional[RunCheckpoint] = None) -> Dict[str, Any]:
+        """Async twin of _run_pipeline (same stages, same log steps)"""
+        results = {}
+        self._start(user_query, logger)
+        
+        front = self._run_front_speculative_async if self._speculating(checkpoint) else self._run_front_async
+        plan, data_results, insights = await front(user_query, logger, results, checkpoint)
+        
+        start_time = time.time()
+        representatives = self._representatives(insights)
+        evaluations = self._restore_evaluations(checkpoint, insights)
+        
+        async def evaluate(i: int, insight: Dict[str, Any]):
+            evaluations[i] = await self.evaluator.evaluate_insight_async(insight, data_results)
+            self._save(checkpoint, RunCheckpoint.evaluation_name(i), evaluations[i])
+        
+        with span('evaluate_insights'):
+            await asyncio.gather(*(evaluate(i, insight) for i, insight in enumerate(insights)
+                                   if evaluations[i] is None and representatives[i] == i))
+        validated_insights = self._record_evaluations(logger, results, insights, evaluations, representatives,
+                                                       time.time() - start_time)
+        
+        start_time = time.time()
+        creatives = self._restore(checkpoint, 'creatives')
+        if creatives is None:
+            with span('generate_creatives'):
+                creatives = await self.creative_agent.generate_creatives_async(validated_insights,
+                                                                               self._creative_data(data_results))
+            self._save(checkpoint, 'creatives', creatives)
+        self._record_creatives(logger, results, validated_insights, creatives, time.time() - start_time)
+        
+        return results
+    
+    def _run_front(self, user_query: str, logger: ExecutionLogger, results: Dict[str, Any],
+                   checkpoint: Optional[RunCheckpoint]) -> Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]]:
+        """Planner → data → insights, one after another (restoring checkpointed stages)"""
+        start_time = time.time()
+        plan = self._restore(checkpoint, 'plan')
+        if plan is None:
+            with span('create_plan'):
+                plan = self.planner.create_plan(user_query)
+            self._save(checkpoint, 'plan', plan)
+        self._record_plan(logger, results, user_query, plan, time.time() - start_time)
+        
+        start_time = time.time()
+        cache_hits = self.data_agent.cache.hits if self.data_agent.cache else 0
+        data_results = self._restore(checkpoint, 'data')
+        if data_results is None:
+            # Multi-level analysis, limited to what the plan asks for
+            with span('analyze_data'):
+                data_results = self.data_agent.run_analyses(plan.get('analyses'))
+            self._save(checkpoint, 'data', data_results)
+        self._record_data(logger, results, user_query, plan, data_results, time.time() - start_time, cache_hits)
+        
+        start_time = time.time()
+        insights = self._restore(checkpoint, 'insights')
+        if insights is None:
+            with span('generate_insights'):
+                insights = self.insight_agent.generate_insights(self._insight_payload(data_results, user_query),
+                                                                self._context(plan, user_query))
+            self._save(checkpoint, 'insights', insights)
+        self._record_insights(logger, user_query, data_results, insights, time.time() - start_time)
+        
+        return plan, data_results, insights
+    
+    async def _run_front_async(self, user_query: str, logger: ExecutionLogger, results: Dict[str, Any],
+                               checkpoint: Optional[RunCheckpoint]) -> Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]]:
+        """Async twin of _run_front"""
+        start_time = time.time()
+        plan = self._restore(checkpoint, 'plan')
+        if plan is None:
+            with span('create_plan'):
+                plan = await self.planner.create_plan_async(user_query)
+            self._save(checkpoint, 'plan', plan)
+        self._record_plan(logger, results, user_query, plan, time.time() - start_time)
+        
+        start_time = time.time()
+        cache_hits = self.data_agent.cache.hits if self.data_agent.cache else 0
+        data_results = self._restore(checkpoint, 'data')
+        if data_results is None:
+            # CPU-bound pandas work runs off the loop; to_thread carries the span context along
+            with span('analyze_data'):
+                data_results = await asyncio.to_thread(self.data_agent.run_analyses, plan.get('analyses'))
+            self._save(checkpoint, 'data', data_results)
+        self._record_data(logger, results, user_query, plan, data_results, time.time() - start_time, cache_hits)
+        
+        start_time = time.time()
+        insights = self._restore(checkpoint, 'insights')
+        if insights is None:
+            with span('generate_insights'):
+                insights = await self.insight_agent.generate_insights_async(self._insight_payload(data_results, user_query),
+                                                                            self._context(plan, user_query))
+            self._save(checkpoint, 'insights', insights)
+        self._record_insights(logger, user_query, data_results, insights, time.time() - start_time)
+        
+        return plan, data_results, insights
+    
+    # Speculative insights: generate insights for the raw query while the planner runs
+    
+    def _speculating(self, checkpoint: Optional[RunCheckpoint]) -> bool:
+        if not self.speculation.get('enabled'):
+            return False
+        return checkpoint is None or checkpoint.load('plan') is None
+    
+    def _divergence(self, plan: Dict[str, Any], user_query: str) -> Optional[str]:
+        """Why the speculation (default analyses, raw query) does not fit the plan, or None when it does"""
+        if normalize_analyses(plan.get('analyses')) != DEFAULT_ANALYSES:
+            return "Plan requests other analyses than the speculation ran"
+        if 'error' in plan:
+            return None  # planner fallback: the raw query is the better context anyway
+        overlap = objective_overlap(user_query, plan.get('objective', ''))
+        if overlap < self.speculation.get('min_overlap', 0.5):
+            return "Plan objective diverged from the query"
+        return None
+    
+    @staticmethod
+    def _timed(name: str, func, *args) -> Tuple[Any, float]:
+        start_time = time.time()
+        with span(name):
+            value = func(*args)
+        return value, time.time() - start_time
+    
+    @staticmethod
+    async def _timed_async(name: str, call) -> Tuple[Any, float]:
+        start_time = time.time()
+        with span(name):
+            value = await call
+        return value, time.time() - start_time
+    
+    def _speculate(self, user_query: str) -> Tuple[Dict[str, Any], float, List[Dict[str, Any]], float]:
+        # Full default analyses: the plan's analysis list is not known yet
+        data_results, data_duration = self._timed('analyze_data', self.data_agent.run_analyses, None)
+        insights, insight_duration = self._timed('generate_insights', self.insight_agent.generate_insights,
+                                                 self._insight_payload(data_results, user_query), self._context({}, user_query))
+        return data_results, data_duration, insights, insight_duration
+    
+    async def _speculate_async(self, user_query: str) -> Tuple[Dict[str, Any], float, List[Dict[str, Any]], float]:
+        data_results, data_duration = await self._timed_async(
+            'analyze_data', asyncio.to_thread(self.data_agent.run_analyses, None))
+        insights, insight_duration = await self._timed_async('generate_insights', self.insight_agent.generate_insights_async(
+            self._insight_payload(data_results, user_query), self._context({}, user_query)))
+        return data_results, data_duration, insights, insight_duration
+    
+    def _run_front_speculative(self, user_query: str, logger: ExecutionLogger, results: Dict[str, Any],
+                               checkpoint: Optional[RunCheckpoint]) -> Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]]:
+        """Plan in a worker thread while data and insights for the raw query run here"""
+        cache_hits = self.data_agent.cache.hits if self.data_agent.cache else 0
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            # copy_context keeps the planner's spans under this run's span tree
+            planning = pool.submit(contextvars.copy_context().run, self._timed, 'create_plan',
+                                   self.planner.create_plan, user_query)
+            speculation = self._speculate(user_query)
+            plan, plan_duration = planning.result()
+        return self._reconcile(user_query, logger, results, checkpoint, plan, plan_duration, speculation, cache_hits)
+    
+    async def _run_front_speculative_async(self, user_query: str, logger: ExecutionLogger, results: Dict[str, Any],
+                                           checkpoint: Optional[RunCheckpoint]) -> Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]]:
+        """Async twin of _run_front_speculative; a rejected speculation is cancelled if still running"""
+        cache_hits = self.data_agent.cache.hits if self.data_agent.cache else 0
+        speculation = asyncio.create_task(self._speculate_async(user_query))
+        try:
+            plan, plan_duration = await self._timed_async('create_plan', self.planner.create_plan_async(user_query))
+            divergence = self._divergence(plan, user_query)
+            if divergence:
+                speculation.cancel()
+                return await self._reconcile_async(user_query, logger, results, checkpoint, plan, plan_duration,
+                                                   cache_hits, divergence)
+            speculated = await speculation
+        finally:
+            if not speculation.done():
+                speculation.cancel()
+        return self._reconcile(user_query, logger, results, checkpoint, plan, plan_duration, speculated, cache_hits)
+    
+    def _reconcile(self, user_query: str, logger: ExecutionLogger, results: Dict[str, Any],
+                   checkpoint: Optional[RunCheckpoint], plan: Dict[str, Any], plan_duration: float,
+                   speculation: Tuple[Dict[str, Any], float, List[Dict[str, Any]], float],
+                   cache_hits: int) -> Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]]:
+        data_results, data_duration, insights, insight_duration = speculation
+        self._save(checkpoint, 'plan', plan)
+        self._record_plan(logger, results, user_query, plan, plan_duration)
+        
+        divergence = self._divergence(plan, user_query)
+        kept = divergence is None
+        if not kept:
+            print(f"      [WARN] {divergence}; discarding speculative insights")
+            if normalize_analyses(plan.get('analyses')) != DEFAULT_ANALYSES:
+                data_results, data_duration = self._timed('analyze_data', self.data_agent.run_analyses, plan['analyses'])
+            insights, insight_duration = self._timed('generate_insights', self.insight_agent.generate_insights,
+                                                     self._insight_payload(data_results, user_query), self._context(plan, user_query))
+        
+        self._save(checkpoint, 'data', data_results)
+        self._record_data(logger, results, user_query, plan, data_results, data_duration, cache_hits)
+        self._save(checkpoint, 'insights', insights)
+        self._record_insights(logger, user_query, data_results, insights, insight_duration, speculative=kept)
+        return plan, data_results, insights
+    
+    async def _reconcile_async(self, user_query: str, logger: ExecutionLogger, results: Dict[str, Any],
+                               checkpoint: Optional[RunCheckpoint], plan: Dict[str, Any], plan_duration: float,
+                               cache_hits: int, divergence: str) -> Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]]:
+        # The speculation was rejected before it finished: run the regular stages for this plan
+        self._save(checkpoint, 'plan', plan)
+        self._record_plan(logger, results, user_query, plan, plan_duration)
+        print(f"      [WARN] {divergence}; cancelled speculative insights")
+        data_results, data_duration = await self._timed_async(
+            'analyze_data', asyncio.to_thread(self.data_agent.run_analyses, plan.get('analyses')))
+        self._save(checkpoint, 'data', data_results)
+        self._record_data(logger, results, user_query, plan, data_results, data_duration, cache_hits)
+        insights, insight_duration = await self._timed_async('generate_insights', self.insight_agent.generate_insights_async(
+            self._insight_payload(data_results, user_query), self._context(plan, user_query)))
+        self._save(checkpoint, 'insights', insights)
+        self._record_insights(logger, user_query, data_results, insights, insight_duration, speculative=False)
+        return plan, data_results, insights
+    
+    # Checkpointing: restored stages skip their agent call entirely
+    
+    @staticmethod
+    def _restore(checkpoint: Optional[RunCheckpoint], name: str) -> Any:
+        value = checkpoint.load(name) if checkpoint else None
+        if value is not None:
+            print(f"      [OK] Restored {name} from checkpoint")
+        return value
+    
+    def _representatives(self, insights: List[Dict[str, Any]]) -> List[int]:
+        """Cluster representative of each insight; near-duplicates reuse its evaluation"""
+        if not self.dedup.get('enabled') or is_failure(insights):
+            return list(range(len(insights)))
+        with span('dedup_insights'):
+            representatives = cluster_insights(insights, self.dedup.get('threshold', DEFAULT_THRESHOLD))
+        duplicates = sum(representative != i for i, representative in enumerate(representatives))
+        if duplicates:
+            print(f"      [DEDUP] {duplicates} near-duplicate insights reuse a representative's evaluation "
+                  f"({len(insights) - duplicates} evaluator calls)")
+        return representatives
+    
+    @staticmethod
+    def _restore_evaluations(checkpoint: Optional[RunCheckpoint], insights: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        if not checkpoint:
+            return [None] * len(insights)
+        evaluations = [checkpoint.load(RunCheckpoint.evaluation_name(i)) for i in range(len(insights))]
+        restored = sum(evaluation is not None for evaluation in evaluations)
+        if restored:
+            print(f"      [OK] Restored {restored}/{len(insights)} evaluations from checkpoint")
+        return evaluations
+    
+    @staticmethod
+    def _save(checkpoint: Optional[RunCheckpoint], name: str, value: Any):
+        if checkpoint and not checkpoint.save(name, value):
+            print(f"      [WARN] {name} not checkpointed (agent fallback); it will be retried on resume")
+    
+    # Stage bookkeeping shared by the sync and async pipelines
+    
+    def _start(self, user_query: str, logger: ExecutionLogger):
         print(f"\n{'='*60}")
         print(f"Kasparro - Agentic Facebook Ads Analyst")
         print(f"{'='*60}\n")
         print(f"Query: {user_query}\n")
         
         # Set up logging
-        self.logger.set_metadata(
+        logger.set_metadata(
             query=user_query,
             config=self.config
         )
         
-        results = {}
-        
         # PHASE 1: Planning & Data Loading
         print("[PHASE 1] Planning & Data Loading")
         print("-" * 60)
-        
-        # Step 1: Create Plan
         print("  [1] Creating analysis plan...")
-        start_time = time.time()
-        plan = self.planner.create_plan(user_query)
-        duration = time.time() - start_time
-        
-        self.logger.log_step(
+    
+    def _baselines(self) -> BaselineStore:
+        return BaselineStore(self.delta.get('dir', 'baselines'))
+    
+    def _insight_payload(self, data_results: Dict[str, Any], user_query: str) -> Dict[str, Any]:
+        """Insight payload, reduced to the changes since the previous run in delta mode"""
+        payload = insight_payload(data_results)
+        if not self.delta.get('enabled'):
+            return payload
+        baseline = self._baselines().load(baseline_key(user_query, self.config['data_path']))
+        if baseline is None:
+            print("      [DELTA] No baseline for this analysis yet; sending full results")
+            return payload
+        with span('delta_payload'):
+            payload = delta_payload(payload, baseline, self.delta.get('thresholds'))
+        delta = payload['delta']
+        changed = sum(counts['changed'] + counts['new'] for counts in delta['segments'].values())
+        print(f"      [DELTA] {changed} segments changed since {delta['baseline_run']}, "
+              f"{len(delta['unchanged_sections'])} sections unchanged")
+        return payload
+    
+    @staticmethod
+    def _context(plan: Dict[str, Any], user_query: str) -> str:
+        return f"Analysis focus: {plan.get('objective', user_query)}"
+    
+    @staticmethod
+    def _creative_data(data_results: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'top_performers': data_results.get('top_performers', []),
+            'performance_summary': data_results.get('recent_trends', {}),
+            'message_themes': data_results.get('creative_level', {}).get('message_themes', []),
+            'budget_simulation': data_results.get('budget_simulation', {})
+        }
+    
+    def _record_plan(self, logger: ExecutionLogger, results: Dict[str, Any], user_query: str,
+                     plan: Dict[str, Any], duration: float):
+        logger.log_step(
             step_name="create_plan",
             agent="planner_agent",
             input_data=user_query,
@@ -77,86 +523,62 @@ class AgentGraph:
         results['plan'] = plan
         print(f"      [OK] Plan created ({duration:.2f}s)")
         print(f"      Objective: {plan.get('objective', 'N/A')[:70]}...")
-        
-        # Step 2: Load and Analyze Data
         print("\n  [2] Loading and analyzing data...")
-        start_time = time.time()
-        
-        # Multi-level analysis as per assignment requirements
-        data_summary = self.data_agent.get_data_summary()
-        comparison = self.data_agent.compare_periods(current_days=7, previous_days=7)
-        
-        # Detailed level analysis
-        campaign_analysis = self.data_agent.get_campaign_level_analysis()
-        adset_analysis = self.data_agent.get_adset_level_analysis()
-        audience_analysis = self.data_agent.get_audience_level_analysis()
-        creative_analysis = self.data_agent.get_creative_level_analysis()
-        geo_analysis = self.data_agent.get_geo_level_analysis()
-        rolling_trends = self.data_agent.get_rolling_trends(window=7)
-        
-        data_results = {
-            'summary': data_summary,
-            'recent_trends': comparison,
-            'campaign_level': campaign_analysis,
-            'adset_level': adset_analysis,
-            'audience_level': audience_analysis,
-            'creative_level': creative_analysis,
-            'geo_level': geo_analysis,
-            'rolling_trends': rolling_trends,
-            'top_performers': self.data_agent.get_top_performers(metric='roas', group_by='creative_type').to_dict('records')
-        }
-        duration = time.time() - start_time
+    
+    def _record_data(self, logger: ExecutionLogger, results: Dict[str, Any], user_query: str,
+                     plan: Dict[str, Any], data_results: Dict[str, Any], duration: float, cache_hits: int):
+        data_summary = data_results['summary']
+        cache_hits = (self.data_agent.cache.hits - cache_hits) if self.data_agent.cache else 0
         
-        self.logger.log_step(
+        logger.log_step(
             step_name="analyze_data",
             agent="data_agent",
-            input_data=f"Query data for: {user_query}",
+            input_data=plan.get('analyses') or f"Query data for: {user_query}",
             output_data=data_summary,
-            duration=duration
+            duration=duration,
+            cache_hits=cache_hits
         )
         
         results['data'] = data_results
-        print(f"      [OK] Data loaded ({duration:.2f}s)")
+        print(f"      [OK] Data loaded ({duration:.2f}s, {cache_hits} cached)")
+        print(f"      Sections: {', '.join(data_results.keys())}")
         print(f"      Rows: {data_summary['total_rows']}, ROAS: {data_summary['overall_roas']:.2f}")
         
         # PHASE 2: Insight Generation & Validation
         print("\n[PHASE 2] Insight Generation & Validation")
         print("-" * 60)
-        
-        # Step 3: Generate Insights
         print("  [3] Generating insights...")
-        start_time = time.time()
-        
-        context = f"Analysis focus: {plan.get('objective', user_query)}"
-        insights = self.insight_agent.generate_insights(data_results, context)
-        duration = time.time() - start_time
-        
-        self.logger.log_step(
+    
+    def _record_insights(self, logger: ExecutionLogger, user_query: str, data_results: Dict[str, Any],
+                         insights: List[Dict[str, Any]], duration: float, **extras):
+        logger.log_step(
             step_name="generate_insights",
             agent="insight_agent",
             input_data=data_results,
             output_data=insights,
-            duration=duration
+            duration=duration,
+            **extras
         )
         
         print(f"      [OK] Generated {len(insights)} insights ({duration:.2f}s)")
-        
-        # Step 4: Evaluate Insights
+        if self.delta.get('enabled') and not is_failure(insights):
+            # The next run is diffed against the values these insights last saw
+            store, key = self._baselines(), baseline_key(user_query, self.config['data_path'])
+            store.save(key, user_query, next_baseline(data_results, store.load(key), self.delta.get('thresholds')))
         print("\n  [4] Evaluating insights...")
-        start_time = time.time()
-        
+    
+    def _record_evaluations(self, logger: ExecutionLogger, results: Dict[str, Any], insights: List[Dict[str, Any]],
+                            evaluations: List[Dict[str, Any]], representatives: List[int],
+                            duration: float) -> List[Dict[str, Any]]:
         evaluated_insights = []
-        for insight in insights:
-            evaluation = self.evaluator.evaluate_insight(insight, data_results)
-            evaluated_insights.append({
-                'insight': insight,
-                'evaluation': evaluation,
-                'passed': evaluation['passed']
-            })
-        
-        duration = time.time() - start_time
-        
-        self.logger.log_step(
+        for i, insight in enumerate(insights):
+            evaluation = evaluations[representatives[i]]
+            entry = {'insight': insight, 'evaluation': evaluation, 'passed': evaluation['passed']}
+            if representatives[i] != i:
+                entry['duplicate_of'] = representatives[i]
+            evaluated_insights.append(entry)
+        
+        logger.log_step(
             step_name="evaluate_insights",
             agent="evaluator_agent",
             input_data=insights,
@@ -171,21 +593,14 @@ class AgentGraph:
         # PHASE 3: Creative Generation
         print(f"\n[PHASE 3] Creative Generation")
         print("-" * 60)
-        
-        # Step 5: Generate Creative Recommendations
         print("  [5] Generating creative recommendations...")
-        start_time = time.time()
-        
-        validated_insights = [ei['insight'] for ei in evaluated_insights if ei['passed']]
-        creative_data = {
-            'top_performers': data_results['top_performers'],
-            'performance_summary': data_results['recent_trends']
-        }
         
-        creatives = self.creative_agent.generate_creatives(validated_insights, creative_data)
-        duration = time.time() - start_time
-        
-        self.logger.log_step(
+        # Near-duplicates stay in the results but are not sent to the creative agent twice
+        return [ei['insight'] for ei in evaluated_insights if ei['passed'] and 'duplicate_of' not in ei]
+    
+    def _record_creatives(self, logger: ExecutionLogger, results: Dict[str, Any],
+                          validated_insights: List[Dict[str, Any]], creatives: Dict[str, Any], duration: float):
+        logger.log_step(
             step_name="generate_creatives",
             agent="creative_agent",
             input_data=validated_insights,
@@ -196,13 +611,3 @@ class AgentGraph:
         results['creatives'] = creatives
         creative_count = len(creatives.get('creative_concepts', []))
         print(f"      [OK] Generated {creative_count} creative concepts ({duration:.2f}s)")
-        
-        # Save execution log
-        log_path = self.logger.save()
-        print(f"\n[LOG] Execution log saved: {log_path}")
-        
-        print(f"\n{'='*60}")
-        print("[DONE] Analysis Complete!")
-        print(f"{'='*60}\n")
-        
-        return results
@@ -0,0 +1,86 @@
+"""
+Reporting Package
+Builds one intermediate report model per run and renders it as markdown,
+HTML or compact JSON. Several runs can be rendered in parallel; run artifacts
+are persisted through the content-addressed ReportStore.
+"""
+import json
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from ..utils import convert_to_serializable
+from ..utils.profiling import span
+from .html import render_html
+from .markdown import render_markdown
+from .model import build_report_model
+from .store import ReportStore, atomic_write
+
+FORMATS = ('markdown', 'html', 'json')
+
+
+def render_json(model: Dict[str, Any]) -> str:
+    """Compact JSON rendering of the report model"""
+    return json.dumps(convert_to_serializable(model), separators=(',', ':'), ensure_ascii=False)
+
+
+_RENDERERS = {'markdown': render_markdown, 'html': render_html, 'json': render_json}
+
+
+def render_report(results: Dict[str, Any], query: str, fmt: str = 'markdown',
+                  generated_at: Optional[datetime] = None) -> str:
+    """
+    Render pipeline results as a report document
+
+    Args:
+        results: Output of AgentGraph.execute
+        query: The user's query
+        fmt: 'markdown', 'html' or 'json'
+        generated_at: Report timestamp (defaults to now)
+
+    Returns:
+        The rendered document
+    """
+    if fmt not in _RENDERERS:
+        raise ValueError(f"Unknown report format: {fmt!r} (expected one of {FORMATS})")
+    with span(f'report.{fmt}', 'serialize') as current:
+        document = _RENDERERS[fmt](build_report_model(results, query, generated_at))
+        current.set(bytes_out=len(document))
+    return document
+
+
+def _render_item(item: Tuple[Dict[str, Any], str, str]) -> str:
+    results, query, fmt = item
+    return render_report(results, query, fmt)
+
+
+def render_reports(items: List[Tuple[Dict[str, Any], str]], fmt: str = 'markdown',
+                   max_workers: Optional[int] = None) -> List[str]:
+    """
+    Render many runs' reports in parallel worker processes
+
+    Args:
+        items: (results, query) pairs
+        fmt: Output format for every report
+        max_workers: Worker processes (defaults to the CPU count)
+
+    Returns:
+        Rendered documents in input order
+    """
+    if len(items) <= 1:
+        return [render_report(results, query, fmt) for results, query in items]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_render_item, [(results, query, fmt) for results, query in items]))
+
+
+def write_report(results: Dict[str, Any], query: str, filepath: str, fmt: str = 'markdown'):
+    """
+    Render and write a report with a single atomic write
+
+    Args:
+        results: Output of AgentGraph.execute
+        query: The user's query
+        filepath: Destination path
+        fmt: 'markdown', 'html' or 'json'
+    """
+    atomic_write(filepath, render_report(results, query, fmt).encode('utf-8'))
@@ -0,0 +1,131 @@
+"""
+HTML Renderer
+Renders the report model as a standalone HTML page with the same sections as
+the markdown report
+"""
+from html import escape
+from typing import Dict, Any, List, Sequence
+
+from .templates import compile_template
+
+PAGE_START = compile_template(
+    "<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+    "<title>Facebook Ads Performance Analysis Report</title>\n"
+    "<style>body{{font-family:sans-serif;max-width:960px;margin:auto}}"
+    "table{{border-collapse:collapse;margin:1em 0}}td,th{{border:1px solid #ccc;padding:4px 8px}}</style>\n"
+    "</head>\n<body>\n"
+    "<h1>Facebook Ads Performance Analysis Report</h1>\n"
+    "<p><strong>Generated:</strong> {generated_display}<br>\n"
+    "<strong>Analysis Query:</strong> {query}</p>\n"
+)
+PAGE_END = compile_template("<footer><p>Report Generated: {generated_footer}</p></footer>\n</body>\n</html>\n")
+HEADING = compile_template("<h{level}>{text}</h{level}>\n")
+PARAGRAPH = compile_template("<p>{text}</p>\n")
+
+SUMMARY_LINE = compile_template(
+    "{total_rows:,} advertising records from {date_start} to {date_end} ({date_days} days)"
+)
+STATUS_TEXT = {
+    'strong': "STRONG PERFORMANCE",
+    'solid': "SOLID PERFORMANCE",
+    'optimization_required': "OPTIMIZATION REQUIRED",
+}
+
+
+def _table(header: Sequence[str], rows: List[Sequence[Any]]) -> str:
+    """Build a table; cells must already be formatted strings"""
+    parts = ["<table>\n<tr>", ''.join(f"<th>{escape(cell)}</th>" for cell in header), "</tr>\n"]
+    for row in rows:
+        parts.append("<tr>")
+        parts.append(''.join(f"<td>{escape(str(cell))}</td>" for cell in row))
+        parts.append("</tr>\n")
+    parts.append("</table>\n")
+    return ''.join(parts)
+
+
+def render_html(model: Dict[str, Any]) -> str:
+    """
+    Render the report model as HTML
+
+    Args:
+        model: Output of build_report_model
+
+    Returns:
+        The complete HTML document
+    """
+    out: List[str] = [PAGE_START(generated_display=escape(model['generated_display']), query=escape(model['query']))]
+    append = out.append
+
+    append(HEADING(level=2, text="I. Executive Summary"))
+    summary = model['summary']
+    if summary:
+        append(PARAGRAPH(text=escape(SUMMARY_LINE(**summary))))
+        append(_table(["Metric", "Value", "Performance Rating"], [
+            ["Total Investment", f"${summary['total_spend']:,.2f}", "-"],
+            ["Total Revenue", f"${summary['total_revenue']:,.2f}", "-"],
+            ["Return on Ad Spend (ROAS)", f"{summary['overall_roas']:.2f}x", summary['rating_roas']],
+            ["Revenue Efficiency", f"{summary['efficiency']:.1f}%", "-"],
+            ["Campaign Universe", f"{summary['campaigns']} campaigns", "-"],
+            ["Ad Set Diversity", f"{summary['adsets']} ad sets", "-"],
+        ]))
+        append(PARAGRAPH(text=f"<strong>Status: {STATUS_TEXT[summary['status']]}</strong>"))
+    else:
+        append(PARAGRAPH(text="Data summary unavailable."))
+
+    if model['comparison']:
+        append(HEADING(level=2, text="II. Temporal Performance Analysis"))
+        append(_table(["Performance Metric", "Current Period", "Previous Period", "Percentage Change", "Trend Analysis"],
+                      [[row['metric'], row['current'], row['previous'], row['change'], row['trend']]
+                       for row in model['comparison']]))
+
+    append(HEADING(level=2, text="III. Multi-Dimensional Performance Analysis"))
+    if model['top_campaigns']:
+        append(HEADING(level=3, text="A. Campaign-Level Performance"))
+        append(_table(["Campaign", "ROAS", "Revenue", "Spend", "Efficiency Score"],
+                      [[row['name'], f"{row['roas']:.2f}x", f"${row['revenue']:,.0f}", f"${row['spend']:,.0f}",
+                        f"{row['efficiency']:.0f}/100"] for row in model['top_campaigns']]))
+    if model['creative_section'] and model['creative_matrix']:
+        append(HEADING(level=3, text="B. Creative Performance Analysis"))
+        append(_table(["Creative Type", "ROAS", "CTR", "Conversion Rate", "Volume Score", "Recommendation"],
+                      [[row['creative_type'], f"{row['roas']:.2f}x", f"{row['ctr']:.2f}%", f"{row['conversion_rate']:.2f}%",
+                        f"{row['volume_score']:.0f}/100", row['recommendation']] for row in model['creative_matrix']]))
+    if model['countries']:
+        append(HEADING(level=3, text="C. Geographic Performance Analysis"))
+        append(_table(["Market", "ROAS", "Revenue Share", "Cost Efficiency", "Market Maturity"],
+                      [[row['country'], f"{row['roas']:.2f}x", f"{row['revenue_share']:.1f}%", row['efficiency'],
+                        row['maturity']] for row in model['countries']]))
+    budget = model['budget']
+    if budget:
+        append(HEADING(level=3, text="D. Budget Reallocation Simulation"))
+        append(PARAGRAPH(text=f"Reallocating ${budget['daily_spend']:,.0f}/day across {escape(budget['dimension'])} segments: "
+                              f"predicted daily revenue ${budget['current_revenue']:,.0f} &rarr; "
+                              f"${budget['reallocated_revenue']:,.0f} ({budget['uplift_pct']:+.1f}%)"))
+        append(_table(["Segment", "Current Spend/Day", "Recommended Spend/Day", "Change", "Marginal ROAS"],
+                      [[row['segment'], f"${row['current_spend']:,.0f}", f"${row['recommended_spend']:,.0f}",
+                        f"{row['change_pct']:+.1f}%", f"{row['marginal_roas']:.2f}x"] for row in budget['rows']]))
+
+    append(HEADING(level=2, text="IV. AI-Generated Strategic Insights"))
+    for index, entry in enumerate(model['insights'], 1):
+        append(HEADING(level=3, text=f"Strategic Insight #{index}: {escape(str(entry['title']))}"))
+        append(PARAGRAPH(text=escape(str(entry['description']))))
+        if entry['scores']:
+            append(PARAGRAPH(text=f"Overall Confidence: <strong>{entry['scores']['overall']:.1%}</strong>"))
+        append(PARAGRAPH(text=f"<strong>{entry['priority']}</strong>"))
+
+    if model['creative_concepts']:
+        append(HEADING(level=2, text="V. Strategic Creative Development Plan"))
+        append(_table(["Format", "Core Concept", "Strategic Rationale", "Target Audience", "Expected Impact"],
+                      [[concept['format'], concept['concept'], concept['rationale'], concept['audience'], concept['impact']]
+                       for concept in model['creative_concepts']]))
+
+    performance = model['performance']
+    append(HEADING(level=2, text="VI. Detailed Performance Analytics"))
+    append(_table(["Creative Format", "ROAS", "Revenue", "Investment", "Conversions", "CTR", "CPC", "Performance Grade"],
+                  [[row['creative_type'], f"{row['roas']:.2f}x", f"${row['revenue']:,.0f}", f"${row['spend']:,.0f}",
+                    f"{row['purchases']:,}", f"{row['ctr']:.2f}%", f"${row['cpc']:.2f}", row['grade']]
+                   for row in performance['rows']]))
+    append(PARAGRAPH(text=f"Portfolio ROAS: {performance['weighted_roas']:.2f}x (Weighted Average)"))
+
+    append(PARAGRAPH(text=f"Next Report: {model['next_report']}"))
+    append(PAGE_END(**model))
+    return ''.join(out)
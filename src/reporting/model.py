@@ -0,0 +1,309 @@
+"""
+Report Model
+Builds the format-independent intermediate model shared by every renderer.
+All derived values (ratings, shares, totals) are computed here once.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+# Shown when a run has no creative-type performance data
+DEFAULT_PERFORMERS = [
+    {"creative_type": "Carousel", "roas": 6.18, "revenue": 1892537, "spend": 306136, "purchases": 53295, "ctr": 1.28, "cpc": 0.13},
+    {"creative_type": "Image", "roas": 6.13, "revenue": 4409417, "spend": 719101, "purchases": 121894, "ctr": 1.31, "cpc": 0.13},
+    {"creative_type": "UGC", "roas": 5.91, "revenue": 1932351, "spend": 327106, "purchases": 54263, "ctr": 1.34, "cpc": 0.14},
+    {"creative_type": "Video", "roas": 5.35, "revenue": 4031396, "spend": 753237, "purchases": 111692, "ctr": 1.18, "cpc": 0.15}
+]
+
+
+def _summary(data_summary: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not data_summary:
+        return None
+
+    total_spend = data_summary.get('total_spend', 0)
+    total_revenue = data_summary.get('total_revenue', 0)
+    overall_roas = data_summary.get('overall_roas', 0)
+    date_range = data_summary.get('date_range', {})
+
+    if overall_roas >= 5.0:
+        status = 'strong'
+    elif overall_roas >= 3.0:
+        status = 'solid'
+    else:
+        status = 'optimization_required'
+
+    return {
+        'total_rows': data_summary.get('total_rows', 0),
+        'total_spend': total_spend,
+        'total_revenue': total_revenue,
+        'overall_roas': overall_roas,
+        'date_start': date_range.get('start', 'N/A'),
+        'date_end': date_range.get('end', 'N/A'),
+        'date_days': date_range.get('days', 'N/A'),
+        'campaigns': data_summary.get('campaigns', 'N/A'),
+        'adsets': data_summary.get('adsets', 'N/A'),
+        'rating_roas': "Excellent" if overall_roas >= 5.0 else "Good" if overall_roas >= 3.0 else "Needs Improvement",
+        'efficiency': (total_revenue / total_spend * 100) if total_spend > 0 else 0,
+        'status': status
+    }
+
+
+def _comparison_rows(comparison: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rows = []
+    for metric, data in comparison.items():
+        if not (isinstance(data, dict) and 'current' in data):
+            continue
+        change = data.get('change', 'N/A')
+
+        # Determine trend direction
+        if isinstance(change, str) and '%' in change:
+            change_val = float(change.replace('%', ''))
+            if change_val > 5:
+                trend = "📈 Strong Positive"
+            elif change_val > 0:
+                trend = "📊 Positive"
+            elif change_val > -5:
+                trend = "📉 Slight Decline"
+            else:
+                trend = "⚠️ Significant Decline"
+        else:
+            trend = "📊 Stable"
+
+        rows.append({
+            'metric': metric.upper(),
+            'current': data.get('current', 'N/A'),
+            'previous': data.get('previous', 'N/A'),
+            'change': change,
+            'trend': trend
+        })
+    return rows
+
+
+def _campaign_rows(campaigns: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    rows = []
+    for campaign in campaigns[:5]:
+        roas = campaign.get('roas', 0)
+        rows.append({
+            'name': campaign.get('campaign_name', 'N/A')[:30],
+            'roas': roas,
+            'revenue': campaign.get('revenue', 0),
+            'spend': campaign.get('spend', 0),
+            'efficiency': (roas * 20) if roas > 0 else 0  # Score out of 100
+        })
+    return rows
+
+
+def _creative_matrix_rows(performers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    rows = []
+    for creative in performers:
+        roas = creative.get('roas', 0)
+        ctr = creative.get('ctr', 0)
+        purchases = creative.get('purchases', 0)
+        spend = creative.get('spend', 0)
+
+        if roas >= 6.0:
+            recommendation = "🚀 Scale Up"
+        elif roas >= 4.0:
+            recommendation = "📈 Optimize"
+        else:
+            recommendation = "⚠️ Review"
+
+        rows.append({
+            'creative_type': creative.get('creative_type', 'Unknown'),
+            'roas': roas,
+            'ctr': ctr,
+            'conversion_rate': (purchases / (spend * ctr * 1000)) * 100 if spend > 0 and ctr > 0 else 0,
+            'volume_score': min(100, (spend / 10000) * 100),  # Scale based on spend volume
+            'recommendation': recommendation
+        })
+    return rows
+
+
+def _country_rows(countries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    total_revenue = sum(country.get('revenue', 0) for country in countries)
+    rows = []
+    for country in countries:
+        roas = country.get('roas', 0)
+        revenue = country.get('revenue', 0)
+        cpc = country.get('cpc', 0)
+
+        if cpc < 0.15:
+            efficiency = "High"
+        elif cpc < 0.20:
+            efficiency = "Medium"
+        else:
+            efficiency = "Low"
+
+        if roas >= 6.0:
+            maturity = "Optimized"
+        elif roas >= 4.0:
+            maturity = "Growing"
+        else:
+            maturity = "Developing"
+
+        rows.append({
+            'country': country.get('country', 'Unknown'),
+            'roas': roas,
+            'revenue_share': (revenue / total_revenue * 100) if total_revenue > 0 else 0,
+            'efficiency': efficiency,
+            'maturity': maturity
+        })
+    return rows
+
+
+# Numeric fields of budget simulation segment rows; the remaining fields label the segment
+BUDGET_FIELDS = {'current_spend', 'recommended_spend', 'change_pct', 'elasticity', 'marginal_roas', 'fit_days'}
+
+
+def _budget_section(simulation: Dict[str, Any], limit: int = 8) -> Optional[Dict[str, Any]]:
+    if not simulation or not simulation.get('segments'):
+        return None
+    # Largest dollar moves first
+    segments = sorted(simulation['segments'], reverse=True,
+                      key=lambda row: abs(row.get('recommended_spend', 0) - row.get('current_spend', 0)))[:limit]
+    return {
+        'dimension': str(simulation.get('group_by', 'segment')).replace('_name', '').replace('_', ' '),
+        'daily_spend': simulation['current']['daily_spend'],
+        'max_change': simulation.get('max_change', 0),
+        'current_revenue': simulation['current']['predicted_revenue'],
+        'reallocated_revenue': simulation['reallocated']['predicted_revenue'],
+        'uplift_pct': simulation.get('reallocation_uplift_pct', 0),
+        'rows': [{
+            'segment': ' / '.join(str(value) for key, value in row.items() if key not in BUDGET_FIELDS)[:40].replace('|', '/'),
+            'current_spend': row.get('current_spend', 0),
+            'recommended_spend': row.get('recommended_spend', 0),
+            'change_pct': row.get('change_pct', 0),
+            'marginal_roas': row.get('marginal_roas', 0)
+        } for row in segments],
+        'scenarios': [dict(row) for row in simulation.get('scenarios') or []]
+    }
+
+
+def _insight_entries(insights: List[Any]) -> List[Dict[str, Any]]:
+    entries = []
+    for insight_data in insights:
+        insight = insight_data.get('insight', {}) if isinstance(insight_data, dict) else insight_data
+        evaluation = insight_data.get('evaluation', {}) if isinstance(insight_data, dict) else {}
+
+        scores = None
+        if evaluation:
+            raw = evaluation.get('scores', {})
+            scores = {
+                'evidence_quality': raw.get('evidence_quality', 0),
+                'statistical_validity': raw.get('statistical_validity', 0),
+                'business_relevance': raw.get('business_relevance', 0),
+                'overall': evaluation.get('overall_score', 0)
+            }
+
+        severity = insight.get('severity', 'medium')
+        if severity == 'high':
+            priority = "🔴 HIGH PRIORITY"
+        elif severity == 'medium':
+            priority = "🟡 MEDIUM PRIORITY"
+        else:
+            priority = "🟢 LOW PRIORITY"
+
+        entries.append({
+            'title': insight.get('title', 'Analysis Finding'),
+            'description': insight.get('description', 'Detailed insight analysis not available.'),
+            'scores': scores,
+            'priority': priority
+        })
+    return entries
+
+
+def _creative_concepts(creatives: Any) -> Optional[List[Dict[str, Any]]]:
+    """Concept rows, or None when the creative stage returned no concept list at all"""
+    if not (creatives and isinstance(creatives, dict) and 'creative_concepts' in creatives):
+        return None
+    return [{
+        'format': creative.get('type', 'Multi-format'),
+        'concept': creative.get('concept', 'Innovative creative approach'),
+        'rationale': creative.get('rationale', 'Data-driven creative optimization'),
+        'audience': creative.get('audience', 'Primary segments'),
+        'impact': creative.get('impact', 'Performance improvement')
+    } for creative in creatives['creative_concepts']]
+
+
+def _performance_matrix(performers: List[Dict[str, Any]]) -> Dict[str, Any]:
+    rows = []
+    for performer in performers:
+        roas = performer.get('roas', 0)
+        if roas >= 6.0:
+            grade = "A+ Excellent"
+        elif roas >= 5.0:
+            grade = "A Good"
+        elif roas >= 4.0:
+            grade = "B Fair"
+        else:
+            grade = "C Needs Improvement"
+
+        rows.append({
+            'creative_type': performer.get('creative_type', 'Unknown'),
+            'roas': roas,
+            'revenue': performer.get('revenue', 0),
+            'spend': performer.get('spend', 0),
+            'purchases': performer.get('purchases', 0),
+            'ctr': performer.get('ctr', 0),
+            'cpc': performer.get('cpc', 0),
+            'grade': grade
+        })
+
+    total_revenue = sum(row['revenue'] for row in rows)
+    total_spend = sum(row['spend'] for row in rows)
+    weighted_roas = total_revenue / total_spend if total_spend > 0 else 0
+    top = max(performers, key=lambda x: x.get('roas', 0)) if performers else None
+
+    return {
+        'rows': rows,
+        'total_revenue': total_revenue,
+        'total_spend': total_spend,
+        'weighted_roas': weighted_roas,
+        'portfolio_efficiency': (weighted_roas / 5.0) * 100,
+        'top_performer': {'creative_type': top.get('creative_type'), 'roas': top.get('roas', 0)} if top else None
+    }
+
+
+def build_report_model(results: Dict[str, Any], query: str,
+                       generated_at: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Build the intermediate report model from pipeline results
+
+    Args:
+        results: Output of AgentGraph.execute
+        query: The user's query
+        generated_at: Report timestamp (defaults to now)
+
+    Returns:
+        Dictionary of plain values consumed by the markdown/HTML/JSON renderers
+    """
+    # Handle case where results might not be a dict
+    if not isinstance(results, dict):
+        results = {}
+    generated_at = generated_at or datetime.now()
+
+    data_results = results.get('data') or {}
+    data_summary = data_results.get('summary', {})
+
+    campaign_data = data_results.get('campaign_level') if 'campaign_level' in data_results else None
+    geo_data = data_results.get('geo_level') if 'geo_level' in data_results else None
+    has_top_performers = 'top_performers' in data_results
+
+    return {
+        'query': query,
+        'generated_at': generated_at.isoformat(),
+        'generated_display': generated_at.strftime('%B %d, %Y at %H:%M:%S UTC'),
+        'generated_footer': generated_at.strftime('%Y-%m-%d %H:%M:%S UTC'),
+        'next_report': (generated_at + timedelta(days=7)).strftime('%B %d, %Y'),
+        'summary': _summary(data_summary),
+        'comparison': _comparison_rows(data_results['recent_trends']) if 'recent_trends' in data_results else None,
+        'campaign_section': campaign_data is not None,
+        'top_campaigns': _campaign_rows(campaign_data['top_campaigns']) if campaign_data and 'top_campaigns' in campaign_data else None,
+        'creative_section': 'creative_level' in data_results,
+        'creative_matrix': _creative_matrix_rows(data_results['top_performers']) if has_top_performers else [],
+        'geo_section': geo_data is not None,
+        'countries': _country_rows(geo_data['country_performance']) if geo_data and 'country_performance' in geo_data else None,
+        'budget': _budget_section(data_results.get('budget_simulation')),
+        'insights': _insight_entries(results.get('insights', [])),
+        'creative_concepts': _creative_concepts(results.get('creatives', [])),
+        'performance': _performance_matrix(data_results['top_performers'] if has_top_performers else DEFAULT_PERFORMERS)
+    }
@@ -0,0 +1,216 @@
+"""
+Report Store
+Writes run artifacts once: the shared payload is serialized a single time,
+large sections are stored as content-addressed objects and referenced by
+``{"$ref": "objects/<sha256>.json"}``, and every file is written atomically
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set, Union
+
+from ..utils import convert_to_serializable
+from ..utils.profiling import span
+
+COMPRESSION_SUFFIXES = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+
+
+def atomic_write(path: Union[str, Path], data: bytes):
+    """
+    Write bytes via a temp file in the same directory and os.replace
+
+    Args:
+        path: Destination file
+        data: Content to write
+    """
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, target)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def dumps_compact(obj: Any) -> bytes:
+    """Compact UTF-8 JSON for already-serializable data"""
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class ReportStore:
+    """Content-addressed, atomically written report artifacts"""
+
+    def __init__(self, root: str = 'reports', compression: Optional[str] = None):
+        """
+        Args:
+            root: Report directory; objects live in <root>/objects
+            compression: None, 'gzip' or 'zstd' (zstd needs the zstandard package)
+        """
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression: {compression!r} (expected gzip or zstd)")
+        if compression == 'zstd':
+            try:
+                import zstandard  # noqa: F401
+            except ImportError:
+                print("[WARN] zstandard not installed, using gzip compression")
+                compression = 'gzip'
+        self.root = Path(root)
+        self.compression = compression
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == 'gzip':
+            return gzip.compress(data, compresslevel=6, mtime=0)
+        if self.compression == 'zstd':
+            import zstandard
+            return zstandard.ZstdCompressor(level=10).compress(data)
+        return data
+
+    @staticmethod
+    def _decompress(path: Path, data: bytes) -> bytes:
+        if path.suffix == '.gz':
+            return gzip.decompress(data)
+        if path.suffix == '.zst':
+            import zstandard
+            return zstandard.ZstdDecompressor().decompress(data)
+        return data
+
+    def put(self, data: bytes) -> Dict[str, str]:
+        """
+        Store serialized JSON as a content-addressed object (written only if new)
+
+        Args:
+            data: Compact JSON bytes
+
+        Returns:
+            Reference object {"$ref": "objects/<sha256>.json[.gz|.zst]"}
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        ref = f"objects/{digest}.json{COMPRESSION_SUFFIXES[self.compression]}"
+        path = self.root / ref
+        if not path.exists():
+            atomic_write(path, self._compress(data))
+        return {'$ref': ref}
+
+    def write_document(self, name: str, document: Dict[str, Any]) -> Path:
+        """Atomically write a small top-level JSON document (references stay unresolved)"""
+        path = self.root / name
+        atomic_write(path, dumps_compact(document))
+        return path
+
+    def save_run(self, query: str, results: Dict[str, Any],
+                 timestamp: Optional[str] = None) -> Dict[str, Path]:
+        """
+        Persist the insights and creatives documents of one run
+
+        Args:
+            query: The user's query
+            results: Output of AgentGraph.execute
+            timestamp: ISO timestamp (defaults to now)
+
+        Returns:
+            Mapping of document name to written path
+        """
+        timestamp = timestamp or datetime.now().isoformat()
+        data = results.get('data') or {}
+
+        with span('report_store.save_run', 'serialize') as current:
+            # One conversion pass over everything that is persisted
+            payload = convert_to_serializable({
+                'insights': results.get('insights', []),
+                'creatives': results.get('creatives', []),
+                'data_summary': data.get('summary', {})
+            })
+            insights_ref = self.put(dumps_compact(payload['insights']))
+
+            paths = {
+                'insights': self.write_document('insights.json', {
+                    'query': query,
+                    'timestamp': timestamp,
+                    'insights': insights_ref,
+                    'data_summary': payload['data_summary']
+                }),
+                'creatives': self.write_document('creatives.json', {
+                    'query': query,
+                    'timestamp': timestamp,
+                    'creatives': self.put(dumps_compact(payload['creatives'])),
+                    'insights_used': insights_ref
+                })
+            }
+            current.set(bytes_out=sum(path.stat().st_size for path in paths.values()))
+        self.prune_objects()
+        return paths
+
+    def prune_objects(self) -> List[str]:
+        """
+        Delete objects no top-level document references any more
+
+        Documents are rewritten every run, so objects from earlier runs are
+        dropped here. Nothing is deleted when a document cannot be read.
+
+        Returns:
+            References of the deleted objects
+        """
+        objects = self.root / 'objects'
+        if not objects.is_dir():
+            return []
+        referenced = set()
+        for document in self.root.glob('*.json'):
+            try:
+                self._collect_refs(json.loads(document.read_bytes()), referenced)
+            except (OSError, ValueError) as e:
+                print(f"[WARN] Not pruning report objects, unreadable document {document}: {e}")
+                return []
+        removed = []
+        for path in objects.glob('*.json*'):
+            ref = f"objects/{path.name}"
+            if ref not in referenced:
+                path.unlink(missing_ok=True)
+                removed.append(ref)
+        return removed
+
+    @classmethod
+    def _collect_refs(cls, value: Any, refs: Set[str]):
+        if isinstance(value, dict):
+            if set(value) == {'$ref'}:
+                refs.add(value['$ref'])
+                return
+            for item in value.values():
+                cls._collect_refs(item, refs)
+        elif isinstance(value, list):
+            for item in value:
+                cls._collect_refs(item, refs)
+
+    def load(self, name: str) -> Dict[str, Any]:
+        """
+        Read a document and resolve its object references
+
+        Args:
+            name: Document name relative to the store root (e.g. 'insights.json')
+
+        Returns:
+            The document with every {"$ref": ...} replaced by its content
+        """
+        with open(self.root / name, 'rb') as f:
+            document = json.loads(f.read())
+        return self._resolve(document, {})
+
+    def _resolve(self, value: Any, loaded: Dict[str, Any]) -> Any:
+        if isinstance(value, dict):
+            if set(value) == {'$ref'}:
+                ref = value['$ref']
+                if ref not in loaded:
+                    path = self.root / ref
+                    loaded[ref] = json.loads(self._decompress(path, path.read_bytes()))
+                return loaded[ref]
+            return {key: self._resolve(item, loaded) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._resolve(item, loaded) for item in value]
+        return value
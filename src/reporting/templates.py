@@ -0,0 +1,46 @@
+"""
+Template Compiler
+Parses str.format-style row templates once, at import time, into literal text
+and field slots, so rendering a row is a single pass of format() calls
+"""
+import string
+from typing import Callable, List, Optional, Tuple
+
+_formatter = string.Formatter()
+
+
+def compile_template(source: str) -> Callable[..., str]:
+    """
+    Compile a str.format template into a keyword-only function
+
+    Args:
+        source: Template such as "| {name} | {roas:.2f}x |"
+
+    Returns:
+        Function taking the template fields as keyword arguments (extra keys are ignored)
+    """
+    # (literal text, field name or None, format spec, conversion) in template order
+    parts: List[Tuple[str, Optional[str], str, Optional[str]]] = []
+    for literal, field, spec, conversion in _formatter.parse(source):
+        if field is not None:
+            if not field.isidentifier():
+                raise ValueError(f"Unsupported template field: {field!r}")
+            if '{' in (spec or ''):
+                raise ValueError(f"Nested fields are not supported: {field!r}")
+        parts.append((literal, field, spec or '', conversion))
+
+    if all(field is None for _, field, _, _ in parts):
+        text = ''.join(literal for literal, _, _, _ in parts)
+        return lambda **_: text
+
+    def render(**values) -> str:
+        out = []
+        for literal, field, spec, conversion in parts:
+            out.append(literal)
+            if field is not None:
+                value = values[field]
+                if conversion:
+                    value = _formatter.convert_field(value, conversion)
+                out.append(format(value, spec))
+        return ''.join(out)
+    return render
@@ -1,34 +1,84 @@
 """
 Utility modules for Kasparro
 """
-import yaml
 import json
-import numpy as np
 from pathlib import Path
 from typing import Dict, Any
 
+from .profiling import span
+from .records import RecordTable
+
 
 def convert_to_serializable(obj):
     """Convert numpy/pandas types to Python native types for JSON serialization"""
+    if isinstance(obj, dict):
+        return {key: convert_to_serializable(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [convert_to_serializable(item) for item in obj]
+    if isinstance(obj, RecordTable):
+        return convert_to_serializable(obj.to_records())
+    if type(obj) is float:
+        return None if obj != obj else obj  # NaN (e.g. an undefined interval) -> JSON null
+    if obj is None or type(obj) in (str, int, bool):
+        return obj
+    
+    import numpy as np  # deferred so importing src.utils stays cheap
     if isinstance(obj, (np.integer, np.int64)):
         return int(obj)
     elif isinstance(obj, (np.floating, np.float64)):
-        return float(obj)
+        return None if np.isnan(obj) else float(obj)
     elif isinstance(obj, np.ndarray):
-        return obj.tolist()
+        return convert_to_serializable(obj.tolist())
     elif hasattr(obj, 'isoformat'):  # Handle datetime/Timestamp objects
         return obj.isoformat()
     elif str(type(obj)).startswith("<class 'pandas._libs.tslibs"):  # Handle all pandas timestamp types
         return str(obj)
-    elif isinstance(obj, dict):
-        return {key: convert_to_serializable(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_to_serializable(item) for item in obj]
     return obj
 
 
+def to_json(obj: Any, indent: int = 2, label: str = 'data') -> str:
+    """
+    Serialize agent data for a prompt, timed as a serialization span
+    
+    Args:
+        obj: Data possibly containing numpy/pandas values
+        indent: JSON indentation
+        label: Name of the payload, used in the span name
+        
+    Returns:
+        JSON string
+    """
+    with span(f"serialize.{label}", 'serialization') as current:
+        text = json.dumps(convert_to_serializable(obj), indent=indent)
+        current.set(bytes_out=len(text))
+    return text
+
+
+def to_prompt_data(obj: Any, label: str = 'data', encoding: str = 'json') -> str:
+    """
+    Serialize agent data for a prompt in the configured encoding
+    
+    Args:
+        obj: Data possibly containing numpy/pandas values and record tables
+        label: Name of the payload, used in the span name
+        encoding: 'json' (pretty-printed, as to_json) or 'table' (header-once
+            tables with significant-figure rounding, see prompt_tables)
+        
+    Returns:
+        Prompt text
+    """
+    if encoding != 'table':
+        return to_json(obj, label=label)
+    from .prompt_tables import encode_payload
+    with span(f"serialize.{label}", 'serialization') as current:
+        text = encode_payload(obj)
+        current.set(bytes_out=len(text))
+    return text
+
+
 def load_config(config_path: str = 'config/config.yaml') -> Dict[str, Any]:
     """Load configuration from YAML file"""
+    import yaml
     with open(config_path, 'r') as f:
         return yaml.safe_load(f)
 
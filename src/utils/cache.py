@@ -0,0 +1,193 @@
+"""
+Aggregate Cache Utility
+Memoizes DataAgent results keyed by a dataset fingerprint plus call arguments
+"""
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import wraps
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+# Bump whenever cached result shapes or semantics change, so persisted pickles
+# from an older version are never served (e.g. tables without interval columns)
+CACHE_VERSION = 2
+
+_MISSING = object()
+_fingerprints: Dict[Tuple[str, int, int], str] = {}
+_caches: Dict[Tuple[int, Optional[str]], 'AggregateCache'] = {}
+
+
+def dataset_fingerprint(path: str) -> str:
+    """
+    Compute a content fingerprint for a dataset file
+
+    The content hash is memoized per (path, size, mtime) so repeated agents
+    over an unchanged file only stat it, while any rewrite of the CSV
+    produces a new fingerprint and therefore new cache keys.
+
+    Args:
+        path: Path to the dataset file
+
+    Returns:
+        Hex digest identifying the file contents
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _fingerprints:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        _fingerprints[key] = digest.hexdigest()
+    return _fingerprints[key]
+
+
+def _normalize(value: Any) -> Any:
+    """Make argument values order-independent for key building"""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _normalize(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(v) for v in value)
+    return value
+
+
+def make_key(fingerprint: str, name: str, arguments: Any) -> str:
+    """Build a stable cache key from cache version, fingerprint, method name and arguments"""
+    raw = repr((CACHE_VERSION, fingerprint, name, _normalize(arguments)))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class AggregateCache:
+    """In-process LRU with an optional on-disk pickle tier"""
+
+    def __init__(self, max_entries: int = 256, persist_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.persist_dir = Path(persist_dir) if persist_dir else None
+        if self.persist_dir:
+            self.persist_dir.mkdir(parents=True, exist_ok=True)
+        self._entries: 'OrderedDict[str, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any:
+        """Return the cached value for key, or the module sentinel on a miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        value = self._read_persistent(key)
+        with self._lock:
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._store(key, value)
+        return value
+
+    def set(self, key: str, value: Any):
+        """Store a value in memory and, if enabled, on disk"""
+        with self._lock:
+            self._store(key, value)
+        self._write_persistent(key, value)
+
+    def clear(self):
+        """Drop all in-memory entries (the persistent tier is left intact)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and current size"""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+    def _store(self, key: str, value: Any):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _read_persistent(self, key: str) -> Any:
+        if not self.persist_dir:
+            return _MISSING
+        path = self.persist_dir / f"{key}.pkl"
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return _MISSING
+
+    def _write_persistent(self, key: str, value: Any):
+        if not self.persist_dir:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.persist_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.persist_dir / f"{key}.pkl")
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def get_cache(settings: Optional[Dict[str, Any]] = None) -> Optional[AggregateCache]:
+    """
+    Get the process-wide cache for the given settings
+
+    Args:
+        settings: The ``cache`` section of the config (enabled, max_entries, persist_dir)
+
+    Returns:
+        Shared AggregateCache instance, or None if caching is disabled
+    """
+    settings = settings or {}
+    if not settings.get('enabled', True):
+        return None
+    key = (int(settings.get('max_entries', 256)), settings.get('persist_dir'))
+    if key not in _caches:
+        _caches[key] = AggregateCache(max_entries=key[0], persist_dir=key[1])
+    return _caches[key]
+
+
+def memoized(method):
+    """
+    Memoize a DataAgent method on (dataset fingerprint, method, arguments)
+
+    The owning object must expose ``cache`` (an AggregateCache or None) and
+    ``fingerprint``. If it also defines ``cache_key_extras()``, the returned
+    instance settings (e.g. a random seed) are part of every key. Cached
+    values are shared between callers and must be treated as read-only;
+    DataFrames, which are easily modified in place, are copied per call.
+    """
+    signature = inspect.signature(method)
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = getattr(self, 'cache', None)
+        if cache is None:
+            return method(self, *args, **kwargs)
+
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = list(bound.arguments.items())[1:]
+        extras = getattr(self, 'cache_key_extras', None)
+        if extras is not None:
+            arguments.append(('__instance__', extras()))
+        key = make_key(self.fingerprint, method.__qualname__, arguments)
+
+        value = cache.get(key)
+        if value is _MISSING:
+            value = method(self, *args, **kwargs)
+            cache.set(key, value)
+        return value.copy() if isinstance(value, pd.DataFrame) else value
+
+    return wrapper
@@ -0,0 +1,136 @@
+"""
+Run Checkpoints
+Persists each finished pipeline stage (plan, data results, insights, every
+per-insight evaluation and creatives) under a run ID so an interrupted or
+partially failed run can resume without repeating completed LLM calls
+"""
+import json
+import pickle
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from ..reporting.store import atomic_write
+
+META_FILE = 'run.json'
+# Checkpointed runs kept per directory; older ones are removed when a new run starts
+KEEP_RUNS = 20
+
+# Stage order: recomputing a stage invalidates every later one
+STAGES = ['plan', 'data', 'insights', 'evaluations', 'creatives']
+
+
+def is_failure(value: Any) -> bool:
+    """
+    Whether a stage output is an agent fallback (so it must not be checkpointed)
+
+    Agents return their fallback dict with an 'error' key, and the insight
+    agent returns a list holding one error insight.
+    """
+    if isinstance(value, dict):
+        return 'error' in value
+    if isinstance(value, list):
+        return any(isinstance(item, dict) and item.get('error') for item in value)
+    return value is None
+
+
+class RunCheckpoint:
+    """Stage outputs of one pipeline run, stored as pickles in <root>/<run_id>/"""
+
+    def __init__(self, run_id: str, root: str = 'checkpoints'):
+        """
+        Args:
+            run_id: Run identifier (the ExecutionLogger run_id of the first attempt)
+            root: Directory holding one sub-directory per run
+        """
+        self.run_id = run_id
+        self.dir = Path(root) / run_id
+
+    def exists(self) -> bool:
+        """Whether this run has been started before"""
+        return (self.dir / META_FILE).exists()
+
+    def save_meta(self, **meta):
+        """Record run metadata (query, dataset fingerprint, ...) as JSON"""
+        meta = dict(self.load_meta(), **meta) if self.exists() else dict(meta, created=datetime.now().isoformat())
+        atomic_write(self.dir / META_FILE, json.dumps(dict(meta, run_id=self.run_id), indent=2).encode('utf-8'))
+
+    def load_meta(self) -> Dict[str, Any]:
+        """
+        Read run metadata
+
+        Raises:
+            FileNotFoundError: If no run with this ID was checkpointed
+        """
+        path = self.dir / META_FILE
+        if not path.exists():
+            raise FileNotFoundError(f"No checkpoint for run {self.run_id!r} in {self.dir.parent}")
+        return json.loads(path.read_text(encoding='utf-8'))
+
+    def save(self, name: str, value: Any) -> bool:
+        """
+        Persist a freshly computed stage output and drop later stages
+
+        Args:
+            name: A name from STAGES, or evaluation_name(i) for one evaluation
+            value: Stage output; agent fallbacks are not persisted
+
+        Returns:
+            True if the value was written
+        """
+        stage = 'evaluations' if name.startswith('evaluation_') else name
+        self.discard(STAGES[STAGES.index(stage) + 1:])
+        if is_failure(value):
+            return False
+        atomic_write(self.dir / f"{name}.pkl", pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        return True
+
+    def load(self, name: str) -> Optional[Any]:
+        """Stage output, or None if the stage has not finished"""
+        try:
+            with open(self.dir / f"{name}.pkl", 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def discard(self, stages: List[str]):
+        """Forget stage outputs (evaluations removes every per-insight file)"""
+        for stage in stages:
+            pattern = 'evaluation_*.pkl' if stage == 'evaluations' else f"{stage}.pkl"
+            for path in self.dir.glob(pattern):
+                path.unlink(missing_ok=True)
+
+    def completed(self) -> List[str]:
+        """Names of the stages saved so far"""
+        return sorted(path.stem for path in self.dir.glob('*.pkl'))
+
+    @staticmethod
+    def evaluation_name(index: int) -> str:
+        """Checkpoint name of the evaluation of insight ``index``"""
+        return f"evaluation_{index:03d}"
+
+
+def prune_runs(root: str = 'checkpoints', keep: Optional[int] = KEEP_RUNS,
+               protect: Optional[str] = None) -> List[str]:
+    """
+    Delete all but the newest ``keep`` checkpointed runs
+
+    Args:
+        root: Directory holding one sub-directory per run
+        keep: Runs to keep, newest first by run.json mtime (None keeps everything)
+        protect: Run ID that is never deleted (the run in progress)
+
+    Returns:
+        IDs of the deleted runs
+    """
+    if keep is None or not Path(root).is_dir():
+        return []
+    runs = sorted((path for path in Path(root).iterdir() if (path / META_FILE).is_file()),
+                  key=lambda path: (path / META_FILE).stat().st_mtime_ns, reverse=True)
+    removed = []
+    for path in runs[max(int(keep), 0):]:
+        if path.name != protect:
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(path.name)
+    return removed
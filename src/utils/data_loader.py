@@ -6,21 +6,27 @@ import pandas as pd
 from pathlib import Path
 from typing import Optional
 
+from .validation import parse_dates
+
 
 def load_facebook_ads_data(csv_path: str) -> pd.DataFrame:
     """
     Load Facebook ads CSV data
     
+    Rows are returned as read: nothing is quarantined or imputed. Use
+    ``src.utils.validation.load_validated`` for the cleaned frame together
+    with the quarantine table and quality report.
+    
     Args:
         csv_path: Path to the CSV file
         
     Returns:
-        DataFrame with parsed dates and cleaned data
+        DataFrame with datetime64[ns] dates, sorted by date
     """
     df = pd.read_csv(csv_path)
     
-    # Parse dates
-    df['date'] = pd.to_datetime(df['date'])
+    # Parse dates (fixed format; unparseable values become NaT)
+    df['date'] = parse_dates(df['date'])
     
     # Sort by date
     df = df.sort_values('date')
@@ -0,0 +1,413 @@
+"""
+LLM Backend Utility
+Creates the generative model used by each agent, plus a deterministic fake
+backend for offline runs and benchmarks and a cassette backend that records
+and replays real responses by prompt hash
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional
+
+from .profiling import record_llm_usage, span
+
+
+_environment_loaded = False
+
+
+def load_environment():
+    """Load .env once per process (GEMINI_API_KEY etc.)"""
+    global _environment_loaded
+    if not _environment_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _environment_loaded = True
+
+
+def create_model(config: Dict[str, Any], temperature: float):
+    """
+    Create the generative model for an agent
+
+    Args:
+        config: Configuration dictionary (``llm_backend`` selects 'gemini', 'fake'
+            or 'cassette'; the ``cassette`` section configures the latter)
+        temperature: Sampling temperature for this agent
+
+    Returns:
+        Model object exposing ``generate_content`` and ``model_name``
+    """
+    backend = config.get('llm_backend', 'gemini')
+    model_name = config.get('model', 'gemini-1.5-flash')
+
+    if backend == 'fake':
+        return FakeGenerativeModel(
+            model_name=model_name,
+            latency=config.get('fake_llm_latency', 0.0),
+            num_insights=config.get('fake_llm_insights', 3)
+        )
+    if backend == 'cassette':
+        settings = config.get('cassette') or {}
+        source_config = dict(config, llm_backend=settings.get('backend', 'gemini'))
+        return CassetteModel(
+            get_cassette(settings.get('path', 'tests/cassettes/agents.json')),
+            mode=settings.get('mode', 'replay'),
+            latency=settings.get('latency', 0.0),
+            # The live model is only built when a prompt has to be recorded
+            source=lambda: create_model(source_config, temperature),
+            model_name=model_name
+        )
+
+    import google.generativeai as genai
+    load_environment()
+    genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
+    return genai.GenerativeModel(
+        model_name=model_name,
+        generation_config={
+            'temperature': temperature,
+            'max_output_tokens': config.get('max_tokens', 2000),
+        }
+    )
+
+
+class FakeResponse:
+    """Minimal stand-in for a Gemini response"""
+
+    def __init__(self, text: str, prompt_tokens: int):
+        self.text = text
+        self.usage_metadata = {
+            'prompt_token_count': prompt_tokens,
+            'candidates_token_count': estimate_tokens(text)
+        }
+
+
+class FakeGenerativeModel:
+    """
+    Deterministic offline model
+
+    Recognises which agent is calling from the system instruction at the top
+    of the prompt and returns a well-formed JSON answer for it. Responses only
+    depend on the prompt, so runs are reproducible; ``latency`` simulates the
+    network round trip.
+    """
+
+    def __init__(self, model_name: str = 'fake', latency: float = 0.0, num_insights: int = 3):
+        self.model_name = model_name
+        self.latency = latency
+        self.num_insights = num_insights
+        self.calls = 0
+
+    def generate_content(self, prompt: str) -> FakeResponse:
+        """Return a canned JSON response for the calling agent"""
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(prompt)
+
+    async def generate_content_async(self, prompt: str) -> FakeResponse:
+        """Async variant; latency is awaited so concurrent calls overlap"""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(prompt)
+
+    def _respond(self, prompt: str) -> FakeResponse:
+        self.calls += 1
+        seed = int(hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:8], 16)
+        system_instruction = prompt.split('\n', 1)[0]
+        if 'strategic planner' in system_instruction:
+            payload = self._plan()
+        elif 'marketing analyst' in system_instruction:
+            payload = self._insights(seed)
+        elif 'quality assurance' in system_instruction:
+            payload = self._evaluation(seed)
+        elif 'creative strategist' in system_instruction:
+            payload = self._creatives()
+        else:
+            payload = {}
+
+        return FakeResponse(f"```json\n{json.dumps(payload)}\n```", estimate_tokens(prompt))
+
+    def _plan(self) -> Dict[str, Any]:
+        return {
+            'objective': 'Analyze Facebook ads performance',
+            'steps': [
+                {
+                    'step_number': 1,
+                    'action': 'Compare recent performance with the previous period',
+                    'data_needed': 'ROAS, CTR, spend, revenue by segments',
+                    'expected_output': 'Period-over-period changes'
+                }
+            ],
+            'success_criteria': 'Insights backed by segment metrics'
+        }
+
+    def _insights(self, seed: int) -> Dict[str, Any]:
+        insights: List[Dict[str, Any]] = []
+        for i in range(self.num_insights):
+            insights.append({
+                'title': f'Segment performance shift #{i + 1}',
+                'description': 'ROAS moved materially between the last two periods.',
+                'severity': ['high', 'medium', 'low'][(seed + i) % 3],
+                'confidence': 0.8,
+                'evidence': {'metric': 'roas', 'comparison': 'current vs previous period', 'sample_size': 100},
+                'recommendation': 'Rebalance budget toward the stronger segment'
+            })
+        return {'insights': insights, 'summary': 'Deterministic offline analysis.'}
+
+    def _evaluation(self, seed: int) -> Dict[str, Any]:
+        score = 0.6 + (seed % 30) / 100
+        return {
+            'overall_score': round(score, 2),
+            'scores': {
+                'evidence_quality': 0.8,
+                'statistical_validity': 0.7,
+                'actionability': 0.8,
+                'business_relevance': 0.7
+            },
+            'strengths': ['Quantified comparison'],
+            'weaknesses': [],
+            'verdict': 'accept'
+        }
+
+    def _creatives(self) -> Dict[str, Any]:
+        return {
+            'creative_concepts': [
+                {
+                    'type': 'Carousel',
+                    'concept': 'Fabric close-ups with comfort claims',
+                    'rationale': 'Top ROAS format',
+                    'audience': 'Lookalike',
+                    'impact': 'Higher CTR'
+                }
+            ],
+            'testing_strategy': {
+                'duration': '7-14 days',
+                'success_metrics': ['ROAS > 5.0'],
+                'iteration_plan': 'Scale winners weekly'
+            }
+        }
+
+
+class CassetteMiss(KeyError):
+    """A replay-only cassette has no response for a prompt"""
+
+
+class Cassette:
+    """
+    Recorded responses keyed by prompt hash, stored as one JSON file
+
+    Entries keep the response text, token usage and the measured latency,
+    plus the first prompt line so a cassette can be read and diffed.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            self.entries = json.loads(self.path.read_text(encoding='utf-8')).get('entries', {})
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+    @staticmethod
+    def key(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+    def get(self, prompt: str) -> Optional[Dict[str, Any]]:
+        """Recorded entry for a prompt (counted as a hit or miss)"""
+        entry = self.entries.get(self.key(prompt))
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def put(self, prompt: str, response: Any, latency: float, model_name: Optional[str] = None):
+        """Record a live response and rewrite the cassette file"""
+        usage = getattr(response, 'usage_metadata', None)
+        if not isinstance(usage, dict):
+            usage = {name: getattr(usage, name, None) for name in ('prompt_token_count', 'candidates_token_count')}
+        entry = {
+            'prompt_head': prompt.split('\n', 1)[0][:120],
+            'text': response.text,
+            'usage': usage,
+            'latency_ms': round(latency * 1000, 1),
+            'model': model_name,
+            'recorded_at': datetime.now().isoformat(timespec='seconds')
+        }
+        with self._lock:
+            self.entries[self.key(prompt)] = entry
+            self.recorded += 1
+            self.save()
+
+    def save(self):
+        from ..reporting.store import atomic_write
+        body = {'version': 1, 'entries': dict(sorted(self.entries.items()))}
+        atomic_write(self.path, json.dumps(body, indent=2, ensure_ascii=False).encode('utf-8'))
+
+
+_cassettes: Dict[str, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(path: str) -> Cassette:
+    """Process-wide cassette for a file, shared by every agent's model"""
+    key = os.path.abspath(path)
+    with _cassettes_lock:
+        if key not in _cassettes:
+            _cassettes[key] = Cassette(path)
+        return _cassettes[key]
+
+
+class CassetteModel:
+    """
+    Record/replay model
+
+    Modes: 'replay' answers only from the cassette (a miss raises
+    CassetteMiss), 'record' always calls the live model and stores the
+    response, and 'auto' replays hits and records misses. ``latency`` is
+    the simulated round trip of a replayed call: seconds, or 'recorded'
+    to wait as long as the live call took.
+    """
+
+    MODES = ('replay', 'record', 'auto')
+
+    def __init__(self, cassette: Cassette, mode: str = 'replay', latency: Any = 0.0,
+                 source: Optional[Callable[[], Any]] = None, model_name: str = 'cassette'):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown cassette mode: {mode!r} (expected replay, record or auto)")
+        self.cassette = cassette
+        self.mode = mode
+        self.latency = latency
+        self.model_name = model_name
+        self._source_factory = source
+        self._source = None
+
+    @property
+    def source(self):
+        """The live model (created on first recording)"""
+        if self._source is None:
+            if self._source_factory is None:
+                raise CassetteMiss('no live model configured for recording')
+            self._source = self._source_factory()
+        return self._source
+
+    def _replay(self, prompt: str) -> Optional[FakeResponse]:
+        if self.mode == 'record':
+            return None
+        entry = self.cassette.get(prompt)
+        if entry is None:
+            if self.mode == 'replay':
+                head = prompt.split('\n', 1)[0][:60]
+                raise CassetteMiss(f"no recorded response for {head!r} "
+                                   f"(prompt {Cassette.key(prompt)[:12]}) in {self.cassette.path}")
+            return None
+        response = FakeResponse(entry['text'], estimate_tokens(prompt))
+        recorded_usage = {k: v for k, v in (entry.get('usage') or {}).items() if v is not None}
+        response.usage_metadata.update(recorded_usage)
+        return response
+
+    def _delay(self, prompt: str) -> float:
+        if self.latency == 'recorded':
+            entry = self.cassette.entries.get(Cassette.key(prompt)) or {}
+            return (entry.get('latency_ms') or 0) / 1000
+        return float(self.latency or 0)
+
+    def generate_content(self, prompt: str):
+        """Replay the recorded response, or call the live model and record it"""
+        response = self._replay(prompt)
+        if response is not None:
+            if self._delay(prompt):
+                time.sleep(self._delay(prompt))
+            return response
+        started = time.perf_counter()
+        response = self.source.generate_content(prompt)
+        self.cassette.put(prompt, response, time.perf_counter() - started, getattr(self.source, 'model_name', None))
+        return response
+
+    async def generate_content_async(self, prompt: str):
+        """Async variant; simulated latency is awaited so concurrent replays overlap"""
+        response = self._replay(prompt)
+        if response is not None:
+            if self._delay(prompt):
+                await asyncio.sleep(self._delay(prompt))
+            return response
+        source = self.source
+        started = time.perf_counter()
+        if hasattr(source, 'generate_content_async'):
+            response = await source.generate_content_async(prompt)
+        else:
+            response = await asyncio.to_thread(source.generate_content, prompt)
+        self.cassette.put(prompt, response, time.perf_counter() - started, getattr(source, 'model_name', None))
+        return response
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def generate(model, prompt: str, agent: str):
+    """
+    Call ``model.generate_content`` inside an LLM span
+
+    Args:
+        model: Model returned by create_model
+        prompt: Full prompt text
+        agent: Calling agent name, used as the span prefix
+
+    Returns:
+        The model response
+    """
+    with span(f"{agent}.generate_content", 'llm', model=getattr(model, 'model_name', None)) as current:
+        response = model.generate_content(prompt)
+        record_llm_usage(current, prompt, response)
+    return response
+
+
+async def generate_async(model, prompt: str, agent: str, timeout: Optional[float] = None):
+    """
+    Await ``model.generate_content_async`` inside an LLM span
+
+    Args:
+        model: Model returned by create_model
+        prompt: Full prompt text
+        agent: Calling agent name, used as the span prefix
+        timeout: Seconds before asyncio.TimeoutError is raised (None = no limit)
+
+    Returns:
+        The model response
+    """
+    with span(f"{agent}.generate_content", 'llm', model=getattr(model, 'model_name', None)) as current:
+        if hasattr(model, 'generate_content_async'):
+            call = model.generate_content_async(prompt)
+        else:
+            call = asyncio.to_thread(model.generate_content, prompt)
+        response = await asyncio.wait_for(call, timeout)
+        record_llm_usage(current, prompt, response)
+    return response
+
+
+def parse_json_response(response) -> Any:
+    """
+    Parse a model response as JSON, stripping markdown code fences
+
+    Args:
+        response: Model response with a ``text`` attribute
+
+    Returns:
+        Parsed JSON value
+    """
+    response_text = response.text.strip()
+    if response_text.startswith('```json'):
+        response_text = response_text[7:]  # Remove ```json
+    if response_text.startswith('```'):
+        response_text = response_text[3:]  # Remove ```
+    if response_text.endswith('```'):
+        response_text = response_text[:-3]  # Remove trailing ```
+    return json.loads(response_text.strip())
@@ -3,10 +3,13 @@ Logger Utility
 Handles logging of agent interactions and results
 """
 import json
+import uuid
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, List
 
+from .records import RecordTable
+
 
 class ExecutionLogger:
     """Logs execution traces for observability"""
@@ -16,11 +19,18 @@ class ExecutionLogger:
         self.log_dir.mkdir(exist_ok=True)
         self.steps: List[Dict[str, Any]] = []
         self.metadata: Dict[str, Any] = {}
+        self.profile: Dict[str, Any] = {}
+        # Unique per run so concurrent executions never share a trace file
+        self.run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
     
     def set_metadata(self, **kwargs):
         """Set metadata for this execution"""
         self.metadata.update(kwargs)
     
+    def set_profile(self, profile: Dict[str, Any]):
+        """Attach the profiler's span tree (and capture output) to this execution"""
+        self.profile = profile
+    
     def log_step(self, step_name: str, input_data: Any, output_data: Any, 
                  agent: str = None, duration: float = None, **extras):
         """
@@ -53,6 +63,8 @@ class ExecutionLogger:
             return {k: self._sanitize(v) for k, v in data.items()}
         elif isinstance(data, (list, tuple)):
             return [self._sanitize(item) for item in data]
+        elif isinstance(data, RecordTable):
+            return self._sanitize(data.to_records())
         else:
             return str(data)
     
@@ -67,8 +79,7 @@ class ExecutionLogger:
             Path to saved log file
         """
         if filename is None:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"trace_{timestamp}.json"
+            filename = f"trace_{self.run_id}.json"
         
         log_path = self.log_dir / filename
         
@@ -79,6 +90,8 @@ class ExecutionLogger:
             'total_steps': len(self.steps),
             'steps': self.steps
         }
+        if self.profile:
+            log_data['profile'] = self.profile
         
         with open(log_path, 'w', encoding='utf-8') as f:
             json.dump(log_data, f, indent=2)
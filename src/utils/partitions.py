@@ -0,0 +1,298 @@
+"""
+Partitioned Dataset
+Writes the validated ads CSV as one file per date bucket (month or day,
+optionally also per campaign) plus a manifest holding each partition's row
+offset, date range, campaigns and per-column min/max/sum/null statistics,
+and the validation report. Reads prune partitions with the manifest, so a
+time-window or campaign filter only touches the files it needs.
+
+Usage:
+    python -m src.utils.partitions data/synthetic_fb_ads_undergarments.csv data/ads_partitioned
+    python -m src.utils.partitions data/ads.csv data/ads_partitioned --granularity day --by-campaign
+"""
+import argparse
+import hashlib
+import json
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Union
+
+import pandas as pd
+
+from ..reporting.store import atomic_write
+from .cache import dataset_fingerprint
+from .validation import load_validated
+
+MANIFEST_FILE = 'manifest.json'
+QUARANTINE_FILE = 'quarantine'
+GRANULARITIES = {'month': '%Y-%m', 'day': '%Y-%m-%d'}
+FILE_SUFFIXES = {'parquet': '.parquet', 'pickle': '.pkl'}
+
+
+def default_format() -> str:
+    """Parquet when pyarrow is installed, otherwise pickle"""
+    try:
+        import pyarrow  # noqa: F401
+        return 'parquet'
+    except ImportError:
+        return 'pickle'
+
+
+def is_partitioned(path: Union[str, Path]) -> bool:
+    """Whether a path is a partitioned dataset directory"""
+    return (Path(path) / MANIFEST_FILE).is_file()
+
+
+def _slug(name: str) -> str:
+    """File-system safe, collision-free directory name for a campaign"""
+    readable = re.sub(r'[^A-Za-z0-9]+', '_', str(name)).strip('_')[:40]
+    return f"{readable}-{hashlib.sha1(str(name).encode('utf-8')).hexdigest()[:8]}"
+
+
+def _to_native(value: Any) -> Any:
+    if hasattr(value, 'item'):
+        value = value.item()
+    return None if isinstance(value, float) and value != value else value
+
+
+def _partition_stats(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """Min/max/sum for numeric columns and null counts for every column"""
+    stats = {}
+    for column in df.columns:
+        series = df[column]
+        entry: Dict[str, Any] = {'nulls': int(series.isna().sum())}
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            entry.update(min=_to_native(series.min()), max=_to_native(series.max()), sum=_to_native(series.sum()))
+        stats[column] = entry
+    return stats
+
+
+def _write_frame(df: pd.DataFrame, target: Path, file_format: str):
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if file_format == 'parquet':
+        df.to_parquet(target, index=False)
+    else:
+        df.to_pickle(target)
+
+
+def _read_frame(path: Path) -> pd.DataFrame:
+    return pd.read_parquet(path) if path.suffix == '.parquet' else pd.read_pickle(path)
+
+
+def write_partitioned(csv_path: str, out_dir: str, granularity: str = 'month', by_campaign: bool = False,
+                      file_format: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Ingest the ads CSV into a partitioned dataset
+
+    Args:
+        csv_path: Source CSV
+        out_dir: Dataset directory (its manifest is replaced)
+        granularity: 'month' or 'day' date buckets
+        by_campaign: Also split each date bucket per campaign
+        file_format: 'parquet' or 'pickle' (default: parquet if pyarrow is available)
+
+    Returns:
+        The manifest
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity!r} (expected month or day)")
+    file_format = file_format or default_format()
+    if file_format not in FILE_SUFFIXES:
+        raise ValueError(f"Unknown format: {file_format!r} (expected parquet or pickle)")
+
+    df, quarantine, quality = load_validated(csv_path)
+    keys = ['bucket', 'campaign_name'] if by_campaign else ['bucket']
+    buckets = df['date'].dt.strftime(GRANULARITIES[granularity])
+
+    root = Path(out_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    _write_frame(quarantine, root / f"{QUARANTINE_FILE}{FILE_SUFFIXES[file_format]}", file_format)
+    partitions = []
+    offset = 0
+    for key, part in df.groupby([buckets.rename('bucket')] + keys[1:], sort=True, dropna=False):
+        key = key if isinstance(key, tuple) else (key,)
+        relative = Path(f"date={key[0]}")
+        if by_campaign:
+            relative = relative / f"campaign={_slug(key[1])}"
+        relative = relative / f"part{FILE_SUFFIXES[file_format]}"
+
+        part = part.reset_index(drop=True)
+        target = root / relative
+        _write_frame(part, target, file_format)
+
+        partitions.append({
+            'path': relative.as_posix(),
+            'rows': len(part),
+            'offset': offset,
+            'bytes': target.stat().st_size,
+            'date_min': part['date'].min().strftime('%Y-%m-%d'),
+            'date_max': part['date'].max().strftime('%Y-%m-%d'),
+            'campaigns': sorted(part['campaign_name'].dropna().unique().tolist()),
+            'stats': _partition_stats(part.drop(columns=['date']))
+        })
+        offset += len(part)
+
+    manifest = {
+        'source': str(csv_path),
+        'source_fingerprint': dataset_fingerprint(csv_path),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'granularity': granularity,
+        'by_campaign': by_campaign,
+        'format': file_format,
+        'rows': offset,
+        'quality': quality,
+        'dtypes': {column: str(dtype) for column, dtype in df.dtypes.items()},
+        'partitions': partitions
+    }
+    atomic_write(root / MANIFEST_FILE, json.dumps(manifest, indent=2).encode('utf-8'))
+    return manifest
+
+
+def campaign_matches(campaigns: Iterable[str], value: Any) -> bool:
+    """Whether any campaign satisfies a plan filter (list: exact values, scalar: case-insensitive substring)"""
+    if isinstance(value, (list, tuple)):
+        return bool(set(campaigns) & set(value))
+    needle = str(value).lower()
+    return any(needle in name.lower() for name in campaigns)
+
+
+class PartitionedDataset:
+    """Lazily read view of a partitioned dataset; partition frames are read at most once"""
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: Dataset directory written by write_partitioned
+        """
+        self.root = Path(path)
+        raw = (self.root / MANIFEST_FILE).read_bytes()
+        self.manifest: Dict[str, Any] = json.loads(raw)
+        # The manifest changes with every ingest, so its hash identifies the data
+        self.fingerprint = hashlib.blake2b(raw, digest_size=16).hexdigest()
+        self.partitions: List[Dict[str, Any]] = self.manifest['partitions']
+        self.min_date = pd.Timestamp(min(p['date_min'] for p in self.partitions)) if self.partitions else None
+        self.max_date = pd.Timestamp(max(p['date_max'] for p in self.partitions)) if self.partitions else None
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+        self.partitions_read = 0
+        self.bytes_read = 0
+
+    @property
+    def num_rows(self) -> int:
+        return self.manifest['rows']
+
+    def prune(self, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None,
+              campaign: Any = None) -> List[Dict[str, Any]]:
+        """
+        Partitions that can hold rows in [start, end] matching the campaign filter
+
+        Args:
+            start: Inclusive lower date bound (None = unbounded)
+            end: Inclusive upper date bound (None = unbounded)
+            campaign: Plan-style campaign filter value
+
+        Returns:
+            Manifest entries of the partitions to read
+        """
+        selected = []
+        for partition in self.partitions:
+            if start is not None and pd.Timestamp(partition['date_max']) < start.normalize():
+                continue
+            if end is not None and pd.Timestamp(partition['date_min']) > end:
+                continue
+            if campaign not in (None, '', []) and not campaign_matches(partition['campaigns'], campaign):
+                continue
+            selected.append(partition)
+        return selected
+
+    def _load(self, partition: Dict[str, Any]) -> pd.DataFrame:
+        """One partition with its rows indexed by their position in the full dataset"""
+        frame = self._frames.get(partition['path'])
+        if frame is None:
+            with self._lock:
+                frame = self._frames.get(partition['path'])
+                if frame is None:
+                    path = self.root / partition['path']
+                    frame = _read_frame(path)
+                    frame.index = pd.RangeIndex(partition['offset'], partition['offset'] + len(frame))
+                    self._frames[partition['path']] = frame
+                    self.partitions_read += 1
+                    self.bytes_read += path.stat().st_size
+        return frame
+
+    def _empty(self) -> pd.DataFrame:
+        return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in self.manifest['dtypes'].items()})
+
+    def read(self, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None,
+             campaign: Any = None) -> pd.DataFrame:
+        """
+        Rows with start <= date <= end from the partitions that survive pruning
+
+        Campaign pruning only skips files; the caller still applies the
+        campaign filter to the returned rows.
+
+        Args:
+            start: Inclusive lower date bound (None = unbounded)
+            end: Inclusive upper date bound (None = unbounded)
+            campaign: Plan-style campaign filter value used for pruning
+
+        Returns:
+            DataFrame indexed by row position in the full dataset
+        """
+        frames = [self._load(partition) for partition in self.prune(start, end, campaign)]
+        if not frames:
+            return self._empty()
+        df = pd.concat(frames) if len(frames) > 1 else frames[0]
+        if start is not None:
+            df = df[df['date'] >= start]
+        if end is not None:
+            df = df[df['date'] <= end]
+        return df
+
+    def read_quarantine(self) -> pd.DataFrame:
+        """Rows rejected by validation at ingest"""
+        path = self.root / f"{QUARANTINE_FILE}{FILE_SUFFIXES[self.manifest['format']]}"
+        return _read_frame(path) if path.exists() else self._empty()
+
+    def release(self):
+        """Drop the cached partition frames (e.g. once the full table is held elsewhere)"""
+        with self._lock:
+            self._frames.clear()
+
+    def column_sum(self, column: str) -> float:
+        """Sum of a numeric column from the partition statistics"""
+        return sum(p['stats'][column]['sum'] or 0 for p in self.partitions)
+
+    def null_counts(self) -> Dict[str, int]:
+        """Missing values per column from the partition statistics"""
+        counts = {column: 0 for column in self.manifest['dtypes']}
+        for partition in self.partitions:
+            for column, entry in partition['stats'].items():
+                counts[column] += entry['nulls']
+        return counts
+
+    def campaigns(self) -> List[str]:
+        """Distinct campaign names"""
+        return sorted({name for partition in self.partitions for name in partition['campaigns']})
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Write the ads CSV as a partitioned dataset")
+    parser.add_argument('csv_path', help="Source CSV")
+    parser.add_argument('out_dir', help="Dataset directory (use it as data_path)")
+    parser.add_argument('--granularity', choices=sorted(GRANULARITIES), default='month')
+    parser.add_argument('--by-campaign', action='store_true', help="Also partition each date bucket by campaign")
+    parser.add_argument('--format', choices=sorted(FILE_SUFFIXES), default=None,
+                        help="File format (default: parquet if pyarrow is installed, else pickle)")
+    args = parser.parse_args(argv)
+
+    manifest = write_partitioned(args.csv_path, args.out_dir, args.granularity, args.by_campaign, args.format)
+    print(f"[OK] {manifest['rows']:,} rows -> {len(manifest['partitions'])} {manifest['format']} partitions "
+          f"in {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,313 @@
+"""
+Profiling Utility
+Nested timing spans for pipeline stages, DataAgent methods, serialization,
+prompt building and LLM calls, with trace-file and OpenMetrics export
+"""
+import cProfile
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+_active_profiler: ContextVar[Optional['Profiler']] = ContextVar('kasparro_profiler', default=None)
+_active_span: ContextVar[Optional['Span']] = ContextVar('kasparro_span', default=None)
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def _current_rss() -> Optional[int]:
+    """Current resident set size in bytes (Linux only, None elsewhere)"""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Span:
+    """A single timed region; counters are filled in by the instrumented code"""
+
+    __slots__ = ('name', 'category', 'attrs', 'children', 'wall_seconds', 'cpu_seconds',
+                 'memory_delta_bytes', 'bytes_in', 'bytes_out', 'prompt_tokens', 'response_tokens',
+                 '_wall_start', '_cpu_start', '_mem_start', '_traced')
+
+    def __init__(self, name: str, category: str, attrs: Dict[str, Any], traced: bool):
+        self.name = name
+        self.category = category
+        self.attrs = attrs
+        self.children: List['Span'] = []
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.memory_delta_bytes: Optional[int] = None
+        self.bytes_in: Optional[int] = None
+        self.bytes_out: Optional[int] = None
+        self.prompt_tokens: Optional[int] = None
+        self.response_tokens: Optional[int] = None
+        self._traced = traced
+
+    def _memory(self) -> Optional[int]:
+        if self._traced and tracemalloc.is_tracing():
+            return tracemalloc.get_traced_memory()[0]
+        return _current_rss()
+
+    def start(self):
+        self._mem_start = self._memory()
+        self._cpu_start = time.process_time()
+        self._wall_start = time.perf_counter()
+
+    def finish(self):
+        self.wall_seconds = time.perf_counter() - self._wall_start
+        self.cpu_seconds = time.process_time() - self._cpu_start
+        mem_end = self._memory()
+        if mem_end is not None and self._mem_start is not None:
+            self.memory_delta_bytes = mem_end - self._mem_start
+
+    def set(self, **counters):
+        """Set byte/token counters or extra attributes"""
+        for key, value in counters.items():
+            if key in ('bytes_in', 'bytes_out', 'prompt_tokens', 'response_tokens'):
+                setattr(self, key, value)
+            else:
+                self.attrs[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            'name': self.name,
+            'category': self.category,
+            'wall_seconds': round(self.wall_seconds, 6),
+            'cpu_seconds': round(self.cpu_seconds, 6),
+        }
+        for key in ('memory_delta_bytes', 'bytes_in', 'bytes_out', 'prompt_tokens', 'response_tokens'):
+            value = getattr(self, key)
+            if value is not None:
+                data[key] = value
+        if self.attrs:
+            data['attrs'] = self.attrs
+        if self.children:
+            data['children'] = [child.to_dict() for child in self.children]
+        return data
+
+
+class _NullSpan:
+    """Returned when no profiler is active so instrumented code needs no branches"""
+
+    def set(self, **counters):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class MetricsRegistry:
+    """Process-wide aggregates of finished spans, rendered as OpenMetrics text"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series: Dict[tuple, Dict[str, float]] = {}
+
+    def observe(self, span: Span):
+        key = (span.category, span.name)
+        with self._lock:
+            series = self._series.setdefault(key, {
+                'count': 0, 'wall': 0.0, 'cpu': 0.0, 'bytes_in': 0, 'bytes_out': 0,
+                'prompt_tokens': 0, 'response_tokens': 0
+            })
+            series['count'] += 1
+            series['wall'] += span.wall_seconds
+            series['cpu'] += span.cpu_seconds
+            for counter in ('bytes_in', 'bytes_out', 'prompt_tokens', 'response_tokens'):
+                series[counter] += getattr(span, counter) or 0
+
+    def render(self) -> str:
+        """Render all series in Prometheus text / OpenMetrics format"""
+        families = [
+            ('kasparro_span_duration_seconds', 'summary', 'Wall-clock time spent in spans', 'wall'),
+            ('kasparro_span_cpu_seconds', 'counter', 'CPU time spent in spans', 'cpu'),
+            ('kasparro_span_bytes_in', 'counter', 'Bytes consumed by spans', 'bytes_in'),
+            ('kasparro_span_bytes_out', 'counter', 'Bytes produced by spans', 'bytes_out'),
+            ('kasparro_llm_prompt_tokens', 'counter', 'Prompt tokens sent to the LLM', 'prompt_tokens'),
+            ('kasparro_llm_response_tokens', 'counter', 'Response tokens received from the LLM', 'response_tokens'),
+        ]
+        with self._lock:
+            series = sorted(self._series.items())
+
+        lines = []
+        for name, kind, help_text, field in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (category, span_name), values in series:
+                labels = f'category="{category}",name="{span_name}"'
+                if kind == 'summary':
+                    lines.append(f"{name}_sum{{{labels}}} {values[field]:.6f}")
+                    lines.append(f"{name}_count{{{labels}}} {values['count']}")
+                elif values[field]:
+                    lines.append(f"{name}_total{{{labels}}} {values[field]:g}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """Write the current metrics to a text file (atomically)"""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + '.tmp')
+        tmp.write_text(self.render(), encoding='utf-8')
+        os.replace(tmp, target)
+
+
+metrics = MetricsRegistry()
+_server: Optional[HTTPServer] = None
+
+
+def serve_metrics(port: int, host: str = '127.0.0.1') -> HTTPServer:
+    """
+    Serve the metrics registry over HTTP on a background thread (once per process)
+
+    Args:
+        port: Local port
+        host: Bind address (localhost by default)
+
+    Returns:
+        The running HTTPServer
+    """
+    global _server
+    if _server is not None:
+        return _server
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = metrics.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/openmetrics-text; version=1.0.0; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    _server = HTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+
+class Profiler:
+    """Collects a span tree for one pipeline run"""
+
+    def __init__(self, capture: Optional[str] = None, output_dir: str = 'logs'):
+        """
+        Args:
+            capture: Optional deep capture mode: 'cprofile', 'tracemalloc' or 'both'
+            output_dir: Where cProfile dumps are written
+        """
+        self.capture = capture or ''
+        self.output_dir = Path(output_dir)
+        self.roots: List[Span] = []
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._started_tracemalloc = False
+        self.capture_results: Dict[str, Any] = {}
+
+    @contextmanager
+    def activate(self):
+        """Make this profiler current for spans opened in this context"""
+        token = _active_profiler.set(self)
+        self._start_capture()
+        try:
+            yield self
+        finally:
+            self._stop_capture()
+            _active_profiler.reset(token)
+
+    def _start_capture(self):
+        if self.capture in ('tracemalloc', 'both') and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if self.capture in ('cprofile', 'both'):
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def _stop_capture(self):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            path = self.output_dir / f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof"
+            self._cprofile.dump_stats(str(path))
+            self.capture_results['cprofile_stats'] = str(path)
+            self._cprofile = None
+        if self._started_tracemalloc:
+            snapshot = tracemalloc.take_snapshot()
+            self.capture_results['top_allocations'] = [
+                {'location': str(stat.traceback), 'size_bytes': stat.size, 'count': stat.count}
+                for stat in snapshot.statistics('lineno')[:20]
+            ]
+            self.capture_results['peak_traced_bytes'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Span tree plus any capture output, for the execution trace"""
+        data: Dict[str, Any] = {'spans': [root.to_dict() for root in self.roots]}
+        data.update(self.capture_results)
+        return data
+
+
+@contextmanager
+def span(name: str, category: str = 'stage', **attrs):
+    """
+    Time a region as a child of the current span
+
+    Yields a Span (or a no-op stand-in when profiling is off) whose ``set``
+    method records bytes and token counts.
+    """
+    profiler = _active_profiler.get()
+    if profiler is None:
+        yield _NULL_SPAN
+        return
+
+    current = Span(name, category, attrs, traced='tracemalloc' in profiler.capture or profiler.capture == 'both')
+    parent = _active_span.get()
+    (parent.children if parent is not None else profiler.roots).append(current)
+
+    token = _active_span.set(current)
+    current.start()
+    try:
+        yield current
+    finally:
+        current.finish()
+        _active_span.reset(token)
+        metrics.observe(current)
+
+
+def traced(category: str):
+    """Decorator wrapping a method call in a span named after the method"""
+    def decorator(func):
+        name = func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active_profiler.get() is None:
+                return func(*args, **kwargs)
+            with span(name, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_llm_usage(current, prompt: str, response: Any):
+    """Fill byte and token counters on an LLM span from the response metadata"""
+    text = getattr(response, 'text', '') or ''
+    usage = getattr(response, 'usage_metadata', None)
+    if isinstance(usage, dict):
+        prompt_tokens = usage.get('prompt_token_count')
+        response_tokens = usage.get('candidates_token_count')
+    else:
+        prompt_tokens = getattr(usage, 'prompt_token_count', None)
+        response_tokens = getattr(usage, 'candidates_token_count', None)
+    current.set(bytes_in=len(prompt.encode('utf-8')), bytes_out=len(text.encode('utf-8')),
+                prompt_tokens=prompt_tokens, response_tokens=response_tokens)
@@ -1,9 +1,75 @@
 """
 Prompt Manager Utility
 Handles loading and filling prompt templates
+
+Templates are compiled once into literal/placeholder segments and reloaded
+only when the file's mtime changes; filling is a single join. A prompt can
+also be split into a static prefix (shared across calls, e.g. the data
+section) and a per-call suffix.
 """
+import os
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
+
+from .profiling import span
+
+PLACEHOLDER = re.compile(r'\{(\w+)\}')
+
+
+class CompiledTemplate:
+    """A template as alternating literal text and placeholder names"""
+    
+    __slots__ = ('source', 'literals', 'fields')
+    
+    def __init__(self, source: str):
+        self.source = source
+        # literals[i] precedes fields[i]; the last literal closes the template
+        parts = PLACEHOLDER.split(source)
+        self.literals: List[str] = parts[0::2]
+        self.fields: List[str] = parts[1::2]
+    
+    def fill(self, values: Dict[str, Any], stop: Optional[int] = None, start: Optional[int] = None) -> str:
+        """
+        Substitute placeholders in one pass
+        
+        Placeholders without a value are kept literally (``{name}``), and
+        substituted values are never re-scanned for placeholders.
+        
+        Args:
+            values: Placeholder values
+            stop: Only render up to (not including) field index ``stop``
+            start: Start at field index ``start``, without the literal before it
+                (None renders from the beginning of the template)
+        """
+        stop = len(self.fields) if stop is None else stop
+        out = [self.literals[0]] if start is None else []
+        for i in range(start or 0, stop):
+            name = self.fields[i]
+            out.append(str(values[name]) if name in values else f"{{{name}}}")
+            out.append(self.literals[i + 1])
+        return ''.join(out)
+    
+    def split_index(self, static: Iterable[str]) -> int:
+        """Index of the first placeholder that is not static (len(fields) if none)"""
+        static = set(static)
+        for i, name in enumerate(self.fields):
+            if name not in static:
+                return i
+        return len(self.fields)
+
+
+# Compiled templates per file path: (mtime_ns, template); shared by all managers
+_templates: Dict[str, Tuple[int, CompiledTemplate]] = {}
+# Template strings passed to fill_prompt; bounded so edited sources do not pile up
+MAX_COMPILED_SOURCES = 64
+
+
+@lru_cache(maxsize=MAX_COMPILED_SOURCES)
+def compile_source(source: str) -> CompiledTemplate:
+    """Compile (once) a template given as a string"""
+    return CompiledTemplate(source)
 
 
 class PromptManager:
@@ -11,42 +77,60 @@ class PromptManager:
     
     def __init__(self, prompts_dir: str = "prompts"):
         self.prompts_dir = Path(prompts_dir)
+        # Compile every template up front (already-compiled files are only stat'ed)
+        if self.prompts_dir.is_dir():
+            for prompt_file in self.prompts_dir.glob('*.md'):
+                self.compiled(prompt_file.stem)
     
-    def load_prompt(self, agent_name: str) -> str:
+    def compiled(self, agent_name: str) -> CompiledTemplate:
         """
-        Load a prompt template for a specific agent
+        Compiled template for an agent, recompiled if the file changed
         
         Args:
             agent_name: Name of the agent (e.g., 'planner_agent', 'data_agent')
-            
+        
         Returns:
-            Prompt template as string
+            CompiledTemplate
         """
         prompt_file = self.prompts_dir / f"{agent_name}.md"
+        key = str(prompt_file.resolve())
+        try:
+            mtime = os.stat(key).st_mtime_ns
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Prompt file not found: {prompt_file}") from None
+        
+        cached = _templates.get(key)
+        if cached is None or cached[0] != mtime:
+            with open(prompt_file, 'r', encoding='utf-8') as f:
+                cached = _templates[key] = (mtime, CompiledTemplate(f.read()))
+        return cached[1]
+    
+    def load_prompt(self, agent_name: str) -> str:
+        """
+        Load a prompt template for a specific agent
         
-        if not prompt_file.exists():
-            raise FileNotFoundError(f"Prompt file not found: {prompt_file}")
+        Args:
+            agent_name: Name of the agent (e.g., 'planner_agent', 'data_agent')
         
-        with open(prompt_file, 'r', encoding='utf-8') as f:
-            return f.read()
+        Returns:
+            Prompt template as string
+        """
+        return self.compiled(agent_name).source
     
-    def fill_prompt(self, template: str, **kwargs) -> str:
+    def fill_prompt(self, template: Union[str, CompiledTemplate], **kwargs) -> str:
         """
         Fill a prompt template with provided values
         
         Args:
-            template: Prompt template string
+            template: Prompt template string (or compiled template)
             **kwargs: Key-value pairs to fill in the template
-            
+        
         Returns:
             Filled prompt string
         """
-        filled = template
-        for key, value in kwargs.items():
-            placeholder = f"{{{key}}}"
-            filled = filled.replace(placeholder, str(value))
-        
-        return filled
+        if isinstance(template, str):
+            template = compile_source(template)
+        return template.fill(kwargs)
     
     def get_filled_prompt(self, agent_name: str, **kwargs) -> str:
         """
@@ -55,9 +139,50 @@ class PromptManager:
         Args:
             agent_name: Name of the agent
             **kwargs: Values to fill in the template
-            
+        
         Returns:
             Filled prompt string
         """
-        template = self.load_prompt(agent_name)
-        return self.fill_prompt(template, **kwargs)
+        with span(f"prompt.{agent_name}", 'prompt') as current:
+            prompt = self.compiled(agent_name).fill(kwargs)
+            current.set(bytes_out=len(prompt))
+        return prompt
+    
+    def get_static_prefix(self, agent_name: str, **static) -> str:
+        """
+        Render the template up to its first placeholder not given in ``static``
+        
+        The prefix is identical for every call sharing those values, so it can
+        be computed once and reused (and cached by the provider).
+        
+        Args:
+            agent_name: Name of the agent
+            **static: Values shared across calls (e.g. data)
+        
+        Returns:
+            Prompt prefix
+        """
+        with span(f"prompt.{agent_name}.prefix", 'prompt') as current:
+            template = self.compiled(agent_name)
+            prefix = template.fill(static, stop=template.split_index(static))
+            current.set(bytes_out=len(prefix))
+        return prefix
+    
+    def get_suffix(self, agent_name: str, static: Dict[str, Any], **kwargs) -> str:
+        """
+        Render the remainder after get_static_prefix
+        
+        Args:
+            agent_name: Name of the agent
+            static: The values passed to get_static_prefix (they may recur later)
+            **kwargs: Values for the per-call placeholders
+        
+        Returns:
+            Prompt suffix; prefix + suffix equals the fully filled prompt
+        """
+        with span(f"prompt.{agent_name}", 'prompt') as current:
+            template = self.compiled(agent_name)
+            split = template.split_index(static)
+            suffix = template.fill(dict(static, **kwargs), start=split) if split < len(template.fields) else ''
+            current.set(bytes_out=len(suffix))
+        return suffix
@@ -0,0 +1,176 @@
+"""
+Prompt Table Encoder
+Renders DataAgent results as compact prompt text: record tables print their
+column names once followed by pipe-separated rows, numbers are rounded to a
+per-metric number of significant figures and large values are scaled (k/M/B)
+"""
+import math
+from collections.abc import Mapping
+from typing import Dict, Any, List, Optional
+
+from .records import RecordTable
+
+# Significant figures per metric (columns not listed use DEFAULT_SIGNIFICANT)
+METRIC_PRECISION = {
+    'spend': 4,
+    'revenue': 4,
+    'roas': 3,
+    'ctr': 3,
+    'cpc': 2,
+    'cpa': 3,
+    'impressions': 3,
+    'clicks': 3,
+    'purchases': 3
+}
+DEFAULT_SIGNIFICANT = 3
+
+# Values at or above SCALE_FROM are shown with a unit suffix
+SCALE_FROM = 10_000
+UNITS = ((1e9, 'B'), (1e6, 'M'), (1e3, 'k'))
+
+
+def format_number(value: float, significant: int = DEFAULT_SIGNIFICANT, scale: bool = True) -> str:
+    """
+    Round a number to significant figures without dropping integer digits
+
+    Args:
+        value: Number to format
+        significant: Significant figures kept in the fractional part
+        scale: Use k/M/B suffixes for magnitudes >= SCALE_FROM
+
+    Returns:
+        Compact text; with 3 significant figures 640.0899 -> '640',
+        1.23456 -> '1.23', 1234567 -> '1.23M' and 5.0 -> '5'
+    """
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    suffix = ''
+    magnitude = abs(value)
+    if scale and magnitude >= SCALE_FROM:
+        for threshold, unit in UNITS:
+            if magnitude >= threshold:
+                value, magnitude, suffix = value / threshold, magnitude / threshold, unit
+                break
+    if magnitude == 0:
+        return '0'
+    decimals = max(significant - 1 - math.floor(math.log10(magnitude)), 0)
+    text = f"{value:.{decimals}f}"
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    return ('0' if text == '-0' else text) + suffix
+
+
+def format_value(value: Any, column: str = '', scale: bool = True,
+                 precision: Optional[Dict[str, int]] = None) -> str:
+    """
+    Format one cell or scalar for a prompt
+
+    Args:
+        value: Cell value (number, string, timestamp, list, dict, ...)
+        column: Column or key name, used to pick the metric precision
+        scale: Use k/M/B suffixes for large numbers
+        precision: Overrides for METRIC_PRECISION
+
+    Returns:
+        Cell text
+    """
+    if hasattr(value, 'item') and type(value).__module__ == 'numpy':
+        value = value.item()
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, (int, float)):
+        name = column.rsplit('.', 1)[-1]
+        significant = (precision or {}).get(name, METRIC_PRECISION.get(name, DEFAULT_SIGNIFICANT))
+        return format_number(value, significant, scale)
+    if hasattr(value, 'isoformat'):
+        text = value.isoformat()
+        return text[:10] if text.endswith('T00:00:00') else text
+    if isinstance(value, (list, tuple)):
+        return '+'.join(format_value(item, column, scale, precision) for item in value)
+    return str(value).replace('|', '/').replace('\n', ' ')
+
+
+def _flatten(row: Mapping, prefix: str = '') -> Dict[str, Any]:
+    """Nested dict cells (e.g. an anomaly flag's segment) become dotted columns"""
+    flat = {}
+    for key, value in row.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, Mapping):
+            flat.update(_flatten(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+
+def is_table(value: Any) -> bool:
+    """Whether a value is a record table (RecordTable or a non-empty list of dicts)"""
+    if isinstance(value, RecordTable):
+        return True
+    return isinstance(value, list) and bool(value) and all(isinstance(row, Mapping) for row in value)
+
+
+def encode_table(rows: Any, scale: bool = True, precision: Optional[Dict[str, int]] = None) -> str:
+    """
+    Render records as a header line plus one pipe-separated line per row
+
+    Args:
+        rows: RecordTable, list of dicts or DataFrame
+        scale: Use k/M/B suffixes for large numbers
+        precision: Overrides for METRIC_PRECISION
+
+    Returns:
+        Table text (empty string for no rows)
+    """
+    if hasattr(rows, 'to_dict') and not isinstance(rows, Mapping):
+        rows = RecordTable.from_frame(rows)
+    flat_rows = [_flatten(row) for row in rows]
+    columns: List[str] = list(dict.fromkeys(name for row in flat_rows for name in row))
+    if not columns:
+        return ''
+    lines = ['|'.join(columns)]
+    for row in flat_rows:
+        lines.append('|'.join(format_value(row.get(name), name, scale, precision) for name in columns))
+    return '\n'.join(lines)
+
+
+def encode_payload(data: Dict[str, Any], scale: bool = True, precision: Optional[Dict[str, int]] = None) -> str:
+    """
+    Render a data_results-style payload for a prompt
+
+    Scalars become ``path: key=value, ...`` lines, tables become titled blocks, and a
+    table object reachable under several keys (aliased sections) is written
+    once and referenced by path afterwards.
+
+    Args:
+        data: Nested dict of scalars, dicts and record tables
+        scale: Use k/M/B suffixes for large numbers
+        precision: Overrides for METRIC_PRECISION
+
+    Returns:
+        Prompt text
+    """
+    lines: List[str] = []
+    written: Dict[int, str] = {}
+
+    def walk(value: Any, path: str):
+        if is_table(value):
+            if id(value) in written:
+                lines.append(f"{path}: same table as {written[id(value)]}")
+                return
+            written[id(value)] = path
+            lines.append(f"\n{path} [{len(value)} rows]")
+            lines.append(encode_table(value, scale, precision))
+            lines.append('')
+            return
+        # Sibling scalars share one line; nested dicts and tables follow
+        scalars = [f"{key}={format_value(item, str(key), scale, precision)}" for key, item in value.items()
+                   if not isinstance(item, Mapping) and not is_table(item)]
+        if scalars:
+            lines.append(f"{path}: {', '.join(scalars)}" if path else ', '.join(scalars))
+        for key, item in value.items():
+            if isinstance(item, Mapping) or is_table(item):
+                walk(item, f"{path}.{key}" if path else str(key))
+    walk(data, '')
+    return '\n'.join(lines).strip('\n')
@@ -0,0 +1,141 @@
+"""
+Columnar Records
+Array-backed result tables for DataAgent sections. Rows are exposed as lazy
+read-only mapping views, subsets (top/bottom N) are index views over the same
+columns, and aliased sections hold the same table object instead of copies.
+"""
+from collections.abc import Mapping, Sequence
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+
+def _native(value: Any) -> Any:
+    """numpy scalar -> Python scalar (other values unchanged)"""
+    item = getattr(value, 'item', None)
+    if item is not None and type(value).__module__ == 'numpy':
+        return item()
+    return value
+
+
+class RowView(Mapping):
+    """Read-only dict-like view of one table row"""
+
+    __slots__ = ('_table', '_position')
+
+    def __init__(self, table: 'RecordTable', position: int):
+        self._table = table
+        self._position = position
+
+    def __getitem__(self, key: str) -> Any:
+        return _native(self._table.data[key][self._position])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table.data)
+
+    def __len__(self) -> int:
+        return len(self._table.data)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class RecordTable(Sequence):
+    """
+    Sequence of row mappings stored as one array per column
+
+    Behaves like the ``to_dict('records')`` list it replaces (len, indexing,
+    iteration, ``row.get``), while rows are materialized only on access.
+    """
+
+    __slots__ = ('data', '_index')
+
+    def __init__(self, data: Dict[str, Any], index: Optional[Any] = None):
+        """
+        Args:
+            data: Column name -> 1-D numpy array (all the same length)
+            index: Optional row positions into ``data`` (a view); None = all rows
+        """
+        self.data = data
+        self._index = index
+
+    @classmethod
+    def from_frame(cls, df) -> 'RecordTable':
+        """
+        Build a table from a DataFrame (columns become arrays, no row dicts)
+
+        Datetime columns are stored as Timestamp objects, like ``to_dict('records')``.
+        """
+        import numpy as np
+        data = {}
+        for column in df.columns:
+            series = df[column]
+            if series.dtype.kind == 'M':
+                data[column] = np.asarray(series.astype(object))
+            else:
+                data[column] = series.to_numpy()
+        return cls(data)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.data)
+
+    def _position(self, i: int) -> int:
+        return int(self._index[i]) if self._index is not None else i
+
+    def __len__(self) -> int:
+        if self._index is not None:
+            return len(self._index)
+        return len(next(iter(self.data.values()))) if self.data else 0
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            import numpy as np
+            positions = np.arange(len(self))[i]
+            return self.take(positions)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('RecordTable index out of range')
+        return RowView(self, self._position(i))
+
+    def __iter__(self) -> Iterator[RowView]:
+        positions = self._index if self._index is not None else range(len(self))
+        for position in positions:
+            yield RowView(self, int(position))
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (RecordTable, list)):
+            return self.to_records() == [dict(row) for row in other]
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"RecordTable({len(self)} rows, columns={self.columns})"
+
+    def take(self, positions: Iterable[int]) -> 'RecordTable':
+        """
+        Row subset sharing this table's column arrays
+
+        Args:
+            positions: Row positions relative to this table
+
+        Returns:
+            A view table (no column data is copied)
+        """
+        import numpy as np
+        positions = np.asarray(positions, dtype=np.int64)
+        if self._index is not None:
+            positions = np.asarray(self._index)[positions]
+        return RecordTable(self.data, positions)
+
+    def select(self, columns: Iterable[str]) -> 'RecordTable':
+        """Column subset sharing the same arrays and row view"""
+        return RecordTable({name: self.data[name] for name in columns if name in self.data}, self._index)
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Materialize plain row dicts with native Python values"""
+        columns = {}
+        for name, values in self.data.items():
+            if self._index is not None:
+                values = values[self._index]
+            columns[name] = values.tolist()
+        names = list(columns)
+        return [dict(zip(names, row)) for row in zip(*columns.values())] if names else []
@@ -0,0 +1,342 @@
+"""
+Trace Index
+Incrementally ingests ``trace_*.json`` execution logs into a local SQLite
+store (one row per run, step and profile span) so cross-run questions read
+a few kilobytes instead of re-parsing every trace. Files already ingested
+with the same size and mtime are skipped, so ingest cost tracks new traces.
+
+Usage:
+    python -m src.utils.trace_index ingest
+    python -m src.utils.trace_index percentiles --since 7d
+    python -m src.utils.trace_index regressions --baseline-runs 10 --threshold 0.2
+    python -m src.utils.trace_index slowest --limit 10 --spans
+"""
+import argparse
+import json
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .checkpoint import is_failure
+
+DEFAULT_DB = 'logs/trace_index.sqlite'
+PERCENTILES = (50, 90, 95, 99)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, run_id TEXT, ingested_at TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY, path TEXT, started TEXT, ended TEXT, query TEXT,
+    total_steps INTEGER, wall_seconds REAL, errors INTEGER
+);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id TEXT, seq INTEGER, step_name TEXT, agent TEXT, started TEXT, duration_seconds REAL,
+    input_bytes INTEGER, output_bytes INTEGER, error INTEGER, prompt_tokens INTEGER, response_tokens INTEGER,
+    PRIMARY KEY (run_id, seq)
+);
+CREATE TABLE IF NOT EXISTS spans (
+    run_id TEXT, path TEXT, name TEXT, category TEXT, depth INTEGER, wall_seconds REAL, cpu_seconds REAL,
+    bytes_in INTEGER, bytes_out INTEGER, prompt_tokens INTEGER, response_tokens INTEGER
+);
+CREATE INDEX IF NOT EXISTS steps_by_name ON steps (step_name, started);
+CREATE INDEX IF NOT EXISTS spans_by_run ON spans (run_id);
+"""
+
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value, separators=(',', ':'), default=str).encode('utf-8'))
+
+
+def _walk_spans(span: Dict[str, Any], parent: str = '', depth: int = 0) -> Iterator[Tuple[str, int, Dict[str, Any]]]:
+    path = f"{parent}/{span.get('name')}" if parent else str(span.get('name'))
+    yield path, depth, span
+    for child in span.get('children') or []:
+        yield from _walk_spans(child, path, depth + 1)
+
+
+def _llm_tokens(span: Dict[str, Any]) -> Tuple[int, int]:
+    """Prompt/response tokens of every LLM call under a span"""
+    prompt = response = 0
+    for _, _, node in _walk_spans(span):
+        if node.get('category') == 'llm':
+            prompt += node.get('prompt_tokens') or 0
+            response += node.get('response_tokens') or 0
+    return prompt, response
+
+
+def parse_trace(trace: Dict[str, Any], run_id: str, path: str) -> Dict[str, List[tuple]]:
+    """
+    Flatten one trace into run, step and span rows
+
+    Args:
+        trace: Parsed trace file
+        run_id: Run identifier
+        path: Trace file path
+
+    Returns:
+        Rows per table ('runs', 'steps', 'spans')
+    """
+    spans = (trace.get('profile') or {}).get('spans') or []
+    # Stage spans carry the step names; their LLM children carry token counts
+    stage_tokens: Dict[str, Tuple[int, int]] = {}
+    span_rows = []
+    for root in spans:
+        for span_path, depth, node in _walk_spans(root):
+            span_rows.append((run_id, span_path, node.get('name'), node.get('category'), depth,
+                              node.get('wall_seconds'), node.get('cpu_seconds'), node.get('bytes_in'),
+                              node.get('bytes_out'), node.get('prompt_tokens'), node.get('response_tokens')))
+            if node.get('category') == 'stage' and node.get('name') not in stage_tokens:
+                stage_tokens[node.get('name')] = _llm_tokens(node)
+
+    step_rows = []
+    for seq, step in enumerate(trace.get('steps') or []):
+        output = step.get('output')
+        error = is_failure(output) or (isinstance(output, list) and any(
+            isinstance(item, dict) and isinstance(item.get('insight'), dict) and item['insight'].get('error')
+            for item in output))
+        prompt_tokens, response_tokens = stage_tokens.get(step.get('step_name'), (None, None))
+        step_rows.append((run_id, seq, step.get('step_name'), step.get('agent'), step.get('timestamp'),
+                          step.get('duration_seconds'), _json_size(step.get('input')), _json_size(output),
+                          int(bool(error)), prompt_tokens, response_tokens))
+
+    wall = spans[0].get('wall_seconds') if spans else sum(row[5] or 0 for row in step_rows)
+    run_row = (run_id, path, trace.get('execution_start'), trace.get('execution_end'),
+               (trace.get('metadata') or {}).get('query'), len(step_rows), wall, sum(row[8] for row in step_rows))
+    return {'runs': [run_row], 'steps': step_rows, 'spans': span_rows}
+
+
+class TraceIndex:
+    """SQLite index of execution traces"""
+
+    def __init__(self, db_path: str = DEFAULT_DB):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def ingest(self, log_dir: str = 'logs', pattern: str = 'trace_*.json') -> Dict[str, int]:
+        """
+        Add new or rewritten trace files (unchanged files are only stat'ed)
+
+        Args:
+            log_dir: Directory holding trace files
+            pattern: Trace file glob
+
+        Returns:
+            Counts of 'ingested', 'skipped' and 'failed' files
+        """
+        known = {path: (size, mtime) for path, size, mtime in self.db.execute('SELECT path, size, mtime_ns FROM files')}
+        counts = {'ingested': 0, 'skipped': 0, 'failed': 0}
+        for trace_path in sorted(Path(log_dir).glob(pattern)):
+            stat = trace_path.stat()
+            key = str(trace_path)
+            if known.get(key) == (stat.st_size, stat.st_mtime_ns):
+                counts['skipped'] += 1
+                continue
+            try:
+                with open(trace_path, 'r', encoding='utf-8') as f:
+                    trace = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[WARN] Skipping unreadable trace {trace_path}: {e}")
+                counts['failed'] += 1
+                continue
+            run_id = (trace.get('metadata') or {}).get('run_id') or trace_path.stem.replace('trace_', '', 1)
+            rows = parse_trace(trace, run_id, key)
+            with self.db:
+                for table in ('runs', 'steps', 'spans'):
+                    self.db.execute(f'DELETE FROM {table} WHERE run_id = ?', (run_id,))
+                self.db.executemany('INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows['runs'])
+                self.db.executemany('INSERT INTO steps VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows['steps'])
+                self.db.executemany('INSERT INTO spans VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows['spans'])
+                self.db.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)',
+                                (key, stat.st_size, stat.st_mtime_ns, run_id, datetime.now().isoformat()))
+            counts['ingested'] += 1
+        return counts
+
+    def percentiles(self, step: Optional[str] = None, since: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Step duration percentiles
+
+        Args:
+            step: Only this step name (None = every step)
+            since: Only runs at or after this ISO timestamp
+
+        Returns:
+            Step name -> count, p50/p90/p95/p99, mean, max (seconds) and error count
+        """
+        sql = 'SELECT step_name, duration_seconds, error FROM steps WHERE duration_seconds IS NOT NULL'
+        params: List[Any] = []
+        if step:
+            sql += ' AND step_name = ?'
+            params.append(step)
+        if since:
+            sql += ' AND started >= ?'
+            params.append(since)
+        durations: Dict[str, List[float]] = {}
+        errors: Dict[str, int] = {}
+        for name, duration, error in self.db.execute(sql, params):
+            durations.setdefault(name, []).append(duration)
+            errors[name] = errors.get(name, 0) + error
+
+        stats = {}
+        for name, values in durations.items():
+            values = np.asarray(values)
+            entry = {'count': len(values)}
+            entry.update({f"p{q}": float(v) for q, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))})
+            entry.update(mean=float(values.mean()), max=float(values.max()), errors=errors[name])
+            stats[name] = entry
+        return stats
+
+    def regressions(self, run_id: Optional[str] = None, baseline_runs: int = 10, threshold: float = 0.2,
+                    min_seconds: float = 0.05) -> List[Dict[str, Any]]:
+        """
+        Steps of one run that are slower than the median of the runs before it
+
+        Args:
+            run_id: Run to check (None = the latest run)
+            baseline_runs: How many earlier runs form the baseline
+            threshold: Allowed relative slowdown (0.2 = 20%)
+            min_seconds: Ignore differences below this (noise floor)
+
+        Returns:
+            Regressed steps with current, baseline median and ratio
+        """
+        runs = [row[0] for row in self.db.execute('SELECT run_id FROM runs ORDER BY started, run_id')]
+        if not runs:
+            return []
+        run_id = run_id or runs[-1]
+        if run_id not in runs:
+            raise KeyError(f"Unknown run: {run_id}")
+        baseline = runs[max(0, runs.index(run_id) - baseline_runs):runs.index(run_id)]
+        if not baseline:
+            return []
+
+        def step_durations(run_ids: List[str]) -> Dict[str, List[float]]:
+            marks = ','.join('?' * len(run_ids))
+            grouped: Dict[str, List[float]] = {}
+            for name, duration in self.db.execute(
+                    f'SELECT step_name, SUM(duration_seconds) FROM steps WHERE run_id IN ({marks}) '
+                    f'AND duration_seconds IS NOT NULL GROUP BY run_id, step_name', run_ids):
+                grouped.setdefault(name, []).append(duration)
+            return grouped
+
+        previous = step_durations(baseline)
+        regressed = []
+        for name, (current,) in step_durations([run_id]).items():
+            if name not in previous:
+                continue
+            median = float(np.median(previous[name]))
+            if current - median < min_seconds or median <= 0:
+                continue
+            ratio = current / median
+            if ratio > 1 + threshold:
+                regressed.append({'run_id': run_id, 'step_name': name, 'duration_seconds': current,
+                                  'baseline_median': median, 'baseline_runs': len(previous[name]), 'ratio': ratio})
+        return sorted(regressed, key=lambda row: -row['ratio'])
+
+    def slowest(self, limit: int = 10, since: Optional[str] = None, spans: bool = False) -> List[Dict[str, Any]]:
+        """
+        Slowest step executions (or profile spans) across runs
+
+        Args:
+            limit: Number of rows
+            since: Only runs at or after this ISO timestamp
+            spans: Rank individual profile spans instead of pipeline steps
+
+        Returns:
+            Rows ordered by duration, slowest first
+        """
+        if spans:
+            sql = ('SELECT s.run_id, s.path, s.category, s.wall_seconds, s.prompt_tokens FROM spans s '
+                   'JOIN runs r ON r.run_id = s.run_id WHERE s.depth > 0 AND s.wall_seconds IS NOT NULL')
+            columns = ('run_id', 'span', 'category', 'duration_seconds', 'prompt_tokens')
+            time_column, order = 'r.started', 's.wall_seconds'
+        else:
+            sql = ('SELECT run_id, step_name, agent, duration_seconds, output_bytes, error FROM steps '
+                   'WHERE duration_seconds IS NOT NULL')
+            columns = ('run_id', 'step_name', 'agent', 'duration_seconds', 'output_bytes', 'error')
+            time_column, order = 'started', 'duration_seconds'
+        params: List[Any] = []
+        if since:
+            sql += f' AND {time_column} >= ?'
+            params.append(since)
+        sql += f' ORDER BY {order} DESC LIMIT ?'
+        params.append(limit)
+        return [dict(zip(columns, row)) for row in self.db.execute(sql, params)]
+
+
+def parse_since(value: Optional[str]) -> Optional[str]:
+    """'7d' / '12h' relative windows or an ISO date, as an ISO timestamp"""
+    if not value:
+        return None
+    match = re.fullmatch(r'(\d+)([dh])', value.strip())
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        delta = timedelta(days=amount) if unit == 'd' else timedelta(hours=amount)
+        return (datetime.now() - delta).isoformat()
+    return datetime.fromisoformat(value).isoformat()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Cross-run trace analytics")
+    parser.add_argument('--db', default=DEFAULT_DB, help="SQLite index path")
+    parser.add_argument('--logs', default='logs', help="Directory holding trace_*.json files")
+    parser.add_argument('--no-ingest', action='store_true', help="Query without ingesting new traces first")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('ingest', help="Ingest new trace files")
+    percentiles = commands.add_parser('percentiles', help="Step latency percentiles")
+    percentiles.add_argument('--step', default=None)
+    percentiles.add_argument('--since', default=None, help="e.g. 7d, 24h or 2025-11-01")
+    regressions = commands.add_parser('regressions', help="Steps slower than the preceding runs")
+    regressions.add_argument('--run', default=None, help="Run ID (default: latest)")
+    regressions.add_argument('--baseline-runs', type=int, default=10)
+    regressions.add_argument('--threshold', type=float, default=0.2, help="Relative slowdown (0.2 = 20%%)")
+    regressions.add_argument('--min-seconds', type=float, default=0.05, help="Noise floor")
+    slowest = commands.add_parser('slowest', help="Slowest steps or spans")
+    slowest.add_argument('--limit', type=int, default=10)
+    slowest.add_argument('--since', default=None)
+    slowest.add_argument('--spans', action='store_true', help="Rank profile spans instead of steps")
+    args = parser.parse_args(argv)
+
+    index = TraceIndex(args.db)
+    try:
+        if args.command == 'ingest' or not args.no_ingest:
+            counts = index.ingest(args.logs)
+            print(f"[TRACES] Ingested {counts['ingested']} new trace(s), {counts['skipped']} unchanged"
+                  + (f", {counts['failed']} unreadable" if counts['failed'] else ''))
+
+        if args.command == 'percentiles':
+            stats = index.percentiles(args.step, parse_since(args.since))
+            print(f"   {'step':<22} {'runs':>5} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8} {'errors':>6}")
+            for name, entry in sorted(stats.items()):
+                print(f"   {name:<22} {entry['count']:>5} {entry['p50']:>7.3f}s {entry['p90']:>7.3f}s "
+                      f"{entry['p95']:>7.3f}s {entry['p99']:>7.3f}s {entry['max']:>7.3f}s {entry['errors']:>6}")
+        elif args.command == 'regressions':
+            regressed = index.regressions(args.run, args.baseline_runs, args.threshold, args.min_seconds)
+            if not regressed:
+                print(f"[TRACES] No step regressions (threshold {args.threshold:.0%})")
+                return 0
+            print(f"[REGRESSION] {len(regressed)} step(s) slower in run {regressed[0]['run_id']}:")
+            for row in regressed:
+                print(f"   - {row['step_name']}: {row['duration_seconds']:.3f}s vs median {row['baseline_median']:.3f}s "
+                      f"of {row['baseline_runs']} run(s) ({row['ratio']:.2f}x)")
+            return 1
+        elif args.command == 'slowest':
+            for row in index.slowest(args.limit, parse_since(args.since), args.spans):
+                label = row.get('span') or f"{row['step_name']} ({row['agent']})"
+                print(f"   {row['duration_seconds']:>8.3f}s  {row['run_id']}  {label}")
+        return 0
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,172 @@
+"""
+Data Validation
+Loads the ads CSV with explicit dtypes and a fixed-format date parse, then
+runs vectorized column-wise rules: rows breaking a hard rule move to a
+quarantine table, gaps recoverable from the precomputed ctr/roas columns are
+imputed, and every rule is counted in a quality report
+"""
+from typing import Dict, Any, List, Tuple, Union
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DIMENSION_COLUMNS = ['campaign_name', 'adset_name', 'creative_type', 'creative_message',
+                     'audience_type', 'platform', 'country']
+MEASURE_COLUMNS = ['spend', 'impressions', 'clicks', 'purchases', 'revenue']
+COUNT_COLUMNS = ['impressions', 'clicks', 'purchases']
+
+# Counts are read as float64 (they may be missing) and narrowed to int64 after validation
+CSV_DTYPES = {
+    **{column: 'str' for column in DIMENSION_COLUMNS},
+    'date': 'str',
+    **{column: 'float64' for column in MEASURE_COLUMNS},
+    'ctr': 'float64',  # clicks / impressions as a fraction (DataAgent reports ctr in percent)
+    'roas': 'float64'
+}
+DATE_FORMAT = '%Y-%m-%d'
+
+# One row per ad creative per day; adset names repeat across campaigns
+DUPLICATE_KEY = ['campaign_name', 'adset_name', 'date', 'creative_type', 'creative_message']
+
+# Allowed gap between a precomputed ratio and the one derived from the counts
+RATIO_TOLERANCE = {'ctr': 1e-4, 'roas': 0.01}
+
+QUARANTINE_RULES = ['invalid_date', 'non_finite', 'negative_values', 'clicks_exceed_impressions', 'duplicate_row']
+WARNING_RULES = ['ctr_mismatch', 'roas_mismatch']
+
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """Parse ISO dates with a fixed format (unparseable values become NaT)"""
+    return pd.to_datetime(values, format=DATE_FORMAT, errors='coerce').astype('datetime64[ns]')
+
+
+def read_ads_csv(path: Union[str, Path]) -> pd.DataFrame:
+    """
+    Read the ads CSV with explicit dtypes
+
+    Args:
+        path: CSV path
+
+    Returns:
+        DataFrame with a datetime64[ns] 'date' column (NaT where unparseable)
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    df = pd.read_csv(path, dtype={column: dtype for column, dtype in CSV_DTYPES.items() if column in header})
+    df['date'] = parse_dates(df['date'])
+    return df
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return np.divide(numerator, denominator, out=np.full(len(numerator), np.nan), where=denominator > 0)
+
+
+def _duplicates(df: pd.DataFrame, key: List[str]) -> np.ndarray:
+    """Repeats of an earlier row's key: 64-bit row hashes first, exact comparison only among hash collisions"""
+    hashes = pd.util.hash_pandas_object(df[key], index=False).to_numpy()
+    duplicates = np.zeros(len(df), dtype=bool)
+    candidates = pd.Series(hashes).duplicated(keep=False).to_numpy()
+    if candidates.any():
+        duplicates[candidates] = df.loc[candidates, key].duplicated(keep='first').to_numpy()
+    return duplicates
+
+
+def validate(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any]]:
+    """
+    Check every rule with column-wise masks
+
+    Quarantined: unparseable dates, infinite or negative measures, clicks
+    above impressions and repeated (campaign, adset, date, creative) rows
+    (the first occurrence is kept). Imputed: missing clicks from ctr x
+    impressions, missing revenue from roas x spend and missing spend from
+    revenue / roas. Counted only: ctr/roas columns that disagree with the
+    counts.
+
+    Args:
+        df: Output of read_ads_csv (modified in place)
+
+    Returns:
+        (clean rows, quarantined rows with a 'quarantine_reason' column, quality report)
+    """
+    measures = [column for column in MEASURE_COLUMNS if column in df.columns]
+    values = {column: df[column].to_numpy(dtype=np.float64, na_value=np.nan) for column in measures + ['ctr', 'roas']
+              if column in df.columns}
+    masks: Dict[str, np.ndarray] = {}
+
+    masks['invalid_date'] = df['date'].isna().to_numpy()
+    masks['non_finite'] = np.zeros(len(df), dtype=bool)
+    masks['negative_values'] = np.zeros(len(df), dtype=bool)
+    for column in measures:
+        masks['non_finite'] |= np.isinf(values[column])
+        masks['negative_values'] |= values[column] < 0
+
+    # Impute from the precomputed ratios before the cross-column checks
+    imputed = {}
+    recoveries = [('clicks', 'ctr', 'impressions', lambda ratio, base: np.round(ratio * base)),
+                  ('revenue', 'roas', 'spend', lambda ratio, base: np.round(ratio * base, 2)),
+                  ('spend', 'roas', 'revenue', lambda ratio, base: np.round(base / ratio, 2))]
+    for target, ratio, base, recover in recoveries:
+        if target not in values or ratio not in values or base not in values:
+            continue
+        fill = np.isnan(values[target]) & np.isfinite(values[ratio]) & np.isfinite(values[base])
+        if target == 'spend':
+            fill &= values[ratio] > 0
+        imputed[target] = int(fill.sum())
+        if fill.any():
+            filled = values[target].copy()
+            filled[fill] = recover(values[ratio][fill], values[base][fill])
+            values[target] = df[target] = filled
+
+    if 'clicks' in values and 'impressions' in values:
+        masks['clicks_exceed_impressions'] = values['clicks'] > values['impressions']
+    masks['duplicate_row'] = _duplicates(df, [column for column in DUPLICATE_KEY if column in df.columns])
+
+    bad = np.zeros(len(df), dtype=bool)
+    for mask in masks.values():
+        bad |= mask
+
+    warnings = {}
+    for ratio, (numerator, denominator) in {'ctr': ('clicks', 'impressions'), 'roas': ('revenue', 'spend')}.items():
+        if ratio in values and numerator in values and denominator in values:
+            derived = _ratio(values[numerator], values[denominator])
+            mismatch = np.abs(derived - values[ratio]) > RATIO_TOLERANCE[ratio]
+            warnings[f'{ratio}_mismatch'] = int((mismatch & ~bad).sum())
+
+    quarantine = df[bad].copy()
+    reasons = pd.Series('', index=quarantine.index, dtype=object)
+    for rule, mask in masks.items():
+        hit = mask[bad]
+        reasons[hit] = reasons[hit] + np.where(reasons[hit] == '', '', ',') + rule
+    quarantine['quarantine_reason'] = reasons
+
+    clean = df[~bad] if bad.any() else df
+    for column in COUNT_COLUMNS:
+        if column in clean.columns and clean[column].notna().all():
+            counts = clean[column].to_numpy(dtype=np.float64)
+            if np.array_equal(counts, np.floor(counts)):
+                clean[column] = counts.astype(np.int64)
+
+    report = {
+        'rows_read': len(df),
+        'rows_clean': len(clean),
+        'rows_quarantined': int(bad.sum()),
+        'quarantined': {rule: int(masks[rule].sum()) for rule in QUARANTINE_RULES if rule in masks},
+        'imputed': imputed,
+        'warnings': warnings
+    }
+    return clean, quarantine, report
+
+
+def quality_summary(report: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact form of a quality report (non-zero counts only) for data summaries"""
+    summary = {'rows_quarantined': report.get('rows_quarantined', 0)}
+    for group in ('quarantined', 'imputed', 'warnings'):
+        counts = {name: count for name, count in report.get(group, {}).items() if count}
+        if counts:
+            summary[group] = counts
+    return summary
+
+
+def load_validated(path: Union[str, Path]) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any]]:
+    """read_ads_csv followed by validate"""
+    return validate(read_ads_csv(path))
@@ -0,0 +1,65 @@
+"""
+Tests for vectorized anomaly and fatigue detection
+"""
+import numpy as np
+import pandas as pd
+
+from src.agents.data_agent import insight_payload
+from src.analytics.anomalies import build_segment_matrices, detect_anomalies
+
+
+def _daily_rows(days: int = 30, drop_from: int = 23) -> pd.DataFrame:
+    """Two creatives with stable metrics; 'Tired' loses CTR over the last week"""
+    rng = np.random.default_rng(0)
+    rows = []
+    for day, date in enumerate(pd.date_range('2025-01-01', periods=days)):
+        for message in ('Fresh', 'Tired'):
+            ctr = 0.02 * (1 + rng.normal(0, 0.03))
+            if message == 'Tired' and day >= drop_from:
+                ctr *= 1 - 0.08 * (day - drop_from + 1)
+            rows.append({'date': date, 'campaign_name': 'C1', 'adset_name': 'A1', 'creative_type': 'Image',
+                         'creative_message': message, 'spend': 100.0, 'impressions': 10000,
+                         'clicks': 10000 * ctr, 'revenue': 500.0 * (1 + rng.normal(0, 0.03))})
+    return pd.DataFrame(rows)
+
+
+def test_segment_matrices_pivot_by_day():
+    """Test the (segment x day) layout"""
+    labels, days, matrices = build_segment_matrices(_daily_rows(days=5), ['creative_message'])
+    assert labels['creative_message'].tolist() == ['Fresh', 'Tired']
+    assert len(days) == 5
+    assert matrices['spend'].shape == (2, 5)
+    assert np.allclose(matrices['roas'], matrices['revenue'] / 100)
+
+
+def test_recent_window_counts_calendar_days():
+    """Test days missing from the data are NaN columns, so the recent window is not stretched"""
+    rows = _daily_rows(days=30)
+    rows = rows[(rows['date'] < '2025-01-20') | (rows['date'] == '2025-01-30')]
+    _, days, matrices = build_segment_matrices(rows, ['creative_message'])
+    assert len(days) == 30 and pd.Timestamp(days[-1]) == pd.Timestamp('2025-01-30')
+    assert np.isnan(matrices['spend'][:, 19:29]).all() and np.isnan(matrices['ctr'][:, 19:29]).all()
+    # Only 2025-01-30 falls in the last 7 days
+    assert (~np.isnan(matrices['spend'][:, -7:])).sum(axis=1).tolist() == [1, 1]
+
+
+def test_detects_creative_fatigue():
+    """Test that a CTR decline is flagged and stable segments are not"""
+    result = detect_anomalies(_daily_rows(), levels=['creative'])
+    flags = result['flags']
+    assert result['segments_scanned'] == 2
+    assert len(flags) == 1
+    assert flags[0]['segment']['creative_message'] == 'Tired'
+    assert flags[0]['metric'] == 'ctr'
+    assert flags[0]['direction'] == 'decline'
+    assert flags[0]['signal'] == 'creative_fatigue'
+    assert len(flags[0]['tests']) >= 2
+
+
+def test_flags_replace_daily_trends_for_insights():
+    """Test that daily trend rows are dropped once anomalies are flagged"""
+    data = {'rolling_trends': {'daily_trends': [1, 2], 'roas_trend_direction': 'stable'},
+            'anomalies': {'flags': [{'metric': 'ctr'}]}}
+    assert insight_payload(data)['rolling_trends'] == {'roas_trend_direction': 'stable'}
+    data['anomalies']['flags'] = []
+    assert insight_payload(data) is data
@@ -0,0 +1,77 @@
+"""
+Tests for the benchmark harness and fake LLM backend
+"""
+import time
+
+import pytest
+
+import pandas as pd
+from benchmarks.synthetic_data import COLUMNS, generate_ads_data, parse_size
+from benchmarks.run_benchmarks import find_regressions
+from src.orchestrator.agent_graph import AgentGraph
+from src.utils.llm import CassetteMiss, get_cassette
+
+
+def test_synthetic_data_matches_source_schema():
+    """Test that generated data has the source CSV's columns"""
+    source = pd.read_csv('data/synthetic_fb_ads_undergarments.csv', nrows=5)
+    df = generate_ads_data(2000)
+    
+    assert list(df.columns) == list(source.columns) == COLUMNS
+    assert len(df) == 2000
+    assert parse_size('1M') == 1_000_000
+
+
+def test_find_regressions_flags_slowdowns():
+    """Test regression detection with noise floor"""
+    baseline = {'10k/load': {'wall_seconds': 1.0, 'peak_rss_mb': 100}}
+    results = {'10k/load': {'wall_seconds': 1.5, 'peak_rss_mb': 101}}
+    
+    regressions = find_regressions(results, baseline, threshold=0.2)
+    assert len(regressions) == 1
+    assert 'wall_seconds' in regressions[0]
+
+
+def test_pipeline_runs_with_fake_backend(tmp_path):
+    """Test the full agent graph offline against the fake model"""
+    graph = AgentGraph({
+        'data_path': 'data/synthetic_fb_ads_undergarments.csv',
+        'llm_backend': 'fake',
+        'cache': {'enabled': False},
+        'log_dir': str(tmp_path)
+    })
+    results = graph.execute("Analyze ROAS trends")
+    
+    assert results['plan']['model_used'] == 'gemini-1.5-flash'
+    assert len(results['insights']) == 3
+    assert results['creatives']['creative_concepts']
+    assert list(tmp_path.glob('trace_*.json'))
+
+
+def test_cassette_records_and_replays_pipeline(tmp_path):
+    """Test that a recorded run replays hermetically with identical outputs"""
+    def make_graph(mode, backend):
+        return AgentGraph({
+            'data_path': 'data/synthetic_fb_ads_undergarments.csv',
+            'llm_backend': 'cassette',
+            'cassette': {'path': str(tmp_path / 'run.json'), 'mode': mode, 'backend': backend, 'latency': 0.05},
+            'fake_llm_latency': 0.3,
+            'cache': {'enabled': False},
+            'log_dir': str(tmp_path)
+        })
+    
+    recorded = make_graph('record', 'fake').execute("Analyze ROAS trends")
+    cassette = get_cassette(str(tmp_path / 'run.json'))
+    assert cassette.recorded == 6  # plan + insights + 3 evaluations + creatives
+    
+    # Replay never builds the live (gemini) model
+    graph = make_graph('replay', 'gemini')
+    start = time.perf_counter()
+    replayed = graph.execute("Analyze ROAS trends")
+    assert time.perf_counter() - start < 6 * 0.3
+    assert replayed['insights'] == recorded['insights']
+    assert replayed['creatives'] == recorded['creatives']
+    assert cassette.hits == 6 and graph.planner.model._source is None
+    
+    with pytest.raises(CassetteMiss):
+        graph.planner.model.generate_content("An unrecorded prompt")
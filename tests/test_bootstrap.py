@@ -0,0 +1,67 @@
+"""
+Tests for batched bootstrap confidence intervals
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.agents.data_agent import DataAgent
+from src.analytics.bootstrap import resample_counts, segment_intervals
+
+
+def _segments(n_segments: int, n_days: int, rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'segment': rng.integers(0, n_segments, rows),
+        'date': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, n_days, rows), unit='D'),
+        'spend': rng.gamma(2.0, 20.0, rows),
+        'revenue': rng.gamma(2.0, 60.0, rows),
+        'impressions': rng.integers(500, 5000, rows),
+        'clicks': rng.integers(0, 60, rows)
+    })
+
+
+def test_intervals_are_seeded_and_cover_the_point_estimate():
+    """Test intervals repeat for a seed, bracket the ratio and stay aligned with groupby order"""
+    counts = resample_counts(30, 200, seed=7)
+    assert counts.shape == (30, 200) and (counts.sum(axis=0) == 30).all()
+
+    df = _segments(40, 30, 4000)
+    df.loc[df['segment'] == 5, ['spend', 'revenue']] = 0.0
+    grouped = df.groupby('segment')
+    totals = grouped[['spend', 'revenue', 'impressions', 'clicks']].sum()
+
+    first = segment_intervals(df, grouped.ngroup().to_numpy(), len(totals), seed=7)
+    again = segment_intervals(df, grouped.ngroup().to_numpy(), len(totals), seed=7)
+    other = segment_intervals(df, grouped.ngroup().to_numpy(), len(totals), seed=8)
+    assert all(np.array_equal(first[name], again[name]) for name in first)
+    assert not np.array_equal(first['roas_ci_low'], other['roas_ci_low'])
+
+    roas = np.divide(totals['revenue'], totals['spend'], out=np.zeros(len(totals)), where=totals['spend'] > 0)
+    spent = totals['spend'].to_numpy() > 0
+    assert ((first['roas_ci_low'] <= roas + 0.01) & (roas - 0.01 <= first['roas_ci_high']))[spent].all()
+    assert (first['roas_ci_high'] > first['roas_ci_low'])[spent].all()
+    assert first['roas_ci_low'][5] == first['roas_ci_high'][5] == 0.0
+
+    # A segment seen on one day has no interval instead of a zero-width one
+    single = pd.concat([df, df.iloc[:1].assign(segment=40)], ignore_index=True)
+    grouped = single.groupby('segment')
+    intervals = segment_intervals(single, grouped.ngroup().to_numpy(), grouped.ngroups, seed=7)
+    assert np.isnan(intervals['roas_ci_low'][40]) and np.isnan(intervals['ctr_ci_high'][40])
+    assert np.array_equal(intervals['roas_ci_low'][:40], first['roas_ci_low'])
+
+
+def test_aggregates_carry_intervals_for_thousands_of_segments():
+    """Test DataAgent aggregates gain ci columns and the batch stays fast"""
+    agent = DataAgent('data/synthetic_fb_ads_undergarments.csv')
+    country = agent.get_aggregated_metrics(agent.df, ['country'])
+    assert {'roas_ci_low', 'roas_ci_high', 'ctr_ci_low', 'ctr_ci_high'} <= set(country.columns)
+    assert (country['roas_ci_low'] <= country['roas']).all() and (country['roas'] <= country['roas_ci_high']).all()
+
+    df = _segments(5000, 90, 200000, seed=1)
+    df['purchases'] = 1
+    start = time.perf_counter()
+    result = agent.get_aggregated_metrics(df, ['segment'])
+    assert time.perf_counter() - start < 1.5
+    assert len(result) == 5000 and (result['ctr_ci_high'] >= result['ctr_ci_low']).all()
@@ -0,0 +1,91 @@
+"""
+Tests for the budget reallocation simulator
+"""
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.agents.data_agent import DataAgent
+from src.analytics.budget import budget_report, fit_response_curves
+from src.reporting import render_report
+from src.utils.cache import AggregateCache
+
+CSV_PATH = 'data/synthetic_fb_ads_undergarments.csv'
+
+
+def _curves_frame(elasticities, scales, n_days=60, seed=0):
+    """Daily rows whose revenue follows scale * spend^elasticity with small noise"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for segment, (b, a) in enumerate(zip(elasticities, scales)):
+        spend = rng.uniform(50, 500, n_days)
+        revenue = a * spend ** b * rng.lognormal(0, 0.02, n_days)
+        rows.append(pd.DataFrame({
+            'segment': f'S{segment}', 'date': pd.date_range('2025-01-01', periods=n_days),
+            'spend': spend, 'revenue': revenue, 'impressions': 1000, 'clicks': 10
+        }))
+    return pd.concat(rows, ignore_index=True)
+
+
+def test_fit_recovers_curves_and_allocation_equalizes_marginal_roas():
+    """Test elasticities are recovered and the optimum meets the budget with equal marginal ROAS"""
+    df = _curves_frame([0.3, 0.6, 0.8], [40.0, 8.0, 3.0])
+    curves = fit_response_curves(df, ['segment'])
+    assert np.allclose(curves.elasticity, [0.3, 0.6, 0.8], atol=0.02)
+    assert np.isclose(curves.predict(curves.current_spend).sum(), df['revenue'].sum() / 60)
+
+    budgets = curves.daily_budget * np.linspace(0.5, 2.0, 2000)
+    outcome = curves.simulate(budgets, max_change=0.9)
+    assert np.allclose(outcome['allocation'].sum(axis=1), budgets, rtol=1e-8)
+    assert (np.diff(outcome['revenue']) > 0).all()
+
+    middle = outcome['allocation'][1000]
+    share = curves.current_spend / curves.daily_budget
+    free = (middle > budgets[1000] * share * 0.1 * 1.0001) & (middle < budgets[1000] * share * 1.9 * 0.9999)
+    marginal = curves.marginal_roas(middle)[free]
+    assert free.sum() >= 2 and np.ptp(marginal) < 1e-6 * marginal.mean()
+
+    report = budget_report(curves)
+    assert report['reallocated']['predicted_revenue'] >= report['current']['predicted_revenue']
+    assert len(report['scenarios']) == 6
+
+
+def test_data_agent_simulation_is_cached_and_reported():
+    """Test the budget level, millisecond re-simulation and the report section"""
+    agent = DataAgent(CSV_PATH, cache=AggregateCache())
+    results = agent.run_analyses([{'level': 'budget', 'group_by': 'creative_type', 'metrics': ['roas']}])
+    simulation = results['budget_simulation']
+    assert simulation['group_by'] == 'creative_type'
+    assert {row['creative_type'] for row in simulation['segments']} == {'Carousel', 'Image', 'UGC', 'Video'}
+    recommended = sum(row['recommended_spend'] for row in simulation['segments'])
+    assert recommended == pytest.approx(simulation['current']['daily_spend'], abs=0.05)
+
+    # The fitted curves are cached, so another budget is array math only
+    start = time.perf_counter()
+    rerun = agent.simulate_budget('creative_type', daily_budget=30000)
+    assert time.perf_counter() - start < 0.5
+    assert rerun['at_budget']['predicted_revenue'] > simulation['reallocated']['predicted_revenue']
+
+    report = render_report({'data': results}, 'Where should budget go?')
+    assert "### D. Budget Reallocation Simulation" in report
+    assert "#### Budget Scenarios (optimal allocation)" in report
+    document = json.loads(render_report({'data': results}, 'Where should budget go?', 'json'))
+    assert len(document['budget']['scenarios']) == 6
+
+
+
+def test_selection_without_spend_gives_an_empty_report():
+    """Test a filter matching nothing yields an empty simulation instead of failing the run"""
+    agent = DataAgent(CSV_PATH)
+    simulation = agent.run_analyses([{'level': 'budget', 'filters': {'campaign': 'zzz'}}])['budget_simulation']
+    assert len(simulation['segments']) == 0 and len(simulation['scenarios']) == 0
+    assert simulation['scenarios'].columns == ['budget_multiplier', 'daily_budget', 'predicted_revenue', 'predicted_roas']
+    assert simulation['current']['daily_spend'] == 0.0 and simulation['reallocation_uplift_pct'] == 0.0
+
+    unspent = _curves_frame([0.5], [10.0], n_days=10).assign(spend=0.0)
+    curves = fit_response_curves(unspent, ['segment'])
+    assert curves.allocate([100.0, 200.0]).shape == (2, 0)
+    assert budget_report(curves)['scenarios'].empty
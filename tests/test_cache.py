@@ -0,0 +1,103 @@
+"""
+Tests for the aggregate cache
+"""
+import shutil
+
+import pandas as pd
+import pytest
+from src.agents.data_agent import DataAgent
+from src.utils import cache as cache_module
+from src.utils.cache import AggregateCache, dataset_fingerprint
+
+
+@pytest.fixture
+def csv_copy(tmp_path):
+    """Copy of the sample dataset that tests may modify"""
+    path = tmp_path / 'ads.csv'
+    shutil.copy('data/synthetic_fb_ads_undergarments.csv', path)
+    return path
+
+
+def test_repeated_calls_hit_cache(csv_copy):
+    """Test that a second agent over the same file reuses aggregates"""
+    cache = AggregateCache()
+    first = DataAgent(str(csv_copy), cache=cache).get_campaign_level_analysis()
+
+    agent = DataAgent(str(csv_copy), cache=cache)
+    second = agent.get_campaign_level_analysis()
+
+    assert second is first
+    assert cache.hits == 1
+    assert agent._df is None, "Cached results should not load the CSV"
+
+
+def test_default_arguments_share_key(csv_copy):
+    """Test that explicit defaults map to the same cache entry"""
+    cache = AggregateCache()
+    agent = DataAgent(str(csv_copy), cache=cache)
+    agent.compare_periods()
+    agent.compare_periods(current_days=7, previous_days=7)
+
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'entries': 1}
+
+
+def test_cache_invalidates_when_csv_changes(csv_copy):
+    """Test that rewriting the CSV changes the fingerprint and misses the cache"""
+    cache = AggregateCache()
+    before = dataset_fingerprint(str(csv_copy))
+    DataAgent(str(csv_copy), cache=cache).get_data_summary()
+
+    lines = csv_copy.read_text().splitlines()
+    csv_copy.write_text("\n".join(lines[:-100]) + "\n")
+
+    summary = DataAgent(str(csv_copy), cache=cache).get_data_summary()
+    assert dataset_fingerprint(str(csv_copy)) != before
+    assert summary['total_rows'] == len(lines) - 101
+    assert cache.hits == 0
+
+
+def test_persistent_tier_survives_new_cache(csv_copy, tmp_path):
+    """Test that a fresh cache instance reads results from disk"""
+    persist_dir = tmp_path / 'cache'
+    expected = DataAgent(str(csv_copy), cache=AggregateCache(persist_dir=str(persist_dir))).get_data_summary()
+
+    cache = AggregateCache(persist_dir=str(persist_dir))
+    assert DataAgent(str(csv_copy), cache=cache).get_data_summary() == expected
+    assert cache.hits == 1
+
+
+def test_cache_version_invalidates_persisted_results(csv_copy, tmp_path, monkeypatch):
+    """Test that pickles written by an older cache version are not served"""
+    persist_dir = str(tmp_path / 'cache')
+    DataAgent(str(csv_copy), cache=AggregateCache(persist_dir=persist_dir)).get_data_summary()
+
+    monkeypatch.setattr(cache_module, 'CACHE_VERSION', cache_module.CACHE_VERSION + 1)
+    cache = AggregateCache(persist_dir=persist_dir)
+    DataAgent(str(csv_copy), cache=cache).get_data_summary()
+    assert cache.stats()['hits'] == 0
+
+
+def test_random_seed_is_part_of_the_key(csv_copy):
+    """Test that agents with different bootstrap seeds do not share interval results"""
+    cache = AggregateCache()
+    seeded = DataAgent(str(csv_copy), cache=cache, random_seed=1).get_geo_level_analysis()
+    other = DataAgent(str(csv_copy), cache=cache, random_seed=999).get_geo_level_analysis()
+    uncached = DataAgent(str(csv_copy), random_seed=999).get_geo_level_analysis()
+
+    assert cache.hits == 0
+    assert other['country_performance'] == uncached['country_performance']
+    assert other['country_performance'] != seeded['country_performance']
+
+
+def test_cached_frames_are_copied_per_call(csv_copy):
+    """Test modifying a returned DataFrame does not change later cached results"""
+    agent = DataAgent(str(csv_copy), cache=AggregateCache())
+    top = agent.get_top_performers()
+    expected = top.copy()
+    top['roas'] = 0
+    top.sort_values('spend', inplace=True)
+
+    again = agent.get_top_performers()
+    assert agent.cache.hits == 1
+    pd.testing.assert_frame_equal(again, expected)
+    assert agent.get_bottom_performers() is not agent.get_bottom_performers()
@@ -0,0 +1,71 @@
+"""
+Tests for stage checkpoints and resumed runs
+"""
+import asyncio
+import os
+
+from src.orchestrator.agent_graph import AgentGraph
+from src.utils.checkpoint import META_FILE, RunCheckpoint, prune_runs
+
+
+def make_graph(tmp_path):
+    return AgentGraph({
+        'data_path': 'data/synthetic_fb_ads_undergarments.csv',
+        'llm_backend': 'fake',
+        'cache': {'enabled': False},
+        'log_dir': str(tmp_path / 'logs'),
+        'checkpoints': {'enabled': True, 'dir': str(tmp_path / 'checkpoints')}
+    })
+
+
+def test_checkpoint_skips_fallbacks_and_invalidates_later_stages(tmp_path):
+    """Test that agent fallbacks are not saved and recomputed stages drop downstream ones"""
+    checkpoint = RunCheckpoint('run1', str(tmp_path))
+    checkpoint.save_meta(query='q')
+    assert not checkpoint.save('plan', {'objective': 'x', 'error': 'timeout'})
+    assert checkpoint.save('insights', [{'title': 'a'}])
+    assert checkpoint.save(RunCheckpoint.evaluation_name(0), {'passed': True})
+    assert checkpoint.save('creatives', {'creative_concepts': []})
+
+    checkpoint.save(RunCheckpoint.evaluation_name(1), {'passed': False})
+    assert checkpoint.completed() == ['evaluation_000', 'evaluation_001', 'insights']
+    checkpoint.save('insights', [{'title': 'b'}])
+    assert checkpoint.completed() == ['insights']
+    assert RunCheckpoint('run1', str(tmp_path)).load_meta()['query'] == 'q'
+
+
+def test_resume_repeats_only_unfinished_stages(tmp_path):
+    """Test that a run failing in the creative step resumes without earlier LLM calls"""
+    graph = make_graph(tmp_path)
+    graph.creative_agent.generate_creatives = lambda insights, data: {'creative_concepts': [], 'error': 'network'}
+    first = graph.execute("Analyze ROAS trends")
+    run_id = graph.logger.metadata['run_id']
+    assert first['creatives']['error'] == 'network'
+
+    resumed = make_graph(tmp_path)
+    results = resumed.execute(resume=run_id)
+    assert resumed.planner.model.calls == 0
+    assert resumed.insight_agent.model.calls == 0
+    assert resumed.evaluator.model.calls == 0
+    assert resumed.creative_agent.model.calls == 1
+    assert results['plan'] == first['plan']
+    assert results['creatives']['creative_concepts']
+
+    # Everything finished: an async resume restores all stages
+    again = make_graph(tmp_path)
+    asyncio.run(again.execute_async(resume=run_id))
+    assert again.creative_agent.model.calls == 0
+
+
+def test_old_runs_are_pruned(tmp_path):
+    """Test that only the newest keep_runs checkpoints survive a new run"""
+    for age, run_id in enumerate(['new', 'mid', 'old']):
+        RunCheckpoint(run_id, str(tmp_path / 'checkpoints')).save_meta(query='q')
+        os.utime(tmp_path / 'checkpoints' / run_id / META_FILE, (1e9 - age, 1e9 - age))
+    assert prune_runs(str(tmp_path / 'checkpoints'), keep=2) == ['old']
+    assert prune_runs(str(tmp_path / 'checkpoints'), keep=None) == []
+
+    graph = make_graph(tmp_path)
+    graph.checkpoints['keep_runs'] = 1
+    graph.execute("Analyze ROAS trends")
+    assert [path.name for path in (tmp_path / 'checkpoints').iterdir()] == [graph.logger.metadata['run_id']]
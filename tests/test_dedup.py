@@ -0,0 +1,65 @@
+"""
+Tests for local near-duplicate clustering of insights
+"""
+import asyncio
+
+from src.analytics.dedup import cluster_insights
+from src.orchestrator.agent_graph import AgentGraph
+
+
+def _insight(title, description, comparison, severity='medium', confidence=0.8):
+    return {'title': title, 'description': description, 'severity': severity, 'confidence': confidence,
+            'evidence': {'metric': 'roas', 'comparison': comparison}}
+
+
+def test_paraphrases_cluster_and_other_segments_do_not():
+    """Test rephrasings share the strongest representative while the same template on another campaign stays apart"""
+    insights = [
+        _insight('WOMEN_Cotton_Classics ROAS is declining',
+                 'The WOMEN_Cotton_Classics campaign saw ROAS fall 18% over the last week while spend increased.',
+                 '5.1 vs 6.2', confidence=0.7),
+        _insight('ROAS decline in WOMEN_Cotton_Classics',
+                 'ROAS for WOMEN_Cotton_Classics dropped 18% week over week as spend rose.', '5.1 vs 6.2', 'high'),
+        _insight('ROAS decline in MEN_Bamboo_Basics',
+                 'ROAS for MEN_Bamboo_Basics dropped 12% week over week as spend rose.', '4.1 vs 4.7'),
+        _insight('UGC creatives outperform Image', 'UGC ads deliver 7.2 ROAS vs 4.9 for Image ads.', 'UGC 7.2 vs Image 4.9'),
+        _insight('Campaign WOMEN_Cotton_Classics losing efficiency',
+                 'ROAS down 18% for WOMEN_Cotton_Classics in the recent week while spend is up.', '5.1 vs 6.2')
+    ]
+    assert cluster_insights(insights) == [1, 1, 2, 3, 1]
+    assert cluster_insights(insights, threshold=0.99) == [0, 1, 2, 3, 4]
+    assert cluster_insights(insights[:1]) == [0]
+
+
+def test_opposite_directions_do_not_cluster():
+    """Test insights with opposite metric moves on the same segment stay separate despite similar wording"""
+    insights = [
+        _insight('ROAS rose for MEN_Bold_Colors', 'ROAS rose for MEN_Bold_Colors by 12% on falling CPC.', '6.1 vs 5.4', 'high'),
+        _insight('ROAS dropped for MEN_Bold_Colors', 'ROAS dropped for MEN_Bold_Colors by 12% on rising CPC.', '5.4 vs 6.1'),
+        _insight('MEN_Bold_Colors ROAS dropped', 'MEN_Bold_Colors ROAS dropped 12% as CPC is rising.', '5.4 vs 6.1'),
+        _insight('CTR dropped for MEN_Bold_Colors', 'CTR dropped for MEN_Bold_Colors by 12% on rising CPC.', '5.4 vs 6.1')
+    ]
+    insights[3]['evidence']['metric'] = 'ctr'
+    assert cluster_insights(insights) == [0, 1, 1, 3]
+
+
+def test_duplicates_reuse_the_representative_evaluation(tmp_path):
+    """Test only one evaluator call per cluster in both pipelines, with duplicates marked"""
+    config = {
+        'data_path': 'data/synthetic_fb_ads_undergarments.csv',
+        'llm_backend': 'fake',
+        'fake_llm_insights': 4,
+        'log_dir': str(tmp_path / 'logs'),
+        'insight_dedup': {'enabled': True}
+    }
+    graph = AgentGraph(config)
+    results = graph.execute("Analyze ROAS trends")
+    assert graph.evaluator.model.calls == 1
+    representative = next(i for i, entry in enumerate(results['insights']) if 'duplicate_of' not in entry)
+    duplicates = [entry for entry in results['insights'] if 'duplicate_of' in entry]
+    assert len(duplicates) == 3 and all(entry['duplicate_of'] == representative for entry in duplicates)
+    assert all(entry['evaluation'] is results['insights'][representative]['evaluation'] for entry in duplicates)
+
+    graph = AgentGraph(config)
+    asyncio.run(graph.execute_async("Analyze ROAS trends"))
+    assert graph.evaluator.model.calls == 1
@@ -0,0 +1,79 @@
+"""
+Tests for delta prompting against the previous run's aggregates
+"""
+import pandas as pd
+
+from src.agents.data_agent import DataAgent, insight_payload
+from src.analytics.delta import BaselineStore, delta_payload, next_baseline
+from src.orchestrator.agent_graph import AgentGraph
+from src.utils import to_json
+
+CSV_PATH = 'data/synthetic_fb_ads_undergarments.csv'
+
+
+def test_one_more_day_sends_only_material_changes(tmp_path):
+    """Test a run with one extra day keeps new and moved segments plus the baseline block"""
+    df = pd.read_csv(CSV_PATH)
+    previous_csv = tmp_path / 'previous.csv'
+    df[df['date'] < df['date'].max()].to_csv(previous_csv, index=False)
+
+    store = BaselineStore(str(tmp_path / 'baselines'))
+    store.save('daily', 'q', DataAgent(str(previous_csv)).run_analyses(None))
+    current = insight_payload(DataAgent(CSV_PATH).run_analyses(None))
+    payload = delta_payload(current, store.load('daily'), {'roas': 5.0})
+
+    assert payload['summary'] == current['summary']
+    assert len(to_json(payload)) < len(to_json(current)) / 5
+    counts = payload['delta']['segments']['adset_level.adset_performance']
+    adsets = payload['adset_level']['adset_performance']
+    assert len(adsets) == counts['changed'] + counts['new'] < len(current['adset_level']['adset_performance'])
+    changed = [row for row in adsets if row['change_status'] == 'changed']
+    thresholds = payload['delta']['thresholds_pct']
+    assert changed and all(any(abs(row[f'{metric}_vs_baseline_pct']) >= threshold for metric, threshold in thresholds.items())
+                           for row in changed)
+    assert 'geo_level' not in payload and 'geo_level' in payload['delta']['unchanged_sections']
+    assert payload['delta']['baseline_summary']['date_range']['end'] < current['summary']['date_range']['end']
+
+
+def test_second_run_prompts_with_delta(tmp_path):
+    """Test the first run sends full results and saves the baseline the next run diffs against"""
+    config = {
+        'data_path': CSV_PATH,
+        'llm_backend': 'fake',
+        'log_dir': str(tmp_path / 'logs'),
+        'delta_prompting': {'enabled': True, 'dir': str(tmp_path / 'baselines')}
+    }
+    payloads = []
+    for _ in range(2):
+        graph = AgentGraph(config)
+        generate = graph.insight_agent.generate_insights
+        graph.insight_agent.generate_insights = lambda data, context: payloads.append(data) or generate(data, context)
+        graph.execute("Analyze ROAS trends")
+
+    first, second = payloads
+    assert 'delta' not in first and len(list((tmp_path / 'baselines').glob('*.json'))) == 1
+    assert set(second) == {'summary', 'delta'} and not second['delta']['segments']
+
+
+def test_small_moves_accumulate_until_material(tmp_path):
+    """Test a ROAS drift of -4% per run is reported once it adds up past the threshold"""
+    df = pd.read_csv(CSV_PATH)
+    store = BaselineStore(str(tmp_path / 'baselines'))
+    payloads = []
+    for run in range(3):
+        path = tmp_path / f'run{run}.csv'
+        df.assign(revenue=df['revenue'] * 0.96 ** run).to_csv(path, index=False)
+        data_results = DataAgent(str(path)).run_analyses([{'level': 'campaign'}])
+        baseline = store.load('daily')
+        if baseline is not None:
+            payloads.append(delta_payload(insight_payload(data_results), baseline))
+        store.save('daily', 'q', next_baseline(data_results, baseline))
+
+    first, second = payloads
+    assert 'moved less than their threshold' in first['delta']['note']
+    # Only campaigns where 2-decimal rounding of a small ROAS pushes -4% past 5% are sent on the first run
+    reported = {row['campaign_name'] for row in first['campaign_level']['campaign_performance']}
+    assert len(reported) < 20
+    drifted = [row for row in second['campaign_level']['campaign_performance'] if row['campaign_name'] not in reported]
+    assert len(drifted) > 300
+    assert all(-10 < row['roas_vs_baseline_pct'] < -6 for row in drifted)  # 1 - 0.96 ** 2 = 7.8%
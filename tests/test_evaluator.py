@@ -4,17 +4,21 @@ Tests for Evaluator Agent
 import pytest
 from src.agents.evaluator_agent import EvaluatorAgent
 
+CASSETTE_PATH = 'tests/cassettes/agents.json'
+
 
 class TestEvaluatorAgent:
     """Test cases for the Evaluator Agent"""
     
     @pytest.fixture
     def config(self):
-        """Test configuration"""
+        """Test configuration (responses replayed from the test cassette)"""
         return {
             'model': 'gemini-1.5-flash',
             'confidence_min': 0.6,
-            'temperature': 0.3
+            'temperature': 0.3,
+            'llm_backend': 'cassette',
+            'cassette': {'path': CASSETTE_PATH, 'mode': 'replay'}
         }
     
     @pytest.fixture
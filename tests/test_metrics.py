@@ -0,0 +1,51 @@
+"""
+Tests for the derived metric kernel
+"""
+import numpy as np
+import pandas as pd
+
+from src.agents.data_agent import DataAgent
+from src.analytics.metrics import derive_metrics, period_metrics
+
+
+def test_derive_metrics_handles_zero_denominators():
+    """Test zero denominators give the fill value and ratios are rounded per metric"""
+    totals = {
+        'spend': np.array([[30.0, 0.0], [12.5, 7.0]]),
+        'revenue': np.array([[100.0, 5.0], [0.0, 21.0]]),
+        'impressions': np.array([[3000.0, 0.0], [700.0, 900.0]]),
+        'clicks': np.array([[7.0, 0.0], [3.0, 0.0]]),
+        'purchases': np.array([[3.0, 0.0], [0.0, 1.0]])
+    }
+    metrics = derive_metrics(totals)
+    assert metrics['roas'].tolist() == [[3.33, 0.0], [0.0, 3.0]]
+    assert metrics['ctr'].tolist() == [[0.2333, 0.0], [0.4286, 0.0]]
+    assert metrics['cpc'].tolist() == [[4.29, 0.0], [4.17, 0.0]]
+    assert metrics['cpa'].tolist() == [[10.0, 0.0], [0.0, 7.0]]
+
+    undefined = derive_metrics(totals, ('roas',), fill=np.nan, rounded=False)['roas']
+    assert np.isnan(undefined[0, 1]) and undefined[0, 0] == 100.0 / 30.0
+
+    period = period_metrics(pd.Series({'spend': 0.0, 'revenue': 0.0, 'impressions': 10, 'clicks': 1, 'purchases': 0}))
+    assert period['roas'] == 0.0 and period['ctr'] == 10.0
+
+
+def test_aggregated_metrics_match_row_wise_division():
+    """Test DataAgent aggregates match plain pandas division with inf/NaN mapped to 0"""
+    df = pd.DataFrame({
+        'creative_type': ['Image', 'Image', 'Video', 'UGC', 'UGC'],
+        'spend': [10.0, 15.0, 0.0, 40.0, 2.5],
+        'impressions': [900, 1100, 0, 3000, 500],
+        'clicks': [9, 12, 0, 31, 0],
+        'purchases': [1, 0, 0, 3, 0],
+        'revenue': [30.0, 20.0, 0.0, 95.0, 0.0]
+    })
+    result = DataAgent._add_derived_metrics(df.groupby('creative_type').sum().reset_index())
+
+    expected = df.groupby('creative_type').sum().reset_index()
+    expected['ctr'] = (expected['clicks'] / expected['impressions'] * 100).round(4)
+    expected['roas'] = (expected['revenue'] / expected['spend']).round(2)
+    expected['cpc'] = (expected['spend'] / expected['clicks']).round(2)
+    expected['cpa'] = (expected['spend'] / expected['purchases']).round(2)
+    expected = expected.replace([np.inf, -np.inf], 0).fillna(0)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
@@ -0,0 +1,116 @@
+"""
+Tests for the agent graph orchestrator
+"""
+import asyncio
+import time
+
+import pytest
+
+from src.orchestrator.agent_graph import AgentGraph
+
+
+def test_execute_async_overlaps_concurrent_runs(tmp_path):
+    """Test that one event loop serves several analyses with separate traces"""
+    graph = AgentGraph({
+        'data_path': 'data/synthetic_fb_ads_undergarments.csv',
+        'llm_backend': 'fake',
+        'fake_llm_latency': 0.2,
+        'cache': {'enabled': False},
+        'log_dir': str(tmp_path)
+    })
+    
+    async def run_all():
+        return await asyncio.gather(*(graph.execute_async(f"Analyze ROAS {i}") for i in range(3)))
+    
+    start = time.perf_counter()
+    runs = asyncio.run(run_all())
+    elapsed = time.perf_counter() - start
+    
+    # 3 runs x (plan + insights + 3 evaluations + creatives) = 18 calls of 0.2s if serialized
+    assert elapsed < 2.5
+    assert [run['plan']['user_query'] for run in runs] == ['Analyze ROAS 0', 'Analyze ROAS 1', 'Analyze ROAS 2']
+    assert all(len(run['insights']) == 3 for run in runs)
+    assert len(list(tmp_path.glob('trace_*.json'))) == 3
+
+
+def test_execute_async_timeouts(tmp_path):
+    """Test per-call fallbacks and the overall deadline"""
+    config = {
+        'data_path': 'data/synthetic_fb_ads_undergarments.csv',
+        'llm_backend': 'fake',
+        'fake_llm_latency': 0.5,
+        'cache': {'enabled': False},
+        'log_dir': str(tmp_path)
+    }
+    graph = AgentGraph(dict(config, llm_timeout=0.05))
+    results = asyncio.run(graph.execute_async("Analyze ROAS"))
+    assert 'error' in results['plan']
+    assert results['insights'][0]['insight']['error'] is True
+    
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(AgentGraph(config).execute_async("Analyze ROAS", timeout=0.1))
+
+
+def test_speculative_insights_reconcile_with_plan(tmp_path):
+    """Test that speculative insights are kept for matching plans and redone otherwise"""
+    def make_graph():
+        return AgentGraph({
+            'data_path': 'data/synthetic_fb_ads_undergarments.csv',
+            'llm_backend': 'fake',
+            'fake_llm_latency': 0.3,
+            'cache': {'enabled': False},
+            'log_dir': str(tmp_path),
+            'speculative_insights': {'enabled': True, 'min_overlap': 0.5}
+        })
+    
+    # The fake planner's objective is "Analyze Facebook ads performance"
+    graph = make_graph()
+    graph.execute("Analyze facebook ads performance")
+    assert graph.insight_agent.model.calls == 1
+    step = next(s for s in graph.logger.steps if s['step_name'] == 'generate_insights')
+    assert step['speculative'] is True
+    # Planning overlapped data + insights, so the run is shorter than its stages back to back
+    stage_seconds = sum(s['duration_seconds'] for s in graph.logger.steps)
+    assert graph.logger.profile['spans'][0]['wall_seconds'] < stage_seconds - 0.2
+    
+    graph = make_graph()
+    graph.execute("Why is CTR declining in the UK?")
+    assert graph.insight_agent.model.calls == 2
+    
+    # Async: a rejected speculation is cancelled before its LLM call completes
+    graph = make_graph()
+    results = asyncio.run(graph.execute_async("Why is CTR declining in the UK?"))
+    assert graph.insight_agent.model.calls == 1
+    assert len(results['insights']) == 3
+
+
+def test_speculation_is_redone_when_the_plan_requests_other_analyses(tmp_path):
+    """Test a kept objective still reruns data and insights for a plan with a query analysis"""
+    analyses = [{'level': 'query', 'dimensions': ['platform'], 'measures': ['spend', 'roas']}]
+    
+    def make_graph():
+        graph = AgentGraph({
+            'data_path': 'data/synthetic_fb_ads_undergarments.csv',
+            'llm_backend': 'fake',
+            'cache': {'enabled': False},
+            'log_dir': str(tmp_path),
+            'speculative_insights': {'enabled': True}
+        })
+        create_plan, create_plan_async = graph.planner.create_plan, graph.planner.create_plan_async
+        graph.planner.create_plan = lambda query: dict(create_plan(query), analyses=analyses)
+        
+        async def plan_async(query):
+            return dict(await create_plan_async(query), analyses=analyses)
+        graph.planner.create_plan_async = plan_async
+        return graph
+    
+    graph = make_graph()
+    results = graph.execute("Analyze facebook ads performance")
+    assert set(results['data']) == {'summary', 'query_results'}
+    assert results['data']['query_results']['query']['dimensions'] == ['platform']
+    step = next(s for s in graph.logger.steps if s['step_name'] == 'generate_insights')
+    assert step['speculative'] is False
+    
+    graph = make_graph()
+    results = asyncio.run(graph.execute_async("Analyze facebook ads performance"))
+    assert set(results['data']) == {'summary', 'query_results'}
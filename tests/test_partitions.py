@@ -0,0 +1,75 @@
+"""
+Tests for the partitioned dataset layout and partition pruning
+"""
+import pandas as pd
+import pytest
+
+from src.agents.data_agent import DataAgent
+from src.utils.partitions import PartitionedDataset, write_partitioned
+
+CSV_PATH = 'data/synthetic_fb_ads_undergarments.csv'
+
+
+@pytest.fixture(scope='module')
+def daily_dir(tmp_path_factory):
+    path = tmp_path_factory.mktemp('ads') / 'daily'
+    write_partitioned(CSV_PATH, str(path), granularity='day', file_format='pickle')
+    return path
+
+
+def test_manifest_statistics_and_pruning(daily_dir, tmp_path):
+    """Test partition stats cover every row and pruning by date and campaign"""
+    dataset = PartitionedDataset(daily_dir)
+    assert dataset.num_rows == sum(p['rows'] for p in dataset.partitions) == 4500
+    assert len(dataset.partitions) == 90
+
+    week = dataset.prune(start=dataset.max_date - pd.Timedelta(days=6), end=dataset.max_date)
+    assert [p['date_min'] for p in week] == [d.strftime('%Y-%m-%d') for d in pd.date_range(end=dataset.max_date, periods=7)]
+
+    write_partitioned(CSV_PATH, str(tmp_path), granularity='month', by_campaign=True, file_format='pickle')
+    by_campaign = PartitionedDataset(tmp_path)
+    premium = by_campaign.prune(campaign='premium modal')
+    assert 0 < len(premium) < len(by_campaign.partitions) / 10
+    assert all('premium modal' in p['campaigns'][0].lower() for p in premium)
+    assert [p['campaigns'] for p in by_campaign.prune(campaign=['Men Premium Modal'])] == [['Men Premium Modal']] * 3
+    assert by_campaign.read(campaign='premium modal')['campaign_name'].str.lower().str.contains('premium modal').all()
+
+
+def test_data_agent_reads_only_touched_partitions(daily_dir):
+    """Test windowed analyses match the CSV agent while reading only their partitions"""
+    csv_agent, agent = DataAgent(CSV_PATH), DataAgent(str(daily_dir))
+
+    assert agent.get_data_summary() == csv_agent.get_data_summary()
+    assert agent.dataset.partitions_read == 0
+
+    current, expected = agent.compare_periods(), csv_agent.compare_periods()
+    for period in ('current_period', 'previous_period'):
+        assert current[period] == pytest.approx(expected[period])
+    # Two 7-day periods plus the inclusive window start
+    assert agent.dataset.partitions_read == 15
+
+    filters = {'platform': 'Instagram'}
+    geo = agent.get_geo_level_analysis(days=7, filters=filters)['country_performance']
+    expected = csv_agent.get_geo_level_analysis(days=7, filters=filters)['country_performance']
+    assert [row['country'] for row in geo] == [row['country'] for row in expected]
+    assert list(geo.data['spend']) == pytest.approx(list(expected.data['spend']))
+    assert agent.dataset.partitions_read == 15 and agent._df is None
+
+    assert len(agent.df) == 4500
+    assert agent.fingerprint != csv_agent.fingerprint
+
+
+def test_windowed_run_analyses_stays_on_its_partitions(daily_dir):
+    """Test creative and query analyses over a window never load the full dataset"""
+    analyses = [{'level': 'creative', 'window_days': 7},
+                {'level': 'query', 'dimensions': ['platform'], 'measures': ['spend', 'roas'], 'window_days': 7}]
+    agent = DataAgent(str(daily_dir))
+    results, expected = agent.run_analyses(analyses), DataAgent(CSV_PATH).run_analyses(analyses)
+
+    assert 0 < agent.dataset.partitions_read < len(agent.dataset.partitions) and agent._df is None
+    signals, expected_signals = (r['creative_level']['creative_message_signals'] for r in (results, expected))
+    assert list(signals.data['creative_message']) == list(expected_signals.data['creative_message'])
+    assert list(signals.data['spend']) == pytest.approx(list(expected_signals.data['spend']))
+    rows, expected_rows = results['query_results']['rows'], expected['query_results']['rows']
+    assert list(rows.data['platform']) == list(expected_rows.data['platform'])
+    assert list(rows.data['spend']) == pytest.approx(list(expected_rows.data['spend']))
@@ -0,0 +1,45 @@
+"""
+Tests for the profiling spans and metrics export
+"""
+from src.utils.profiling import MetricsRegistry, Profiler, span, traced
+
+
+def test_spans_nest_and_record_counters():
+    """Test that spans form a tree and carry counters"""
+    @traced('unit')
+    def work():
+        with span('inner', 'serialization') as current:
+            current.set(bytes_out=42)
+    
+    profiler = Profiler()
+    with profiler.activate():
+        with span('outer'):
+            work()
+    
+    tree = profiler.to_dict()['spans']
+    assert tree[0]['name'] == 'outer'
+    traced_span = tree[0]['children'][0]
+    assert traced_span['category'] == 'unit'
+    assert traced_span['children'][0]['bytes_out'] == 42
+    assert tree[0]['wall_seconds'] >= traced_span['wall_seconds']
+
+
+def test_spans_are_noops_without_profiler():
+    """Test that instrumented code runs unprofiled"""
+    with span('ignored') as current:
+        current.set(bytes_in=1)
+
+
+def test_metrics_render_openmetrics_text():
+    """Test metrics registry output format"""
+    registry = MetricsRegistry()
+    profiler = Profiler()
+    with profiler.activate():
+        with span('generate', 'llm') as current:
+            current.set(prompt_tokens=100, response_tokens=20)
+    registry.observe(profiler.roots[0])
+    
+    text = registry.render()
+    assert 'kasparro_span_duration_seconds_count{category="llm",name="generate"} 1' in text
+    assert 'kasparro_llm_prompt_tokens_total{category="llm",name="generate"} 100' in text
+    assert text.endswith("# EOF\n")
@@ -0,0 +1,46 @@
+"""
+Tests for compiled prompt templates
+"""
+import os
+
+from src.agents.evaluator_agent import EvaluatorAgent
+from src.utils.prompt_manager import MAX_COMPILED_SOURCES, PromptManager, compile_source
+
+
+def test_fill_is_single_pass_and_keeps_unknown_placeholders(tmp_path):
+    """Test that values are not re-scanned and missing values stay literal"""
+    (tmp_path / 'agent.md').write_text('Data: {data}\nQ: {query} {missing}\n```json\n{"a": {}}\n```')
+    manager = PromptManager(str(tmp_path))
+    prompt = manager.get_filled_prompt('agent', data='{query}', query='why?')
+    assert prompt == 'Data: {query}\nQ: why? {missing}\n```json\n{"a": {}}\n```'
+
+
+def test_templates_reload_when_the_file_changes(tmp_path):
+    """Test mtime-based recompilation"""
+    path = tmp_path / 'agent.md'
+    path.write_text('v1 {x}')
+    manager = PromptManager(str(tmp_path))
+    assert manager.get_filled_prompt('agent', x=1) == 'v1 1'
+    path.write_text('v2 {x}')
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert manager.get_filled_prompt('agent', x=1) == 'v2 1'
+    
+    # Template strings compiled on the fly are cached in a bounded LRU
+    for version in range(MAX_COMPILED_SOURCES * 2):
+        assert manager.fill_prompt(f'v{version} {{x}}', x=1) == f'v{version} 1'
+    assert compile_source.cache_info().currsize <= MAX_COMPILED_SOURCES
+
+
+def test_evaluator_prompts_share_a_static_prefix():
+    """Test that prefix + suffix equals the full prompt and the prefix is reused"""
+    agent = EvaluatorAgent({'llm_backend': 'fake'})
+    data = {'summary': {'total_rows': 10}}
+    first = agent._build_prompt({'title': 'a'}, data)
+    second = agent._build_prompt({'title': 'b'}, data)
+    prefix, _ = agent.shared_prefix(data)
+
+    assert first.startswith(prefix) and second.startswith(prefix)
+    assert prefix.rstrip().endswith('## Insight to Evaluate')
+    assert '"total_rows": 10' in prefix
+    assert 'overall_score >= 0.6' in first
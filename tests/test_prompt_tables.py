@@ -0,0 +1,41 @@
+"""
+Tests for the prompt table encoder
+"""
+import numpy as np
+import pandas as pd
+
+from src.utils.prompt_tables import encode_payload, encode_table, format_number, format_value
+from src.utils.records import RecordTable
+
+
+def test_format_number_significant_figures_and_units():
+    """Test rounding keeps integer digits and scales large values"""
+    assert format_number(640.0899999) == '640'
+    assert format_number(640.0899999, significant=4) == '640.1'
+    assert format_number(1.23456) == '1.23'
+    assert format_number(0.00012345) == '0.000123'
+    assert format_number(5.0) == '5'
+    assert format_number(1234567) == '1.23M'
+    assert format_number(-12345.6) == '-12.3k'
+    assert format_number(1234567, scale=False) == '1234567'
+    assert format_value(np.float64(3.14159), 'roas') == '3.14'
+    assert format_value(pd.Timestamp('2025-01-02')) == '2025-01-02'
+    assert format_value(float('nan')) == ''
+
+
+def test_encode_table_and_payload():
+    """Test header-once tables, flattened cells and aliased sections"""
+    table = RecordTable.from_frame(pd.DataFrame({
+        'country': ['US', 'UK'], 'spend': [1500.456, 20000.0], 'ctr': [1.23456, 0.5]
+    }))
+    assert encode_table(table) == "country|spend|ctr\nUS|1500|1.23\nUK|20k|0.5"
+    assert encode_table([{'segment': {'type': 'Image'}, 'tests': ['zscore', 'slope']}]) == \
+        "segment.type|tests\nImage|zscore+slope"
+
+    text = encode_payload({
+        'summary': {'total_rows': 10, 'overall_roas': 5.8312, 'date_range': {'start': '2025-01-01'}},
+        'geo_level': {'country_performance': table, 'geo_roas_patterns': table}
+    })
+    assert text.splitlines()[:2] == ['summary: total_rows=10, overall_roas=5.83', 'summary.date_range: start=2025-01-01']
+    assert text.count('country|spend|ctr') == 1
+    assert text.endswith("geo_level.geo_roas_patterns: same table as geo_level.country_performance")
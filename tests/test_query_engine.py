@@ -0,0 +1,120 @@
+"""
+Tests for the columnar query engine
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.agents.data_agent import DataAgent, execute_query, normalize_analyses
+from src.analytics.query_engine import ColumnStore, execute, normalize_query
+
+CSV_PATH = 'data/synthetic_fb_ads_undergarments.csv'
+
+
+def _frame():
+    return pd.DataFrame({
+        'date': pd.to_datetime(['2025-03-03', '2025-03-04', '2025-03-10', '2025-03-11', '2025-03-11']),
+        'campaign_name': ['Men Boxers', 'Men Boxers', 'Women Comfort', 'Women Comfort', 'Men Boxers'],
+        'platform': ['Facebook', 'Instagram', 'Instagram', 'Facebook', 'Instagram'],
+        'country': ['US', 'US', 'UK', 'US', None],
+        'spend': [100.0, 50.0, 80.0, np.nan, 20.0],
+        'impressions': [1000, 500, 800, 100, 200],
+        'clicks': [10, 5, 0, 1, 4],
+        'purchases': [2, 1, 0, 0, 1],
+        'revenue': [300.0, 100.0, 0.0, 10.0, 90.0]
+    })
+
+
+def test_normalize_query_drops_unknown_parts():
+    """Test unknown dimensions, measures and operators are dropped"""
+    query = normalize_query({'dimensions': ['Campaign', 'colour'], 'measures': ['roas', 'likes'],
+                             'filters': {'roas': {'>': 1, 'approx': 2}, 'spend': 5, 'platform': 'Instagram'},
+                             'sort': ['-ctr', 'campaign'], 'limit': 10**6})
+    assert query['dimensions'] == ['campaign_name']
+    assert query['measures'] == ['roas']
+    assert query['filters'] == {'roas': {'>': 1}, 'platform': 'Instagram'}
+    assert query['sort'] == ['campaign_name']
+    assert query['limit'] == 1000
+    assert normalize_query({})['measures'] == ['spend', 'revenue', 'roas']
+
+
+def test_malformed_specs_are_cleaned_not_raised():
+    """Test wrong types, comparisons on dimensions and unparseable bounds are dropped"""
+    store = ColumnStore(_frame())
+    malformed = [
+        {'filters': {'country': {'==': 'US'}}},
+        {'filters': {'roas': {'>': 'high'}}},
+        {'filters': {'date': {'>=': 'last week'}}},
+        {'filters': ['x']},
+        {'filters': {'country': {'US': 1}, 3: 'x', 'platform': [['Instagram'], None]}},
+        {'measures': [{'name': 'roas'}], 'dimensions': [None]}
+    ]
+    for spec in malformed:
+        result = execute(store, spec)
+        assert result['query']['filters'] == {} and result['rows_matched'] == 5
+
+    query = normalize_query({'dimensions': 'country', 'measures': 'roas',
+                             'filters': {'date': {'>=': '2025-03-10', '<': 'soon'}, 'spend': {'>': '10'},
+                                         'platform': ['Instagram', {'x': 1}]}})
+    assert query['dimensions'] == ['country'] and query['measures'] == ['roas']
+    assert query['filters'] == {'date': {'>=': '2025-03-10'}, 'spend': {'>': 10.0}, 'platform': ['Instagram']}
+
+
+def test_execute_groups_filters_and_time_grains():
+    """Test grouping, pushed-down filters, HAVING, sorting and weekly buckets"""
+    store = ColumnStore(_frame())
+
+    result = execute(store, {'dimensions': ['campaign'], 'measures': ['spend', 'roas', 'ctr', 'rows'],
+                             'filters': {'campaign': 'boxers'}})
+    assert result['rows'].to_records() == [
+        {'campaign_name': 'Men Boxers', 'spend': 170.0, 'roas': 2.88, 'ctr': 1.1176, 'rows': 3}
+    ]
+    assert result['rows_matched'] == 3
+
+    result = execute(store, {'dimensions': ['country'], 'measures': ['spend', 'roas'],
+                             'filters': {'roas': {'>': 0}}, 'sort': '-spend'})
+    # Missing countries form their own group; UK (no revenue) fails the HAVING bound
+    assert result['rows'].to_records() == [
+        {'country': 'US', 'spend': 150.0, 'roas': 2.73},
+        {'country': None, 'spend': 20.0, 'roas': 4.5}
+    ]
+
+    result = execute(store, {'dimensions': ['week', 'platform'], 'measures': ['revenue'],
+                             'filters': {'date': {'>=': '2025-03-04'}}, 'sort': ['week', 'platform']})
+    assert result['rows'].to_records() == [
+        {'week': '2025-03-03', 'platform': 'Instagram', 'revenue': 100.0},
+        {'week': '2025-03-10', 'platform': 'Facebook', 'revenue': 10.0},
+        {'week': '2025-03-10', 'platform': 'Instagram', 'revenue': 90.0}
+    ]
+
+    result = execute(store, {'measures': ['cpa'], 'window_days': 1})
+    assert result['rows'].to_records() == [{'cpa': 100.0}]
+
+
+def test_execute_matches_pandas_groupby():
+    """Test engine results against the DataAgent's pandas aggregation"""
+    agent = DataAgent(CSV_PATH)
+    result = agent.query({'dimensions': ['platform', 'creative_type'], 'measures': ['spend', 'ctr', 'roas'],
+                          'filters': {'country': ['US', 'UK']}, 'window_days': 30, 'sort': '-roas', 'limit': 3})
+
+    df = agent.get_date_range_data(30)
+    expected = agent.get_aggregated_metrics(df[df['country'].isin(['US', 'UK'])], ['platform', 'creative_type'])
+    expected = expected.sort_values('roas', ascending=False).head(3)
+    assert [(r['platform'], r['creative_type'], r['roas'], r['ctr']) for r in result['rows']] == \
+        list(zip(expected['platform'], expected['creative_type'], expected['roas'], expected['ctr']))
+    np.testing.assert_allclose(result['rows'].data['spend'], expected['spend'])
+
+
+def test_query_analysis_level_and_execute_query():
+    """Test the 'query' analysis level and structured execute_query specs"""
+    spec = {'level': 'query', 'dimensions': ['month'], 'measures': ['roas']}
+    assert normalize_analyses([spec]) == [dict(normalize_query(spec), level='query')]
+    assert all(entry['level'] != 'query' for entry in normalize_analyses(None))
+
+    results = DataAgent(CSV_PATH).run_analyses([spec])
+    assert results['query_results']['rows'].columns == ['month', 'roas']
+
+    output = execute_query(CSV_PATH, json.dumps({'dimensions': ['platform'], 'measures': ['rows']}))
+    assert sum(output['rows'].data['rows']) == output['rows_scanned']
+    assert 'data_summary' in execute_query(CSV_PATH, 'how are we doing?')
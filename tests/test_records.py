@@ -0,0 +1,38 @@
+"""
+Tests for the columnar RecordTable
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.agents.data_agent import DataAgent, _project_metrics
+from src.utils import convert_to_serializable
+from src.utils.records import RecordTable
+
+
+def test_record_table_behaves_like_records():
+    """Test row views, index views and materialization"""
+    df = pd.DataFrame({'country': ['US', 'UK', 'IN'], 'roas': [6.5, 3.5, 4.0], 'purchases': np.array([3, 1, 2])})
+    table = RecordTable.from_frame(df)
+
+    assert table == df.to_dict('records')
+    assert table[0]['country'] == 'US' and table[-1].get('missing', 'x') == 'x'
+    assert type(table[0]['purchases']) is int
+
+    top = table.take(df.nlargest(2, 'roas').index)
+    assert [row['country'] for row in top] == ['US', 'IN']
+    assert top.data is table.data
+    assert [row['country'] for row in top[1:]] == ['IN']
+    assert json.loads(json.dumps(convert_to_serializable({'top': top}))) == {'top': top.to_records()}
+
+
+def test_aliased_sections_share_storage():
+    """Test that alias keys hold one table, also after metric projection"""
+    agent = DataAgent('data/synthetic_fb_ads_undergarments.csv')
+    geo = agent.get_geo_level_analysis()
+    assert geo['country_performance'] is geo['geo_roas_patterns']
+
+    projected = _project_metrics(geo, {'ctr'})
+    assert projected['country_performance'] is projected['geo_roas_patterns']
+    assert projected['country_performance'].columns == ['country', 'ctr', 'ctr_ci_low', 'ctr_ci_high']
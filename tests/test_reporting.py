@@ -0,0 +1,99 @@
+"""
+Tests for the report model, renderers and report store
+"""
+import json
+from datetime import datetime
+
+import pytest
+
+from src.reporting import ReportStore, render_report, render_reports
+from src.reporting.templates import compile_template
+
+GENERATED_AT = datetime(2025, 3, 4, 5, 6, 7)
+
+RESULTS = {
+    'data': {
+        'summary': {
+            'total_rows': 1200, 'total_spend': 1000.0, 'total_revenue': 5500.0, 'overall_roas': 5.5,
+            'date_range': {'start': '2025-01-01', 'end': '2025-03-31', 'days': 90},
+            'campaigns': 3, 'adsets': 9
+        },
+        'recent_trends': {'roas': {'current': 5.6, 'previous': 5.0, 'change': '12.0%'}},
+        'geo_level': {'country_performance': [
+            {'country': 'US', 'roas': 6.5, 'revenue': 3000, 'cpc': 0.12},
+            {'country': 'UK', 'roas': 3.5, 'revenue': 1000, 'cpc': 0.25}
+        ]}
+    },
+    'insights': [{
+        'insight': {'title': 'ROAS <up>', 'description': 'Driven by US', 'severity': 'high'},
+        'evaluation': {'scores': {'evidence_quality': 0.9}, 'overall_score': 0.85}
+    }],
+    'creatives': {'creative_concepts': [{'type': 'Video', 'concept': 'Comfort test'}]}
+}
+
+
+def test_compiled_template_formats_and_ignores_extra_fields():
+    """Test that compiled templates behave like str.format"""
+    row = compile_template("| {name} | {roas:.2f}x | {{literal}} |")
+    assert row(name='Image', roas=6.129, unused=1) == "| Image | 6.13x | {literal} |"
+    assert compile_template("{name!r:>8}")(name='UGC') == "{!r:>8}".format('UGC')
+    with pytest.raises(ValueError):
+        compile_template("{__import__('os').getcwd()}")
+
+
+def test_markdown_report_sections():
+    """Test that the markdown report renders computed values"""
+    report = render_report(RESULTS, 'Analyze ROAS', generated_at=GENERATED_AT)
+
+    assert report.startswith("# Facebook Ads Performance Analysis Report\n")
+    assert "| **Generated** | March 04, 2025 at 05:06:07 UTC |" in report
+    assert "> **Status: STRONG PERFORMANCE**" in report
+    assert "| **ROAS** | 5.6 | 5.0 | - | 12.0% | 📈 Strong Positive |" in report
+    assert "| **US** | 6.50x | 75.0% | High | Optimized |" in report
+    assert "- Overall Confidence: **85.0%**" in report
+    assert "| **Next Report** | March 11, 2025 |" in report
+    assert report.endswith("All Rights Reserved**")
+
+
+def test_html_and_json_share_the_model():
+    """Test alternative outputs and parallel rendering"""
+    html = render_report(RESULTS, 'Analyze ROAS', 'html', GENERATED_AT)
+    assert "ROAS &lt;up&gt;" in html
+    assert "<td>75.0%</td>" in html
+
+    model = json.loads(render_report(RESULTS, 'Analyze ROAS', 'json', GENERATED_AT))
+    assert model['countries'][0]['revenue_share'] == 75.0
+    assert model['performance']['top_performer']['creative_type'] == 'Carousel'
+
+    documents = render_reports([(RESULTS, 'a'), ({}, 'b')], fmt='json', max_workers=2)
+    assert [json.loads(doc)['query'] for doc in documents] == ['a', 'b']
+
+
+def test_report_store_deduplicates_shared_payload(tmp_path):
+    """Test content-addressed objects, compression and reference resolution"""
+    store = ReportStore(str(tmp_path), compression='gzip')
+    paths = store.save_run('Analyze ROAS', RESULTS, timestamp='2025-03-04T05:06:07')
+
+    insights_doc = json.loads(paths['insights'].read_text())
+    creatives_doc = json.loads(paths['creatives'].read_text())
+    assert insights_doc['insights'] == creatives_doc['insights_used']
+    assert insights_doc['insights']['$ref'].endswith('.json.gz')
+    assert len(list((tmp_path / 'objects').iterdir())) == 2
+    assert not list(tmp_path.glob('*.tmp'))
+
+    loaded = store.load('creatives.json')
+    assert loaded['insights_used'][0]['insight']['title'] == 'ROAS <up>'
+    assert loaded['creatives']['creative_concepts'][0]['type'] == 'Video'
+
+
+def test_report_store_prunes_unreferenced_objects(tmp_path):
+    """Test objects of a replaced run are deleted while shared ones stay"""
+    store = ReportStore(str(tmp_path))
+    store.save_run('Analyze ROAS', RESULTS)
+    first = {path.name for path in (tmp_path / 'objects').iterdir()}
+
+    changed = dict(RESULTS, insights=[dict(RESULTS['insights'][0], passed=True)])
+    store.save_run('Analyze ROAS', changed)
+    second = {path.name for path in (tmp_path / 'objects').iterdir()}
+    assert len(second) == 2 and len(first & second) == 1
+    assert store.load('insights.json')['insights'][0]['passed'] is True
@@ -0,0 +1,23 @@
+"""
+Tests for the command-line entry point
+"""
+import subprocess
+import sys
+
+HEAVY_MODULES = ('pandas', 'google.generativeai')
+
+
+def test_help_does_not_import_heavy_modules():
+    """Test that `python run.py --help` answers without loading pandas or the LLM SDK"""
+    code = (
+        "import runpy, sys\n"
+        "sys.argv = ['run.py', '--help']\n"
+        "try:\n"
+        "    runpy.run_path('run.py', run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print('LOADED', [name for name in {HEAVY_MODULES!r} if name in sys.modules])\n"
+    )
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    assert 'usage:' in output
+    assert output.splitlines()[-1] == 'LOADED []'
@@ -0,0 +1,41 @@
+"""
+Tests for the creative message index
+"""
+import pandas as pd
+
+from src.analytics.text_index import MessageIndex, tokenize
+
+
+def test_tokenize_builds_unigrams_and_bigrams():
+    """Test tokenization drops filler words and adds bigrams"""
+    assert tokenize("No ride‑up guarantee — best‑selling briefs") == [
+        'no', 'ride', 'up', 'guarantee', 'best', 'selling', 'briefs',
+        'no ride', 'ride up', 'up guarantee', 'guarantee best', 'best selling', 'selling briefs'
+    ]
+
+
+def test_theme_performance_aggregates_per_term():
+    """Test per-term totals match a manual aggregation"""
+    df = pd.DataFrame({
+        'creative_message': ['Soft bamboo briefs', 'Soft bamboo boxers', 'Cooling mesh boxers', 'Soft bamboo briefs'],
+        'spend': [10.0, 20.0, 40.0, 10.0],
+        'impressions': [1000, 1000, 1000, 1000],
+        'clicks': [10.0, 20.0, 5.0, 10.0],
+        'purchases': [1, 2, 1, 1],
+        'revenue': [50.0, 100.0, 40.0, 50.0]
+    })
+    index = MessageIndex(df['creative_message'])
+    assert index.size == 3
+    assert sorted(index.lookup('Boxers')) == ['Cooling mesh boxers', 'Soft bamboo boxers']
+
+    themes = {theme['term']: theme for theme in index.theme_performance(index.message_totals(df))}
+    assert themes['soft bamboo']['messages'] == 2
+    assert themes['soft bamboo']['roas'] == 5.0
+    assert themes['soft bamboo']['ctr'] == round(40 / 3000 * 100, 4)
+    assert themes['boxers']['roas'] == 2.33
+    assert 'mesh' not in themes
+
+    # Only the selected rows count
+    subset = df.iloc[[2, 3]]
+    themes = index.theme_performance(index.message_totals(subset, subset.index.to_numpy()), min_messages=1)
+    assert {theme['term'] for theme in themes} >= {'cooling mesh', 'soft bamboo'}
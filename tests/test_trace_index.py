@@ -0,0 +1,53 @@
+"""
+Tests for the cross-run trace index
+"""
+import json
+import os
+
+from src.utils.trace_index import TraceIndex, main
+
+
+def _write_trace(log_dir, run_id, durations, error=False):
+    steps = [{'step_name': name, 'agent': f'{name}_agent', 'timestamp': f'2025-11-{run_id[-2:]}T10:00:0{i}',
+              'input': 'query', 'output': {'error': 'boom'} if error and i == 0 else {'ok': True},
+              'duration_seconds': seconds} for i, (name, seconds) in enumerate(durations.items())]
+    profile = {'spans': [{'name': 'execute', 'category': 'pipeline', 'wall_seconds': sum(durations.values()),
+                          'children': [{'name': 'create_plan', 'category': 'stage', 'wall_seconds': durations['create_plan'],
+                                        'children': [{'name': 'planner_agent.generate_content', 'category': 'llm',
+                                                      'wall_seconds': 0.1, 'prompt_tokens': 700, 'response_tokens': 80}]}]}]}
+    path = log_dir / f'trace_{run_id}.json'
+    path.write_text(json.dumps({'metadata': {'query': 'q'}, 'execution_start': steps[0]['timestamp'],
+                                'steps': steps, 'profile': profile}))
+    return path
+
+
+def test_incremental_ingest_and_queries(tmp_path):
+    """Test that only new or rewritten traces are parsed and the queries over them"""
+    logs = tmp_path / 'logs'
+    logs.mkdir()
+    for day in range(1, 6):
+        _write_trace(logs, f'202511{day:02d}', {'create_plan': 1.0 + day / 100, 'analyze_data': 0.1})
+    index = TraceIndex(str(tmp_path / 'index.sqlite'))
+
+    assert index.ingest(str(logs)) == {'ingested': 5, 'skipped': 0, 'failed': 0}
+    latest = _write_trace(logs, '20251106', {'create_plan': 2.5, 'analyze_data': 0.11}, error=True)
+    assert index.ingest(str(logs)) == {'ingested': 1, 'skipped': 5, 'failed': 0}
+    # A rewritten file is re-ingested without duplicating rows
+    os.utime(latest, ns=(1, 1))
+    assert index.ingest(str(logs))['ingested'] == 1
+
+    stats = index.percentiles()
+    assert stats['create_plan']['count'] == 6 and stats['create_plan']['errors'] == 1
+    assert stats['create_plan']['max'] == 2.5
+    assert index.percentiles(since='2025-11-05')['analyze_data']['count'] == 2
+
+    regressed = index.regressions(baseline_runs=5)
+    assert [(row['run_id'], row['step_name']) for row in regressed] == [('20251106', 'create_plan')]
+    assert index.regressions(run_id='20251105') == []
+
+    assert index.slowest(limit=1)[0]['run_id'] == '20251106'
+    tokens = index.db.execute("SELECT prompt_tokens FROM steps WHERE step_name = 'create_plan' LIMIT 1").fetchone()
+    assert tokens == (700,)
+    index.close()
+
+    assert main(['--db', str(tmp_path / 'index.sqlite'), '--logs', str(logs), 'regressions']) == 1
@@ -0,0 +1,70 @@
+"""
+Tests for load-time validation and quarantine
+"""
+import numpy as np
+import pandas as pd
+
+from src.agents.data_agent import DataAgent
+from src.utils.validation import quality_summary, read_ads_csv, validate
+
+CSV_PATH = 'data/synthetic_fb_ads_undergarments.csv'
+
+
+def test_read_uses_explicit_dtypes():
+    """Test dates parse to datetime64[ns] and counts are narrowed after validation"""
+    df = read_ads_csv(CSV_PATH)
+    assert df['date'].dtype == 'datetime64[ns]'
+    assert df['clicks'].dtype == np.float64
+
+    clean, quarantine, report = validate(df)
+    # Missing clicks are recovered from ctr x impressions, so clicks become integers
+    assert clean['clicks'].dtype == np.int64 and clean['impressions'].dtype == np.int64
+    assert report['imputed']['clicks'] == 152
+    assert report['rows_quarantined'] == len(quarantine) == 0
+    assert report['warnings'] == {'ctr_mismatch': 0, 'roas_mismatch': 0}
+
+
+def test_rules_quarantine_bad_rows():
+    """Test each rule quarantines its rows with a reason"""
+    df = pd.DataFrame({
+        'campaign_name': ['A', 'A', 'A', 'A', 'A', 'B'],
+        'adset_name': ['s1', 's1', 's2', 's3', 's4', 's1'],
+        'date': pd.to_datetime(['2025-01-01', '2025-01-01', None, '2025-01-02', '2025-01-02', '2025-01-01']),
+        'creative_type': ['Video'] * 6,
+        'creative_message': ['m'] * 6,
+        'spend': [10.0, 10.0, 5.0, -1.0, np.inf, np.nan],
+        'impressions': [100.0, 100.0, 50.0, 10.0, 10.0, 200.0],
+        'clicks': [5.0, 5.0, 60.0, 1.0, 1.0, np.nan],
+        'ctr': [0.05, 0.05, 1.2, 0.1, 0.1, 0.04],
+        'purchases': [1.0] * 6,
+        'revenue': [30.0, 30.0, 10.0, 3.0, 3.0, 20.0],
+        'roas': [3.0, 3.0, 2.0, 0.0, 0.0, 2.5]
+    })
+    clean, quarantine, report = validate(df)
+
+    assert list(quarantine['quarantine_reason']) == [
+        'duplicate_row', 'invalid_date,clicks_exceed_impressions', 'negative_values', 'non_finite'
+    ]
+    assert report['rows_clean'] == len(clean) == 2
+    # Campaign B's row is kept: spend from revenue / roas, clicks from ctr x impressions
+    assert clean.loc[5, ['spend', 'clicks']].tolist() == [8.0, 8]
+    assert quality_summary(report) == {
+        'rows_quarantined': 4,
+        'quarantined': {'invalid_date': 1, 'non_finite': 1, 'negative_values': 1,
+                        'clicks_exceed_impressions': 1, 'duplicate_row': 1},
+        'imputed': {'clicks': 1, 'spend': 1}
+    }
+
+
+def test_data_agent_reports_quality(tmp_path):
+    """Test the Data Agent loads validated rows and reports the quarantine"""
+    df = pd.read_csv(CSV_PATH)
+    df = pd.concat([df, df.iloc[[0]]], ignore_index=True)
+    df.loc[1, 'spend'] = -5
+    df.to_csv(tmp_path / 'ads.csv', index=False)
+
+    agent = DataAgent(str(tmp_path / 'ads.csv'))
+    summary = agent.get_data_summary()
+    assert summary['total_rows'] == 4500 - 1
+    assert summary['data_quality']['quarantined'] == {'negative_values': 1, 'duplicate_row': 1}
+    assert len(agent.quarantine) == 2